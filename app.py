@@ -1,660 +1,303 @@
+import numpy as np
 import pandas as pd
 import streamlit as st
 from datetime import datetime, time as dt_time, timedelta, date
 import io
-from collections import defaultdict
 import random
+import time
 import os
-import warnings
-from icalendar import Calendar, Event
-import smtplib
-from email.mime.text import MIMEText
+import json
 import logging
-from typing import Dict, List, Tuple, Optional, Any
-try:
-    from streamlit_calendar import calendar
-except ImportError:
-    calendar = None
-
-# ========== SETUP LOGGING ==========
-logging.basicConfig(
-    filename='scheduler.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
+from typing import Dict, List, Tuple, Optional, Any, Sequence
+from scheduler import (
+    Config,
+    HARI_INDEX,
+    SCHEDULER_ENGINES,
+    time_to_minutes,
+    load_data,
+    get_storage,
+    SQLiteStorage,
+    save_to_excel,
+    KOLOM_AVAILABILITY,
+    read_availability_preview,
+    coalesce_availability,
+    normalize_stored_availability,
+    import_availability,
+    AvailabilityIndex,
+    DosenMatkulIndex,
+    parse_jam,
+    prepare_ruangan_prioritas,
+    GenerationResult,
+    data_hash,
+    ConflictIndex,
+    reschedule_incremental,
+    locked_rows,
+    generate_schedule,
+    optimize_jadwal,
+    setup_logging,
 )
 
-# ========== KONFIGURASI UTAMA ==========
-warnings.filterwarnings("ignore", category=UserWarning)
+def _show_generation_messages(hasil: GenerationResult) -> None:
+    """Tampilkan pesan error/peringatan/info hasil generate di UI"""
+    for pesan in hasil.errors:
+        st.error(pesan)
+    for pesan in hasil.warnings:
+        st.warning(pesan)
+    for pesan in hasil.info:
+        st.info(pesan)
 
-class Config:
-    SEMESTER_KELAS = {"TI24": 1, "TI23": 3, "TI22": 5}
-    KONSENTRASI_OPTIONS = ["AI", "software", "cybersecurity", "umum"]
-    MAX_SKS_SEMESTER = 21
-    MAX_SKS_DOSEN = 12
-    DURASI_SKS = 50  # menit per SKS
-    MAX_SCHEDULING_ATTEMPTS = 20
-    PRIORITAS_RUANGAN_PREFIX = "B4"
-    
-    HARI_PRIORITAS = {
-        'reguler': ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat'],
-        'internasional': ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat'],
-        'sabtu': ['Sabtu'],
-        'karyawan': ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu'],
-        'reguler malam': ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat']
-    }
-    
-    JAM_OPERASIONAL = {
-        'reguler': (dt_time(8, 0), dt_time(17, 0)),
-        'internasional': (dt_time(8, 0), dt_time(17, 0)),
-        'sabtu': (dt_time(8, 0), dt_time(17, 0)),
-        'karyawan': (dt_time(19, 0), dt_time(21, 0)),
-        'reguler malam': (dt_time(19, 0), dt_time(21, 0))
-    }
-    
-    WAKTU_TIDAK_BOLEH = {
-        'Jumat': [(dt_time(11, 30), dt_time(13, 0))],  # Waktu sholat Jumat
-    }
-    
-    ISTIRAHAT = [
-        (dt_time(12, 0), dt_time(13, 0)),  # Istirahat siang
-    ]
-    
-    WARNA_KELAS = {
-        'Online': '#4e79a7',
-        'Offline': '#f28e2b',
-        'Karyawan': '#59a14f',
-        'Sabtu': '#e15759',
-        'Internasional': '#edc948',
-        'AI': '#76b7b2',
-        'software': '#59a14f',
-        'cybersecurity': '#e15759',
-        'Locked': '#d62728',
-        'umum': '#bab0ac'
-    }
+def generate_jadwal(
+    engine: str = "greedy",
+    n_runs: int = 1,
+    seed: Optional[int] = None,
+    jadwal_lama: Optional[pd.DataFrame] = None
+) -> Optional[pd.DataFrame]:
+    """Generate jadwal kuliah secara otomatis dengan penjadwalan yang lebih cerdas"""
+    # Load data
+    data = load_data()
+    progress_bar = st.progress(0)
+    hasil, manifest = generate_schedule(
+        data, engine, n_runs, seed, locked_rows(jadwal_lama),
+        progress_callback=progress_bar.progress, file_path=get_storage().path
+    )
+    _show_generation_messages(hasil)
     
-    MATKUL_WAJIB = {
-        1: ['Algoritma dan Struktur Data', 'Logika Informatika', 'Kalkulus', 'Statistika dan Probabilitas'],
-        3: ['Metode Numerik', 'Pemrograman Berbasis Platform', 'Jaringan Komputer dan Keamanan Informasi', 'Rekayasa Perangkat Lunak'],
-        5: ['Proyek Perangkat Lunak', 'Metodologi Penelitian', 'Basis Data']
-    }
-
-# ========== UTILITY FUNCTIONS ==========
-def parse_time(time_str: str) -> dt_time:
-    """Mengubah string waktu menjadi objek time dengan error handling"""
-    if isinstance(time_str, str):
-        try:
-            if len(time_str.split(':')) == 2:
-                return datetime.strptime(time_str, '%H:%M').time()
-            return datetime.strptime(time_str, '%H:%M:%S').time()
-        except ValueError as e:
-            logging.warning(f"Gagal parse waktu: {time_str}, error: {str(e)}")
-            return dt_time(8, 0)
-    elif isinstance(time_str, dt_time):
-        return time_str
-    return dt_time(8, 0)
+    if manifest is not None:
+        st.session_state.run_manifest = manifest
+        st.session_state.jadwal_data = data
+    return hasil.jadwal
 
-def generate_time_slots(
-    jam_awal: dt_time, 
-    jam_akhir: dt_time, 
-    durasi_menit: int, 
-    hari: str, 
-    jenis_kelas: str
-) -> List[Tuple[dt_time, dt_time]]:
-    """Generate slot waktu yang tersedia dengan penyesuaian khusus"""
-    slots = []
-    jam_awal = parse_time(jam_awal)
-    jam_akhir = parse_time(jam_akhir)
+class JadwalStore:
+    """Representasi kolumnar jadwal untuk filter, urut, dan agregasi
     
-    dummy_date = date(2023, 1, 1)
-    current_time = datetime.combine(dummy_date, jam_awal)
-    end_time = datetime.combine(dummy_date, jam_akhir)
-    durasi = timedelta(minutes=durasi_menit)
+    Kolom teks disimpan sebagai kategori, Hari sebagai kategori berurutan (Senin..Minggu), dan Jam
+    sebagai menit mulai/selesai integer (-1 untuk yang belum terjadwal). String tampilan Jam baru
+    dibentuk saat render atau ekspor, hanya untuk baris yang ditampilkan; Jam yang tidak bisa
+    di-parse (termasuk 'Cek EdLink') disimpan apa adanya dan dikembalikan tanpa diubah.
     
-    # Penyesuaian khusus untuk jenis kelas
-    if jenis_kelas.lower() in ['karyawan', 'reguler malam']:
-        current_time = datetime.combine(dummy_date, dt_time(19, 0))
-        end_time = datetime.combine(dummy_date, dt_time(21, 0))
+    Filter memakai bitmap per nilai (bit terpaket, dibuat sekali per nilai lalu di-memo) yang
+    digabung dengan OR dalam satu kolom dan AND antar kolom, lalu diterapkan ke permutasi urut
+    yang juga di-memo, sehingga hasil filter sudah terurut tanpa sort ulang. Event kalender juga
+    dibentuk sekali untuk semua baris, tampilan terfilter cukup memilih dari array event itu.
+    """
+    KATEGORI = ['Kelas', 'Konsentrasi', 'Mata Kuliah', 'Dosen', 'Ruangan', 'Status', 'Keterangan']
+    KOLOM_TAMPIL = [
+        'Kelas', 'Konsentrasi', 'Hari', 'Jam', 'Mata Kuliah', 'Dosen', 'Ruangan',
+        'SKS', 'Semester', 'Status', 'Keterangan', 'Warna', 'is_locked'
+    ]
     
-    while current_time + durasi <= end_time:
-        start = current_time.time()
-        end = (current_time + durasi).time()
+    def __init__(self, jadwal_df: pd.DataFrame):
+        data = {kolom: jadwal_df[kolom].astype('category') for kolom in self.KATEGORI}
+        if 'Warna' in jadwal_df.columns:
+            data['Warna'] = jadwal_df['Warna'].astype('category')
         
-        # Cek bentrok dengan waktu istirahat
-        is_istirahat = any(
-            start <= istirahat_start < end or istirahat_start <= start < istirahat_end 
-            for istirahat_start, istirahat_end in Config.ISTIRAHAT
-        )
+        # Hari kosong tidak boleh jadi kategori, cukup kode -1
+        hari_lain = [h for h in pd.unique(jadwal_df['Hari']) if pd.notna(h) and h not in HARI_INDEX]
+        data['Hari'] = pd.Categorical(jadwal_df['Hari'], categories=Config.URUTAN_HARI + hari_lain, ordered=True)
         
-        if is_istirahat:
-            current_time += timedelta(minutes=60)
-            continue
-        
-        # Cek bentrok dengan waktu khusus
-        if hari in Config.WAKTU_TIDAK_BOLEH:
-            is_waktu_khusus = any(
-                start <= waktu_start < end or waktu_start <= start < waktu_end
-                for waktu_start, waktu_end in Config.WAKTU_TIDAK_BOLEH[hari]
+        # Jam di-parse sekali per nilai unik, bukan per baris
+        menit_per_jam = {}
+        for jam in pd.unique(jadwal_df['Jam']):
+            rentang = parse_jam(jam)
+            menit_per_jam[jam] = (
+                (time_to_minutes(rentang[0]), time_to_minutes(rentang[1])) if rentang is not None else (-1, -1)
             )
-            if is_waktu_khusus:
-                current_time += timedelta(minutes=90)
-                continue
-        
-        slots.append((start, end))
-        current_time += timedelta(minutes=durasi_menit + 10)  # Tambah jeda antar kelas
-    
-    return slots
-
-def load_data() -> Tuple[pd.DataFrame, ...]:
-    """Memuat data dari file Excel dengan validasi dan error handling"""
-    try:
-        file_path = "data.xlsx"
-        if not os.path.exists(file_path):
-            logging.error("File data.xlsx tidak ditemukan")
-            return None, None, None, None, None, None, None
-        
-        # Baca semua sheet dengan validasi
-        sheets = {
-            "Kelas": None,
-            "matakuliah": None,
-            "Dosen": None,
-            "dosen_matakuliah": None,
-            "Hari": None,
-            "ruangan": None,
-            "availability": pd.DataFrame(columns=['dosen', 'hari', 'jam_mulai', 'jam_selesai'])
-        }
-        
-        for sheet_name in sheets.keys():
-            try:
-                sheets[sheet_name] = pd.read_excel(file_path, sheet_name=sheet_name)
-                logging.info(f"Berhasil memuat sheet {sheet_name}")
-            except Exception as e:
-                logging.warning(f"Gagal memuat sheet {sheet_name}: {str(e)}")
-                if sheet_name == "availability":
-                    continue
-                return None, None, None, None, None, None, None
-        
-        # Bersihkan data dosen_matakuliah
-        if sheets["dosen_matakuliah"] is not None:
-            sheets["dosen_matakuliah"] = sheets["dosen_matakuliah"].dropna()
-        
-        # Perbaiki typo di status matkul
-        if sheets["matakuliah"] is not None and 'Status' in sheets["matakuliah"].columns:
-            sheets["matakuliah"]['Status'] = sheets["matakuliah"]['Status'].str.replace('offlilne', 'offline')
-        
-        return tuple(sheets.values())
-    except Exception as e:
-        logging.error(f"Gagal memuat data: {str(e)}")
-        return None, None, None, None, None, None, None
-
-def save_to_excel(df: pd.DataFrame, sheet_name: str) -> bool:
-    """Menyimpan dataframe ke sheet tertentu dalam file Excel dengan error handling"""
-    try:
-        file_path = "data.xlsx"
-        
-        # Baca file yang ada atau buat baru
-        if os.path.exists(file_path):
-            with pd.ExcelWriter(file_path, engine='openpyxl', mode='a', if_sheet_exists='replace') as writer:
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
-        else:
-            with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
-        
-        logging.info(f"Berhasil menyimpan data ke sheet {sheet_name}")
-        return True
-    except Exception as e:
-        logging.error(f"Gagal menyimpan data ke sheet {sheet_name}: {str(e)}")
-        return False
-
-class ResourceTracker:
-    """Class untuk melacak penggunaan resource (kelas, dosen, ruangan)"""
-    def __init__(self):
-        self.kelas = defaultdict(list)
-        self.dosen = defaultdict(list)
-        self.ruangan = defaultdict(list)
-    
-    def add_schedule(
-        self, 
-        kelas: str, 
-        dosen: str, 
-        ruangan: str, 
-        hari: str, 
-        jam_mulai: dt_time, 
-        jam_selesai: dt_time
-    ) -> None:
-        """Tambahkan jadwal ke resource tracker"""
-        slot = {
-            'hari': hari,
-            'jam_mulai': jam_mulai,
-            'jam_selesai': jam_selesai
-        }
+        menit = jadwal_df['Jam'].map(menit_per_jam)
+        data['mulai'] = menit.str[0].astype('int16')
+        data['selesai'] = menit.str[1].astype('int16')
+        data['jam_asli'] = jadwal_df['Jam'].where(data['mulai'] < 0).astype('category')
         
-        self.kelas[kelas].append(slot)
-        self.dosen[dosen].append(slot)
-        if ruangan and ruangan != "Zoom":
-            self.ruangan[ruangan].append(slot)
-    
-    def is_conflict(
-        self, 
-        kelas: str, 
-        dosen: str, 
-        ruangan: str, 
-        hari: str, 
-        jam_mulai: dt_time, 
-        jam_selesai: dt_time
-    ) -> bool:
-        """Cek apakah ada konflik jadwal"""
-        # Cek konflik kelas
-        for slot in self.kelas.get(kelas, []):
-            if slot['hari'] == hari:
-                if (jam_mulai <= slot['jam_mulai'] < jam_selesai) or \
-                   (jam_mulai < slot['jam_selesai'] <= jam_selesai):
-                    return True
-        
-        # Cek konflik dosen
-        for slot in self.dosen.get(dosen, []):
-            if slot['hari'] == hari:
-                if (jam_mulai <= slot['jam_mulai'] < jam_selesai) or \
-                   (jam_mulai < slot['jam_selesai'] <= jam_selesai):
-                    return True
-        
-        # Cek konflik ruangan (kecuali online)
-        if ruangan and ruangan != "Zoom":
-            for slot in self.ruangan.get(ruangan, []):
-                if slot['hari'] == hari:
-                    if (jam_mulai <= slot['jam_mulai'] < jam_selesai) or \
-                       (jam_mulai < slot['jam_selesai'] <= jam_selesai):
-                        return True
-        
-        return False
-
-def is_dosen_busy(
-    nama_dosen: str, 
-    hari: str, 
-    jam_mulai: dt_time, 
-    jam_selesai: dt_time, 
-    df_availability: pd.DataFrame, 
-    resource_tracker: ResourceTracker
-) -> bool:
-    """Cek apakah dosen sibuk di waktu tertentu"""
-    # Cek dari availability sheet
-    if not df_availability.empty:
-        busy = df_availability[
-            (df_availability['dosen'] == nama_dosen) &
-            (df_availability['hari'] == hari) &
-            (
-                ((df_availability['jam_mulai'] <= jam_mulai) & (df_availability['jam_selesai'] > jam_mulai)) |
-                ((df_availability['jam_mulai'] < jam_selesai) & (df_availability['jam_selesai'] >= jam_selesai)) |
-                ((jam_mulai <= df_availability['jam_mulai']) & (jam_selesai >= df_availability['jam_selesai']))
-            )
-        ]
-        if not busy.empty:
-            return True
-    
-    # Cek dari resource tracker
-    for slot in resource_tracker.dosen.get(nama_dosen, []):
-        if slot['hari'] == hari:
-            if (jam_mulai <= slot['jam_mulai'] < jam_selesai) or \
-               (jam_mulai < slot['jam_selesai'] <= jam_selesai) or \
-               (slot['jam_mulai'] <= jam_mulai and slot['jam_selesai'] >= jam_selesai):
-                return True
-    return False
-
-def cek_beban_dosen(nama_dosen: str, df_jadwal: pd.DataFrame) -> bool:
-    """Cek beban mengajar dosen tidak melebihi MAX_SKS_DOSEN"""
-    if df_jadwal.empty or 'Dosen' not in df_jadwal.columns:
-        return True
+        data['SKS'] = pd.to_numeric(jadwal_df['SKS'], errors='coerce').fillna(0).astype('int8')
+        data['Semester'] = pd.to_numeric(jadwal_df['Semester'], errors='coerce').fillna(0).astype('int8')
+        data['is_locked'] = (
+            jadwal_df['is_locked'].fillna(False).astype(bool) if 'is_locked' in jadwal_df.columns
+            else pd.Series(False, index=jadwal_df.index)
+        )
+        self.df = pd.DataFrame(data, index=jadwal_df.index)
+        self._codes: Dict[str, np.ndarray] = {}
+        self._bitmaps: Dict[Tuple[str, Any], np.ndarray] = {}
+        self._permutasi: Dict[Tuple[str, ...], np.ndarray] = {}
+        self._events: Optional[np.ndarray] = None
     
-    total_sks = df_jadwal[df_jadwal['Dosen'] == nama_dosen]['SKS'].sum()
-    return total_sks < Config.MAX_SKS_DOSEN
-
-def filter_matkul_by_konsentrasi(
-    df_matkul: pd.DataFrame, 
-    semester: int, 
-    konsentrasi: str
-) -> pd.DataFrame:
-    """Filter matkul berdasarkan semester dan konsentrasi"""
-    if df_matkul is None:
-        return pd.DataFrame()
+    def __len__(self) -> int:
+        return len(self.df)
     
-    # Filter berdasarkan semester
-    filtered = df_matkul[df_matkul['semester'] == semester].copy()
+    @staticmethod
+    def _format_menit(mulai: int, selesai: int) -> str:
+        """Format menit mulai/selesai menjadi string HH:MM-HH:MM"""
+        return f"{mulai // 60:02d}:{mulai % 60:02d}-{selesai // 60:02d}:{selesai % 60:02d}"
     
-    # Untuk semester 1 dan 3 hanya matkul umum
-    if semester in [1, 3]:
-        return filtered[filtered['Konsentrasi'] == 'umum']
+    def options(self, kolom: str) -> List[Any]:
+        """Nilai unik satu kolom dalam urutan tampil (Hari menurut urutan hari, lainnya terurut)"""
+        seri = self.df[kolom]
+        if isinstance(seri.dtype, pd.CategoricalDtype):
+            dipakai = seri.cat.remove_unused_categories().cat.categories
+            return list(dipakai) if seri.cat.ordered else sorted(dipakai, key=str)
+        return sorted(seri.unique().tolist())
     
-    # Untuk semester 5 filter berdasarkan konsentrasi
-    if konsentrasi != 'umum':
-        filtered = filtered[
-            filtered['Konsentrasi'].apply(
-                lambda x: konsentrasi in [k.strip() for k in str(x).split(',')]
+    def codes(self, kolom: str) -> np.ndarray:
+        """Kode integer satu kolom (kode kategori, atau nilai untuk kolom numerik); 'Jam' = menit mulai"""
+        if kolom not in self._codes:
+            seri = self.df['mulai' if kolom == 'Jam' else kolom]
+            self._codes[kolom] = (
+                seri.cat.codes.to_numpy() if isinstance(seri.dtype, pd.CategoricalDtype) else seri.to_numpy()
             )
-        ]
-    
-    return filtered
-
-def adjust_sks(df_matkul: pd.DataFrame) -> pd.DataFrame:
-    """Sesuaikan SKS agar tidak melebihi batas maksimal"""
-    if df_matkul.empty:
-        return df_matkul
-    
-    total_sks = df_matkul['sks'].sum()
-    if total_sks <= Config.MAX_SKS_SEMESTER:
-        return df_matkul
-    
-    # Prioritaskan matkul wajib untuk dipertahankan
-    wajib = []
-    for matkul_list in Config.MATKUL_WAJIB.values():
-        wajib.extend(matkul_list)
-    
-    df_wajib = df_matkul[df_matkul['nama'].str.contains('|'.join(wajib))]
-    df_opsional = df_matkul[~df_matkul['nama'].str.contains('|'.join(wajib))]
-    
-    # Kurangi dari matkul opsional terlebih dahulu
-    while total_sks > Config.MAX_SKS_SEMESTER and not df_opsional.empty:
-        df_opsional = df_opsional.iloc[:-1]  # Hapus matkul terakhir
-        total_sks = df_wajib['sks'].sum() + df_opsional['sks'].sum()
-    
-    return pd.concat([df_wajib, df_opsional])
-
-def prioritize_matkul(df_matkul: pd.DataFrame) -> pd.DataFrame:
-    """Prioritaskan matkul berdasarkan SKS dan status wajib"""
-    df = df_matkul.copy()
-    
-    # Tambahkan kolom prioritas
-    df['prioritas'] = df['sks'] * 2  # Matkul dengan SKS lebih besar lebih diprioritaskan
+        return self._codes[kolom]
     
-    # Tingkatkan prioritas untuk matkul wajib
-    wajib = []
-    for matkul_list in Config.MATKUL_WAJIB.values():
-        wajib.extend(matkul_list)
-    
-    df['prioritas'] = df.apply(
-        lambda x: x['prioritas'] + 10 if x['nama'] in wajib else x['prioritas'],
-        axis=1
-    )
-    
-    # Urutkan berdasarkan prioritas (descending)
-    return df.sort_values('prioritas', ascending=False)
-
-def validate_all_data(
-    df_kelas: pd.DataFrame, 
-    df_matkul: pd.DataFrame, 
-    df_dosen: pd.DataFrame, 
-    df_dosen_matkul: pd.DataFrame
-) -> List[str]:
-    """Validasi semua data sebelum generate jadwal"""
-    errors = []
-    
-    if df_kelas is None or df_matkul is None or df_dosen is None or df_dosen_matkul is None:
-        return ["Data tidak lengkap, pastikan semua sheet ada di file Excel"]
-    
-    # Validasi matkul wajib untuk semua semester
-    for semester, matkul_wajib in Config.MATKUL_WAJIB.items():
-        matkul_sem = df_matkul[df_matkul['semester'] == semester]
-        for m in matkul_wajib:
-            if m not in matkul_sem['nama'].values:
-                errors.append(f"Matkul wajib {m} tidak ada di semester {semester}")
-    
-    # Validasi jenis kelas
-    jenis_kelas_valid = ['reguler', 'internasional', 'sabtu', 'karyawan', 'reguler malam']
-    invalid_jenis = df_kelas[~df_kelas['jenis'].isin(jenis_kelas_valid)]
-    if not invalid_jenis.empty:
-        errors.append(f"Jenis kelas tidak valid: {invalid_jenis['jenis'].unique()}")
-    
-    # Validasi hubungan dosen-matkul
-    for _, matkul in df_matkul.iterrows():
-        if df_dosen_matkul[df_dosen_matkul['id_matakuliah'] == matkul['id']].empty:
-            errors.append(f"Matkul {matkul['nama']} tidak memiliki dosen")
-    
-    return errors
-
-def schedule_matkul(
-    matkul: pd.Series,
-    kelas: pd.Series,
-    df_dosen: pd.DataFrame,
-    df_dosen_matkul: pd.DataFrame,
-    df_ruangan: pd.DataFrame,
-    df_availability: pd.DataFrame,
-    resource_tracker: ResourceTracker,
-    ruangan_prioritas: List[str]
-) -> Dict[str, Any]:
-    """Coba menjadwalkan satu mata kuliah"""
-    nama_kelas = kelas['nama']
-    jenis_kelas = kelas['jenis']
-    konsentrasi = kelas.get('konsentrasi', 'umum')
-    
-    # Tentukan apakah harus offline atau bisa online
-    must_offline = any(x in matkul['nama'].lower() for x in ['praktikum', 'lab', 'jaringan'])
-    
-    if must_offline:
-        is_online = False
-        ruangan_options = ruangan_prioritas.copy()
-        random.shuffle(ruangan_options)
-    else:
-        is_online = matkul['Status'].lower().strip() == 'online'
-        ruangan_options = ["Zoom"] if is_online else ruangan_prioritas.copy()
-        if not is_online:
-            random.shuffle(ruangan_options)
-
-    # Atur hari tersedia
-    hari_tersedia = Config.HARI_PRIORITAS.get(jenis_kelas.lower(), ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat'])
+    def bitmap(self, kolom: str, nilai: Any) -> np.ndarray:
+        """Bitmap terpaket baris yang kolomnya bernilai tertentu"""
+        kunci = (kolom, nilai)
+        if kunci not in self._bitmaps:
+            seri = self.df[kolom]
+            if isinstance(seri.dtype, pd.CategoricalDtype):
+                kategori = seri.cat.categories
+                kode = kategori.get_loc(nilai) if nilai in kategori else -2
+                cocok = self.codes(kolom) == kode
+            else:
+                cocok = self.codes(kolom) == nilai
+            self._bitmaps[kunci] = np.packbits(cocok)
+        return self._bitmaps[kunci]
     
-    # Daftar dosen yang tersedia untuk matkul ini
-    dosen_ids = df_dosen_matkul[df_dosen_matkul['id_matakuliah'] == matkul['id']]['id_dosen']
-    dosen_tersedia = df_dosen[df_dosen['id'].isin(dosen_ids)]
+    def permutation(self, by: Sequence[str]) -> np.ndarray:
+        """Permutasi posisi baris terurut menurut kolom by (Hari menurut urutan hari, Jam menurut menit)"""
+        kunci = tuple(by)
+        if kunci not in self._permutasi:
+            # Kategori tak berurutan dibuat dari nilai terurut, jadi urutan kode = urutan nilai.
+            # Kode negatif (nilai kosong, Jam tidak valid) ditaruh paling akhir seperti sort_values
+            urutan = []
+            for k in reversed(kunci):
+                kode = self.codes(k).astype(np.int64)
+                urutan.append(np.where(kode < 0, np.iinfo(np.int64).max, kode))
+            self._permutasi[kunci] = np.lexsort(urutan)
+        return self._permutasi[kunci]
     
-    if dosen_tersedia.empty:
-        return {
-            'Kelas': nama_kelas,
-            'Konsentrasi': konsentrasi,
-            'Hari': 'Cek EdLink',
-            'Jam': 'Cek EdLink',
-            'Mata Kuliah': matkul['nama'],
-            'Dosen': 'Belum Ditentukan',
-            'Ruangan': 'Zoom' if is_online else 'Cek EdLink',
-            'SKS': matkul['sks'],
-            'Semester': matkul['semester'],
-            'Status': 'Online' if is_online else 'Offline',
-            'Keterangan': '⚠️ Tanpa Dosen',
-            'Warna': Config.WARNA_KELAS['Online'] if is_online else Config.WARNA_KELAS.get(konsentrasi, Config.WARNA_KELAS['Offline']),
-            'is_locked': False
-        }
-    
-    # Coba menjadwalkan
-    for _ in range(Config.MAX_SCHEDULING_ATTEMPTS):
-        random.shuffle(hari_tersedia)
-        dosen_tersedia = dosen_tersedia.sample(frac=1)  # Acak urutan dosen
+    def filter_positions(self, filters: Dict[str, Sequence[Any]], by: Sequence[str] = ()) -> np.ndarray:
+        """Posisi baris yang lolos semua filter (kolom -> nilai yang dipilih), terurut menurut by"""
+        gabungan = None
+        for kolom, pilihan in filters.items():
+            if not pilihan:
+                continue
+            bitmap_kolom = np.bitwise_or.reduce([self.bitmap(kolom, nilai) for nilai in pilihan])
+            gabungan = bitmap_kolom if gabungan is None else gabungan & bitmap_kolom
         
-        for hari in hari_tersedia:
-            jam_awal, jam_akhir = Config.JAM_OPERASIONAL.get(jenis_kelas.lower(), (dt_time(8, 0), dt_time(17, 0)))
-            
-            possible_slots = generate_time_slots(jam_awal, jam_akhir, matkul['sks'] * Config.DURASI_SKS, hari, jenis_kelas)
-            
-            for jam_mulai, jam_selesai in possible_slots:
-                for _, dosen in dosen_tersedia.iterrows():
-                    nama_dosen = dosen['nama']
-                    
-                    # Cek ketersediaan dosen
-                    if is_dosen_busy(nama_dosen, hari, jam_mulai, jam_selesai, df_availability, resource_tracker):
-                        continue
-                        
-                    if is_online:
-                        if not resource_tracker.is_conflict(nama_kelas, nama_dosen, None, hari, jam_mulai, jam_selesai):
-                            resource_tracker.add_schedule(nama_kelas, nama_dosen, "Zoom", hari, jam_mulai, jam_selesai)
-                            
-                            return {
-                                'Kelas': nama_kelas,
-                                'Konsentrasi': konsentrasi,
-                                'Hari': hari,
-                                'Jam': f"{jam_mulai.strftime('%H:%M')}-{jam_selesai.strftime('%H:%M')}",
-                                'Mata Kuliah': matkul['nama'],
-                                'Dosen': nama_dosen,
-                                'Ruangan': "Zoom",
-                                'SKS': matkul['sks'],
-                                'Semester': matkul['semester'],
-                                'Status': 'Online',
-                                'Keterangan': '✅',
-                                'Warna': Config.WARNA_KELAS['Online'],
-                                'is_locked': False
-                            }
-                    else:
-                        for ruangan in ruangan_options:
-                            if not resource_tracker.is_conflict(nama_kelas, nama_dosen, ruangan, hari, jam_mulai, jam_selesai):
-                                resource_tracker.add_schedule(nama_kelas, nama_dosen, ruangan, hari, jam_mulai, jam_selesai)
-                                
-                                return {
-                                    'Kelas': nama_kelas,
-                                    'Konsentrasi': konsentrasi,
-                                    'Hari': hari,
-                                    'Jam': f"{jam_mulai.strftime('%H:%M')}-{jam_selesai.strftime('%H:%M')}",
-                                    'Mata Kuliah': matkul['nama'],
-                                    'Dosen': nama_dosen,
-                                    'Ruangan': ruangan,
-                                    'SKS': matkul['sks'],
-                                    'Semester': matkul['semester'],
-                                    'Status': 'Offline',
-                                    'Keterangan': '✅',
-                                    'Warna': Config.WARNA_KELAS.get(konsentrasi, Config.WARNA_KELAS['Offline']),
-                                    'is_locked': False
-                                }
+        urutan = self.permutation(by) if by else np.arange(len(self.df))
+        if gabungan is None:
+            return urutan
+        lolos = np.unpackbits(gabungan, count=len(self.df)).view(bool)
+        return urutan[lolos[urutan]]
     
-    # Jika gagal setelah semua percobaan
-    return {
-        'Kelas': nama_kelas,
-        'Konsentrasi': konsentrasi,
-        'Hari': 'Cek EdLink',
-        'Jam': 'Cek EdLink',
-        'Mata Kuliah': matkul['nama'],
-        'Dosen': random.choice(dosen_tersedia['nama'].tolist()),
-        'Ruangan': 'Zoom' if is_online else 'Cek EdLink',
-        'SKS': matkul['sks'],
-        'Semester': matkul['semester'],
-        'Status': 'Online' if is_online else 'Offline',
-        'Keterangan': f'⚠️ Gagal setelah {Config.MAX_SCHEDULING_ATTEMPTS}x attempt',
-        'Warna': Config.WARNA_KELAS['Online'] if is_online else Config.WARNA_KELAS.get(konsentrasi, Config.WARNA_KELAS['Offline']),
-        'is_locked': False
-    }
-
-def generate_jadwal() -> Optional[pd.DataFrame]:
-    """Generate jadwal kuliah secara otomatis dengan penjadwalan yang lebih cerdas"""
-    # Load data
-    df_kelas, df_matkul, df_dosen, df_dosen_matkul, df_hari, df_ruangan, df_availability = load_data()
-    if df_kelas is None or df_matkul is None or df_dosen is None or df_dosen_matkul is None:
-        st.error("Data tidak lengkap, pastikan semua sheet ada di file Excel")
-        return None
-
-    # Validasi data
-    validation_errors = validate_all_data(df_kelas, df_matkul, df_dosen, df_dosen_matkul)
-    if validation_errors:
-        st.error("Error validasi data:\n- " + "\n- ".join(validation_errors))
-        return None
-
-    # Inisialisasi konsentrasi jika belum ada
-    if 'konsentrasi' not in df_kelas.columns:
-        df_kelas['konsentrasi'] = df_kelas['nama'].apply(
-            lambda x: 'umum' if x[:4] in ['TI24', 'TI23'] else random.choice(Config.KONSENTRASI_OPTIONS)
-        )
+    def view(self, filters: Dict[str, Sequence[Any]], by: Sequence[str] = ()) -> pd.DataFrame:
+        """DataFrame tampilan untuk baris yang lolos filter, sudah terurut"""
+        return self.to_frame(self.filter_positions(filters, by))
     
-    # Prioritaskan ruangan
-    ruangan_prioritas = [r for r in df_ruangan['nama'] if Config.PRIORITAS_RUANGAN_PREFIX in r]
-    ruangan_lain = [r for r in df_ruangan['nama'] if Config.PRIORITAS_RUANGAN_PREFIX not in r]
-    ruangan_prioritas += ruangan_lain
-    
-    jadwal_all = []
-    resource_tracker = ResourceTracker()
+    def to_frame(self, posisi: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """Bentuk DataFrame tampilan (kolom seperti hasil generate) untuk posisi baris tertentu"""
+        df = self.df if posisi is None else self.df.iloc[posisi]
+        hasil = {kolom: df[kolom] for kolom in self.KOLOM_TAMPIL if kolom in df.columns}
+        
+        # String Jam dibentuk sekali per pasangan (mulai, selesai) unik
+        kunci = df['mulai'].astype('int32') * 10000 + df['selesai'].astype('int32')
+        jam_per_kunci = {k: self._format_menit(k // 10000, k % 10000) for k in pd.unique(kunci) if k >= 0}
+        hasil['Jam'] = kunci.map(jam_per_kunci).where(df['mulai'] >= 0, df['jam_asli'].astype(object))
+        hasil['Warna'] = pd.Series(self._warna(df), index=df.index)
+        return pd.DataFrame(hasil, index=df.index)[self.KOLOM_TAMPIL]
     
-    progress_bar = st.progress(0)
-    total_kelas = len(df_kelas)
+    @staticmethod
+    def _warna(df: pd.DataFrame) -> np.ndarray:
+        """Warna tampilan per baris: Warna tersimpan, atau dihitung dari status dan konsentrasi jika kosong"""
+        warna_konsentrasi = df['Konsentrasi'].map(
+            lambda k: Config.WARNA_KELAS.get(k, Config.WARNA_KELAS['Offline'])
+        ).astype(object)
+        warna = np.where(df['Status'] == 'Online', Config.WARNA_KELAS['Online'], warna_konsentrasi)
+        if 'Warna' in df.columns:
+            tersimpan = df['Warna'].astype(object)
+            warna = np.where(tersimpan.notna(), tersimpan, warna)
+        return warna
     
-    for i, (_, kelas) in enumerate(df_kelas.iterrows()):
-        nama_kelas = kelas['nama']
-        jenis_kelas = kelas['jenis']
-        konsentrasi = kelas['konsentrasi']
-        prefix_kelas = nama_kelas[:4]
-        
-        if prefix_kelas not in Config.SEMESTER_KELAS:
-            continue
-
-        semester = Config.SEMESTER_KELAS[prefix_kelas]
+    def _build_events(self) -> np.ndarray:
+        """Array event kalender per baris (None untuk baris yang belum terjadwal)"""
+        df = self.df
+        hari = df['Hari'].cat
+        # Minggu kalender dimulai Senin 2 Januari 2023; hari di luar urutan ditaruh di hari Senin.
+        # Elemen terakhir (0) menampung kode -1 dari Hari yang kosong
+        nomor_hari = np.array(
+            [HARI_INDEX.get(h, 0) for h in hari.categories] + [0], dtype=np.int16
+        )[hari.codes.to_numpy()]
+        tanggal = pd.Series(nomor_hari + 2, index=df.index).map(lambda n: f"2023-01-{n:02d}T")
         
-        # Filter matkul berdasarkan semester dan konsentrasi
-        matkul_kelas = filter_matkul_by_konsentrasi(df_matkul, semester, konsentrasi)
+        menit_unik = pd.unique(np.concatenate([df['mulai'].to_numpy(), df['selesai'].to_numpy()]))
+        jam_per_menit = {m: f"{m // 60:02d}:{m % 60:02d}:00" for m in menit_unik.tolist()}
+        mulai = tanggal + df['mulai'].map(jam_per_menit)
+        selesai = tanggal + df['selesai'].map(jam_per_menit)
+        judul = df['Mata Kuliah'].astype(str) + " (" + df['Kelas'].astype(str) + ")"
         
-        # Sesuaikan SKS
-        matkul_kelas = adjust_sks(matkul_kelas)
+        def teks(kolom: str, bawaan: str) -> List[str]:
+            return df[kolom].astype(object).where(df[kolom].notna(), bawaan).tolist()
         
-        if matkul_kelas.empty:
-            st.warning(f"Tidak ada mata kuliah untuk semester {semester}")
-            continue
-        
-        # Prioritaskan matkul (yang SKS besar dan wajib dijadwal lebih awal)
-        matkul_kelas = prioritize_matkul(matkul_kelas)
-        
-        jadwal_kelas = []
-        
-        for _, matkul in matkul_kelas.iterrows():
-            jadwal = schedule_matkul(
-                matkul, kelas, df_dosen, df_dosen_matkul, 
-                df_ruangan, df_availability, resource_tracker, 
-                ruangan_prioritas
-            )
-            jadwal_kelas.append(jadwal)
-        
-        jadwal_all.extend(jadwal_kelas)
-        progress_bar.progress((i + 1) / total_kelas)
+        events = np.empty(len(df), dtype=object)
+        terjadwal = ((df['mulai'] >= 0) & (df['Hari'] != 'Cek EdLink')).to_numpy()
+        for posisi, judul_i, mulai_i, selesai_i, warna, dosen, sks, status, ruangan, keterangan, konsentrasi in zip(
+            range(len(df)), judul, mulai, selesai, self._warna(df),
+            teks('Dosen', ''), df['SKS'].tolist(), teks('Status', 'Offline'), teks('Ruangan', ''),
+            teks('Keterangan', ''), teks('Konsentrasi', 'umum')
+        ):
+            if not terjadwal[posisi]:
+                continue
+            events[posisi] = {
+                'title': judul_i,
+                'start': mulai_i,
+                'end': selesai_i,
+                'color': warna,
+                'extendedProps': {
+                    'dosen': dosen,
+                    'sks': sks,
+                    'status': status,
+                    'ruangan': ruangan,
+                    'keterangan': keterangan,
+                    'konsentrasi': konsentrasi
+                }
+            }
+        return events
     
-    return pd.DataFrame(jadwal_all)
+    def calendar_events(self, posisi: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """Event kalender untuk posisi baris tertentu (semua baris jika None), dipilih dari array yang di-memo"""
+        if self._events is None:
+            self._events = self._build_events()
+        events = self._events if posisi is None else self._events[posisi]
+        return [event for event in events if event is not None]
+    
+    def beban_dosen(self) -> pd.Series:
+        """Total SKS per dosen, terbesar lebih dulu"""
+        return self.df.groupby('Dosen', observed=True)['SKS'].sum().astype(int).sort_values(ascending=False)
+    
+    def penggunaan_ruangan(self) -> pd.Series:
+        """Jumlah sesi offline per ruangan"""
+        ruangan = self.df['Ruangan']
+        return ruangan[ruangan != 'Zoom'].value_counts().loc[lambda x: x > 0]
+
+def jadwal_store_for(jadwal_df: pd.DataFrame) -> JadwalStore:
+    """Store kolumnar untuk jadwal di session, dibangun ulang hanya jika jadwal berganti"""
+    if st.session_state.get('jadwal_store_src') is not jadwal_df:
+        st.session_state.jadwal_store = JadwalStore(jadwal_df)
+        st.session_state.jadwal_store_src = jadwal_df
+    return st.session_state.jadwal_store
 
 def jadwal_to_calendar_events(jadwal_df: pd.DataFrame) -> List[Dict[str, Any]]:
     """Konversi jadwal ke format event kalender"""
-    events = []
-    
     if jadwal_df.empty:
-        return events
-    
-    for _, row in jadwal_df.iterrows():
-        if row['Hari'] == 'Cek EdLink':
-            continue
-            
-        hari_to_num = {'Senin': 0, 'Selasa': 1, 'Rabu': 2, 'Kamis': 3, 
-                      'Jumat': 4, 'Sabtu': 5, 'Minggu': 6}
-        
-        try:
-            jam_parts = row['Jam'].split('-')
-            if len(jam_parts) != 2:
-                continue
-                
-            start_time = datetime.strptime(jam_parts[0], '%H:%M').time()
-            end_time = datetime.strptime(jam_parts[1], '%H:%M').time()
-            
-            day_number = 2 + hari_to_num.get(row['Hari'], 0)
-            events.append({
-                'title': f"{row['Mata Kuliah']} ({row['Kelas']})",
-                'start': f"2023-01-{day_number:02d}T{start_time.strftime('%H:%M:%S')}",
-                'end': f"2023-01-{day_number:02d}T{end_time.strftime('%H:%M:%S')}",
-                'color': row.get('Warna', Config.WARNA_KELAS['Offline']),
-                'extendedProps': {
-                    'dosen': row.get('Dosen', ''),
-                    'sks': row.get('SKS', 0),
-                    'status': row.get('Status', 'Offline'),
-                    'ruangan': row.get('Ruangan', ''),
-                    'keterangan': row.get('Keterangan', ''),
-                    'konsentrasi': row.get('Konsentrasi', 'umum')
-                }
-            })
-        except Exception as e:
-            logging.warning(f"Gagal memproses jadwal: {row.get('Mata Kuliah', 'Unknown')}. Error: {str(e)}")
-    
-    return events
+        return []
+    return JadwalStore(jadwal_df).calendar_events()
 
-def show_calendar_view(jadwal_df: pd.DataFrame) -> None:
-    """Tampilkan jadwal dalam bentuk kalender interaktif"""
-    if calendar is None:
+def show_calendar_view(events: List[Dict[str, Any]]) -> None:
+    """Tampilkan event jadwal dalam bentuk kalender interaktif"""
+    # Diimpor di sini agar halaman lain tidak ikut memuat komponen kalender
+    try:
+        from streamlit_calendar import calendar
+    except ImportError:
         st.error("Fitur kalender membutuhkan package streamlit-calendar. Install dengan: pip install streamlit-calendar")
         return
     
-    if jadwal_df.empty:
+    if not events:
         st.warning("Tidak ada jadwal untuk ditampilkan")
         return
     
@@ -689,7 +332,7 @@ def show_calendar_view(jadwal_df: pd.DataFrame) -> None:
                 }
             """
         }
-        calendar(events=jadwal_to_calendar_events(jadwal_df), 
+        calendar(events=events, 
                 options=calendar_options, 
                 key="week_calendar")
 
@@ -702,14 +345,15 @@ def show_calendar_view(jadwal_df: pd.DataFrame) -> None:
                 "right": "dayGridMonth,timeGridWeek"
             }
         }
-        calendar(events=jadwal_to_calendar_events(jadwal_df), 
+        calendar(events=events, 
                 options=calendar_options, 
                 key="month_calendar")
 
 def edit_jadwal_manual(
     jadwal_df: pd.DataFrame, 
     df_dosen: pd.DataFrame, 
-    df_ruangan: pd.DataFrame
+    df_ruangan: pd.DataFrame,
+    df_availability: Optional[pd.DataFrame] = None
 ) -> pd.DataFrame:
     """Fitur edit jadwal manual"""
     if jadwal_df.empty:
@@ -717,6 +361,13 @@ def edit_jadwal_manual(
         
     st.subheader("✏️ Edit Jadwal Manual")
     
+    # Indeks konflik dibangun sekali per jadwal, selanjutnya hanya baris yang diedit yang diperiksa ulang
+    if st.session_state.get('conflict_index_src') is not jadwal_df:
+        st.session_state.conflict_index = ConflictIndex(jadwal_df, AvailabilityIndex(df_availability))
+        st.session_state.conflict_index_src = jadwal_df
+        st.session_state.conflict_index_dirty = []
+    conflict_index: ConflictIndex = st.session_state.conflict_index
+    
     edited_df = st.data_editor(
         jadwal_df,
         disabled=["Kelas", "Mata Kuliah", "SKS", "Semester", "Konsentrasi"],
@@ -740,14 +391,37 @@ def edit_jadwal_manual(
             "Warna": st.column_config.Column(disabled=True)
         },
         hide_index=True,
-        use_container_width=True
+        use_container_width=True,
+        key="editor_jadwal"
     )
     
+    # Baris yang diedit sekarang ditambah baris yang diedit sebelumnya (agar edit yang dibatalkan ikut kembali)
+    mulai_cek = time.perf_counter()
+    posisi_diedit = st.session_state.get("editor_jadwal", {}).get("edited_rows", {})
+    label_diedit = [edited_df.index[int(pos)] for pos in posisi_diedit]
+    conflict_index.sync_rows(edited_df, list(dict.fromkeys(st.session_state.conflict_index_dirty + label_diedit)))
+    st.session_state.conflict_index_dirty = label_diedit
+    durasi_cek = (time.perf_counter() - mulai_cek) * 1000
+    
+    if conflict_index.jumlah_konflik:
+        st.error(f"⚠️ {conflict_index.jumlah_konflik} konflik terdeteksi")
+        st.dataframe(pd.DataFrame(conflict_index.conflicts(limit=200)), use_container_width=True, hide_index=True)
+    else:
+        st.success("✅ Tidak ada konflik")
+    st.caption(f"Pemeriksaan {len(label_diedit)} baris yang diedit: {durasi_cek:.1f} ms")
+    
     if st.button("💾 Simpan Perubahan Manual"):
+        # Indeks sudah mencerminkan hasil edit, cukup pindahkan acuannya ke jadwal baru
+        st.session_state.conflict_index_src = edited_df
+        st.session_state.conflict_index_dirty = []
         return edited_df
     return jadwal_df
 
-def generate_report(jadwal_df: pd.DataFrame) -> Dict[str, Any]:
+def generate_report(
+    jadwal_df: pd.DataFrame,
+    availability_index: Optional[AvailabilityIndex] = None,
+    store: Optional[JadwalStore] = None
+) -> Dict[str, Any]:
     """Generate laporan analisis jadwal"""
     if jadwal_df.empty:
         return {
@@ -759,19 +433,22 @@ def generate_report(jadwal_df: pd.DataFrame) -> Dict[str, Any]:
             "penggunaan_ruangan": {}
         }
     
+    store = store or JadwalStore(jadwal_df)
     report = {
-        "total_kelas": jadwal_df['Kelas'].nunique(),
-        "total_matkul": jadwal_df['Mata Kuliah'].nunique(),
-        "total_dosen": jadwal_df['Dosen'].nunique(),
-        "konflik_jadwal": [],
-        "beban_dosen": jadwal_df.groupby('Dosen')['SKS'].sum().sort_values(ascending=False).to_dict(),
-        "penggunaan_ruangan": jadwal_df[jadwal_df['Ruangan'] != 'Zoom']['Ruangan'].value_counts().to_dict()
+        "total_kelas": store.df['Kelas'].nunique(),
+        "total_matkul": store.df['Mata Kuliah'].nunique(),
+        "total_dosen": store.df['Dosen'].nunique(),
+        "konflik_jadwal": ConflictIndex(jadwal_df, availability_index).conflicts(),
+        "beban_dosen": store.beban_dosen().to_dict(),
+        "penggunaan_ruangan": store.penggunaan_ruangan().to_dict()
     }
     
     return report
 
 def send_notification(email: str, subject: str, message: str) -> bool:
     """Kirim notifikasi via email"""
+    import smtplib
+    from email.mime.text import MIMEText
     try:
         msg = MIMEText(message)
         msg['Subject'] = subject
@@ -789,6 +466,7 @@ def send_notification(email: str, subject: str, message: str) -> bool:
 
 def export_to_ical(jadwal_df: pd.DataFrame) -> bytes:
     """Ekspor jadwal ke format iCal"""
+    from icalendar import Calendar, Event
     cal = Calendar()
     cal.add('prodid', '-//Jadwal Kuliah//univ.ac.id//')
     cal.add('version', '2.0')
@@ -829,6 +507,7 @@ def export_to_ical(jadwal_df: pd.DataFrame) -> bytes:
     return cal.to_ical()
 
 def main():
+    setup_logging()
     st.set_page_config(layout="wide", page_title="Sistem Penjadwalan Kuliah TI", page_icon="🎓")
 
     # Initialize session state variables
@@ -881,6 +560,21 @@ def main():
             label_visibility="collapsed"
         )
         
+        storage = get_storage()
+        if isinstance(storage, SQLiteStorage):
+            with st.expander("💾 Penyimpanan SQLite"):
+                st.caption(f"Data disimpan di {storage.path}")
+                if os.path.exists("data.xlsx") and st.button("📥 Import ulang dari data.xlsx"):
+                    if storage.import_xlsx("data.xlsx"):
+                        st.success("Data diimport dari data.xlsx")
+                if st.button("📤 Siapkan Ekspor Excel"):
+                    st.download_button(
+                        label="Download data.xlsx",
+                        data=storage.export_xlsx(),
+                        file_name="data.xlsx",
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                    )
+        
         st.divider()
         st.caption("Jurusan Teknik Informatika")
         st.caption(f"Versi {datetime.now().strftime('%Y-%m-%d')}")
@@ -928,11 +622,43 @@ def main():
         if errors:
             st.error("\n".join(errors))
         else:
+            col_engine, col_runs = st.columns([3, 1])
+            with col_engine:
+                engine = st.radio(
+                    "Mesin Penjadwalan",
+                    options=list(SCHEDULER_ENGINES.keys()),
+                    format_func=lambda x: SCHEDULER_ENGINES[x],
+                    horizontal=True
+                )
+            with col_runs:
+                n_runs = st.number_input(
+                    "Jumlah percobaan paralel",
+                    min_value=1, max_value=64, value=1, step=1,
+                    help="Lebih dari 1: jalankan beberapa generate berseed di semua core CPU lalu ambil yang terbaik"
+                )
+                seed_input = st.text_input(
+                    "Seed",
+                    placeholder="acak",
+                    help="Isi angka untuk mengulang jadwal yang sama persis; kosongkan untuk seed acak"
+                )
+            
+            jadwal_lama = None
+            terkunci = locked_rows(st.session_state.get('jadwal_df'))
+            if terkunci is not None and st.checkbox(
+                f"🔒 Pertahankan {len(terkunci)} baris terkunci",
+                value=True,
+                help="Baris yang dikunci di Edit Manual tidak dijadwalkan ulang"
+            ):
+                jadwal_lama = st.session_state.jadwal_df
+            
             col1, col2 = st.columns([3, 1])
             with col1:
                 if st.button("🔄 Generate Jadwal Baru", type="primary", use_container_width=True):
+                    seed = int(seed_input) if seed_input.strip().lstrip('-').isdigit() else None
+                    if seed_input.strip() and seed is None:
+                        st.warning("Seed harus berupa angka, memakai seed acak")
                     with st.spinner("Membuat jadwal..."):
-                        st.session_state.jadwal_df = generate_jadwal()
+                        st.session_state.jadwal_df = generate_jadwal(engine, int(n_runs), seed, jadwal_lama)
                         if st.session_state.jadwal_df is not None:
                             st.toast("Jadwal berhasil dibuat!", icon="✅")
             
@@ -944,49 +670,108 @@ def main():
         if 'jadwal_df' in st.session_state and st.session_state.jadwal_df is not None:
             st.success("Jadwal berhasil dibuat!")
             
+            if 'run_manifest' in st.session_state:
+                with st.expander("🧾 Manifest Run"):
+                    manifest = st.session_state.run_manifest
+                    st.caption(f"Seed {manifest['seed']} · workbook {manifest['workbook_sha256'][:12]} · jadwal {manifest['jadwal_sha256'][:12]}")
+                    st.json(manifest, expanded=False)
+                    st.download_button(
+                        "📥 Download Manifest (JSON)",
+                        data=json.dumps(manifest, indent=2, ensure_ascii=False),
+                        file_name=f"manifest_{manifest['seed']}.json",
+                        mime="application/json"
+                    )
+            
+            if 'jadwal_data' in st.session_state:
+                data_baru = load_data()
+                if data_baru[0] is not None and data_hash(data_baru) != data_hash(st.session_state.jadwal_data):
+                    st.info("Data workbook berubah sejak jadwal ini dibuat.")
+                    if st.button("⚡ Perbarui Jadwal (Inkremental)", help="Jadwalkan ulang hanya sesi yang terdampak perubahan data"):
+                        with st.spinner("Memperbarui jadwal..."):
+                            jadwal_baru, statistik = reschedule_incremental(
+                                st.session_state.jadwal_df, st.session_state.jadwal_data, data_baru
+                            )
+                        if jadwal_baru is None:
+                            st.warning(
+                                f"Sheet {', '.join(statistik['perlu_generate_ulang'])} berubah, "
+                                "silakan generate ulang jadwal."
+                            )
+                        else:
+                            st.session_state.jadwal_df = jadwal_baru
+                            st.session_state.jadwal_data = data_baru
+                            st.toast(
+                                f"{statistik['dilepas']} sesi dijadwalkan ulang, {statistik['dicoba_lagi']} sesi tertunda dicoba lagi "
+                                f"({statistik['berhasil']} berhasil, {statistik['gagal']} gagal) dalam {statistik['durasi_detik']:.2f} detik",
+                                icon="⚡"
+                            )
+                            if statistik['terkunci_tidak_valid']:
+                                st.warning(f"{statistik['terkunci_tidak_valid']} baris terkunci tidak lagi valid, periksa secara manual.")
+                            st.rerun()
+            
+            with st.expander("✨ Optimasi Jadwal"):
+                st.caption("Perbaiki prioritas ruangan, pemerataan beban dosen, jeda kosong, dan jumlah hari kuliah tanpa menimbulkan bentrok. Baris terkunci tidak diubah.")
+                durasi_optimasi = st.slider("Batas waktu (detik)", 1, 60, Config.OPTIMIZER_TIME_BUDGET)
+                if st.button("✨ Jalankan Optimasi"):
+                    df_kelas, df_matkul, df_dosen, df_dosen_matkul, _, df_ruangan, df_availability = load_data()
+                    with st.spinner("Mengoptimasi jadwal..."):
+                        st.session_state.jadwal_df, statistik = optimize_jadwal(
+                            st.session_state.jadwal_df,
+                            df_kelas,
+                            df_matkul,
+                            DosenMatkulIndex(df_dosen, df_dosen_matkul),
+                            AvailabilityIndex(df_availability),
+                            prepare_ruangan_prioritas(df_ruangan),
+                            durasi_optimasi
+                        )
+                    st.success(
+                        f"Skor {statistik['skor_awal']:.0f} → {statistik['skor_akhir']:.0f} "
+                        f"({statistik['langkah_dicoba']:,} langkah, {statistik['langkah_per_detik']:,.0f} langkah/detik)"
+                    )
+            
+            store = jadwal_store_for(st.session_state.jadwal_df)
             with st.expander("🔍 Filter Jadwal", expanded=True):
                 col1, col2, col3, col4, col5 = st.columns(5)
                 with col1:
                     filter_kelas = st.multiselect(
                         "Kelas",
-                        options=st.session_state.jadwal_df['Kelas'].unique()
+                        options=store.options('Kelas')
                     )
                 with col2:
                     filter_konsentrasi = st.multiselect(
                         "Konsentrasi",
-                        options=st.session_state.jadwal_df['Konsentrasi'].unique()
+                        options=store.options('Konsentrasi')
                     )
                 with col3:
                     filter_semester = st.multiselect(
                         "Semester",
-                        options=st.session_state.jadwal_df['Semester'].unique()
+                        options=store.options('Semester')
                     )
                 with col4:
                     filter_status = st.multiselect(
                         "Status",
-                        options=st.session_state.jadwal_df['Status'].unique(),
-                        default=['Online', 'Offline']
+                        options=store.options('Status'),
+                        default=[s for s in ['Online', 'Offline'] if s in store.options('Status')]
                     )
                 with col5:
                     filter_hari = st.multiselect(
                         "Hari",
-                        options=st.session_state.jadwal_df['Hari'].unique()
+                        options=store.options('Hari')
                     )
             
-            filtered_df = st.session_state.jadwal_df.copy()
-            if filter_kelas:
-                filtered_df = filtered_df[filtered_df['Kelas'].isin(filter_kelas)]
-            if filter_konsentrasi:
-                filtered_df = filtered_df[filtered_df['Konsentrasi'].isin(filter_konsentrasi)]
-            if filter_semester:
-                filtered_df = filtered_df[filtered_df['Semester'].isin(filter_semester)]
-            if filter_status:
-                filtered_df = filtered_df[filtered_df['Status'].isin(filter_status)]
-            if filter_hari:
-                filtered_df = filtered_df[filtered_df['Hari'].isin(filter_hari)]
+            # String tampilan hanya dibentuk untuk baris yang lolos filter
+            filtered_df = store.view(
+                {
+                    'Kelas': filter_kelas,
+                    'Konsentrasi': filter_konsentrasi,
+                    'Semester': filter_semester,
+                    'Status': filter_status,
+                    'Hari': filter_hari,
+                },
+                by=('Kelas', 'Hari', 'Jam')
+            )
             
             st.dataframe(
-                filtered_df.sort_values(['Kelas', 'Hari', 'Jam']),
+                filtered_df,
                 height=600,
                 use_container_width=True,
                 column_config={
@@ -1036,8 +821,7 @@ def main():
                     else:
                         new_id = max(df_dosen['id']) + 1 if df_dosen is not None and not df_dosen.empty else 1
                         new_dosen = pd.DataFrame([{'id': new_id, 'nama': nama}])
-                        updated_dosen = pd.concat([df_dosen, new_dosen], ignore_index=True) if df_dosen is not None else new_dosen
-                        if save_to_excel(updated_dosen, "Dosen"):
+                        if get_storage().insert_rows("Dosen", new_dosen):
                             st.success("Dosen berhasil ditambahkan!")
                             st.rerun()
             
@@ -1049,10 +833,16 @@ def main():
                 if not df_dosen.empty:
                     selected_dosen = st.selectbox("Pilih Dosen untuk Dihapus", df_dosen['nama'])
                     if st.button("🗑️ Hapus Dosen", type="secondary"):
-                        updated_dosen = df_dosen[df_dosen['nama'] != selected_dosen]
-                        if save_to_excel(updated_dosen, "Dosen"):
+                        # Dosen dan hubungan mengajarnya dihapus dalam satu transaksi
+                        id_dihapus = df_dosen.loc[df_dosen['nama'] == selected_dosen, 'id'].tolist()
+                        if get_storage().delete_rows({
+                            "Dosen": {'nama': [selected_dosen]},
+                            "dosen_matakuliah": {'id_dosen': id_dihapus},
+                        }):
                             st.success("Dosen dihapus!")
                             st.rerun()
+                        else:
+                            st.error("Gagal menyimpan perubahan, coba lagi")
             else:
                 st.warning("Data dosen tidak tersedia")
         
@@ -1078,8 +868,7 @@ def main():
                             'semester': semester, 'Status': status,
                             'Konsentrasi': konsentrasi
                         }])
-                        updated_matkul = pd.concat([df_matkul, new_matkul], ignore_index=True) if df_matkul is not None else new_matkul
-                        if save_to_excel(updated_matkul, "matakuliah"):
+                        if get_storage().insert_rows("matakuliah", new_matkul):
                             st.success("Matakuliah berhasil ditambahkan!")
                             st.rerun()
             
@@ -1109,8 +898,7 @@ def main():
                     else:
                         new_id = max(df_dosen_matkul['id']) + 1 if df_dosen_matkul is not None and not df_dosen_matkul.empty else 1
                         new_link = pd.DataFrame([{'id': new_id, 'id_dosen': dosen_id, 'id_matakuliah': matkul_id}])
-                        updated_link = pd.concat([df_dosen_matkul, new_link], ignore_index=True) if df_dosen_matkul is not None else new_link
-                        if save_to_excel(updated_link, "dosen_matakuliah"):
+                        if get_storage().insert_rows("dosen_matakuliah", new_link):
                             st.success("Berhasil dihubungkan!")
                             st.rerun()
             
@@ -1173,7 +961,16 @@ def main():
         if 'jadwal_df' not in st.session_state or st.session_state.jadwal_df is None:
             st.warning("Generate jadwal terlebih dahulu")
         else:
-            show_calendar_view(st.session_state.jadwal_df)
+            store = jadwal_store_for(st.session_state.jadwal_df)
+            col1, col2 = st.columns(2)
+            with col1:
+                filter_kelas = st.multiselect("Filter Kelas", store.options('Kelas'), key="kalender_kelas")
+            with col2:
+                filter_dosen = st.multiselect("Filter Dosen", store.options('Dosen'), key="kalender_dosen")
+            
+            # Event dibentuk sekali per jadwal, filter hanya memilih posisi baris
+            posisi = store.filter_positions({'Kelas': filter_kelas, 'Dosen': filter_dosen})
+            show_calendar_view(store.calendar_events(posisi))
 
     elif menu_option == "✏️ Edit Manual":
         st.title("✏️ Edit Jadwal Manual")
@@ -1186,7 +983,8 @@ def main():
             st.session_state.jadwal_df = edit_jadwal_manual(
                 st.session_state.jadwal_df, 
                 df_dosen, 
-                df_ruangan
+                df_ruangan,
+                load_data()[6]
             )
 
     elif menu_option == "📊 Laporan":
@@ -1195,7 +993,16 @@ def main():
         if 'jadwal_df' not in st.session_state or st.session_state.jadwal_df is None:
             st.warning("Belum ada jadwal yang digenerate")
         else:
-            report = generate_report(st.session_state.jadwal_df)
+            report = generate_report(
+                st.session_state.jadwal_df, AvailabilityIndex(load_data()[6]), jadwal_store_for(st.session_state.jadwal_df)
+            )
+            
+            st.subheader("Konflik Jadwal")
+            if report['konflik_jadwal']:
+                st.error(f"Ditemukan {len(report['konflik_jadwal'])} konflik")
+                st.dataframe(pd.DataFrame(report['konflik_jadwal']), use_container_width=True, hide_index=True)
+            else:
+                st.success("Tidak ada konflik jadwal")
             
             st.subheader("Statistik Dosen")
             if report['beban_dosen']:
@@ -1253,12 +1060,15 @@ def main():
                             'jam_selesai': jam_selesai
                         }])
                         
-                        if df_availability is None or df_availability.empty:
-                            updated_availability = new_availability
-                        else:
-                            updated_availability = pd.concat([df_availability, new_availability], ignore_index=True)
+                        # Interval baru digabung dengan interval dosen yang sama di hari itu
+                        kriteria = {'dosen': [selected_dosen], 'hari': [hari]}
+                        if df_availability is not None and not df_availability.empty:
+                            lama = df_availability[
+                                (df_availability['dosen'] == selected_dosen) & (df_availability['hari'] == hari)
+                            ]
+                            new_availability = coalesce_availability(pd.concat([lama, new_availability], ignore_index=True))
                         
-                        if save_to_excel(updated_availability, "availability"):
+                        if get_storage().replace_rows("availability", kriteria, new_availability):
                             st.success("Ketersediaan dosen berhasil disimpan!")
                             st.rerun()
             
@@ -1277,10 +1087,16 @@ def main():
                     )
                     
                     if st.button("🗑️ Hapus Ketersediaan", type="secondary"):
-                        updated_availability = df_availability.drop(index=selected_index).reset_index(drop=True)
-                        if save_to_excel(updated_availability, "availability"):
+                        baris = df_availability.loc[selected_index]
+                        if get_storage().delete_rows({"availability": {
+                            kolom: [baris[kolom]] for kolom in ['dosen', 'hari', 'jam_mulai', 'jam_selesai']
+                        }}):
                             st.success("Ketersediaan dihapus!")
                             st.rerun()
+                
+                if st.button("🧹 Gabungkan Interval yang Beririsan"):
+                    sebelum, sesudah = normalize_stored_availability(get_storage())
+                    st.success(f"{sebelum} baris dirapikan menjadi {sesudah} baris")
             else:
                 st.info("Belum ada data ketersediaan dosen")
         
@@ -1290,28 +1106,40 @@ def main():
             
             uploaded_file = st.file_uploader("Upload File", type=["xlsx", "csv"])
             
+            stats_import = st.session_state.pop('import_stats', None)
+            if stats_import is not None:
+                st.success(
+                    f"Data ketersediaan berhasil diimport! {stats_import['ditambahkan']} baris baru dari "
+                    f"{stats_import['dibaca']} baris ({stats_import['duplikat']} duplikat, "
+                    f"{stats_import['tidak_valid']} tidak valid dilewati, {stats_import['digabung']} baris digabung, "
+                    f"{stats_import['durasi_detik']:.1f} detik)"
+                )
+                if stats_import['contoh_tidak_valid'] is not None:
+                    st.caption("Contoh baris tidak valid")
+                    st.dataframe(stats_import['contoh_tidak_valid'], use_container_width=True)
+            
             if uploaded_file is not None:
                 try:
-                    if uploaded_file.name.endswith('.xlsx'):
-                        df_import = pd.read_excel(uploaded_file)
-                    else:
-                        df_import = pd.read_csv(uploaded_file)
+                    # Hanya beberapa baris pertama yang dibaca untuk pratinjau
+                    df_pratinjau = read_availability_preview(uploaded_file, uploaded_file.name)
                     
                     # Validasi kolom
-                    required_cols = ['dosen', 'hari', 'jam_mulai', 'jam_selesai']
-                    if all(col in df_import.columns for col in required_cols):
+                    if all(col in df_pratinjau.columns for col in KOLOM_AVAILABILITY):
                         st.success("File berhasil dibaca")
-                        st.dataframe(df_import, use_container_width=True)
+                        st.caption(f"Pratinjau {len(df_pratinjau)} baris pertama")
+                        st.dataframe(df_pratinjau, use_container_width=True)
                         
                         if st.button("💾 Simpan Data Import"):
-                            if df_availability is None or df_availability.empty:
-                                updated_availability = df_import
-                            else:
-                                updated_availability = pd.concat([df_availability, df_import], ignore_index=True)
-                            
-                            if save_to_excel(updated_availability, "availability"):
-                                st.success("Data ketersediaan berhasil diimport!")
-                                st.rerun()
+                            progress_bar = st.progress(0.0)
+                            st.session_state.import_stats = import_availability(
+                                uploaded_file,
+                                uploaded_file.name,
+                                get_storage(),
+                                df_availability,
+                                dosen_dikenal=set(df_dosen['nama']) if df_dosen is not None else None,
+                                progress_callback=lambda p, n: progress_bar.progress(p, text=f"{n} baris diproses")
+                            )
+                            st.rerun()
                     else:
                         st.error("Format file tidak valid. Pastikan ada kolom: dosen, hari, jam_mulai, jam_selesai")
                 except Exception as e:
@@ -1324,13 +1152,13 @@ def main():
             st.warning("Belum ada jadwal yang digenerate")
         else:
             df_dosen = load_data()[2]
-            jadwal_df = st.session_state.jadwal_df
+            store = jadwal_store_for(st.session_state.jadwal_df)
             
             col1, col2 = st.columns([3, 1])
             with col1:
                 selected_dosen = st.selectbox(
                     "Pilih Dosen",
-                    options=sorted(jadwal_df['Dosen'].unique()),
+                    options=store.options('Dosen'),
                     index=0
                 )
             
@@ -1339,8 +1167,9 @@ def main():
                 if st.button("🔄 Refresh"):
                     st.rerun()
             
-            # Filter jadwal berdasarkan dosen
-            filtered_jadwal = jadwal_df[jadwal_df['Dosen'] == selected_dosen]
+            # Filter jadwal berdasarkan dosen, string tampilan hanya untuk baris dosen ini
+            posisi_dosen = store.filter_positions({'Dosen': [selected_dosen]}, by=('Hari', 'Jam'))
+            filtered_jadwal = store.to_frame(posisi_dosen)
             
             if not filtered_jadwal.empty:
                 # Hitung total SKS
@@ -1350,7 +1179,7 @@ def main():
                 # Tampilkan jadwal
                 st.subheader(f"Jadwal Mengajar {selected_dosen}")
                 st.dataframe(
-                    filtered_jadwal.sort_values(['Hari', 'Jam']),
+                    filtered_jadwal,
                     use_container_width=True,
                     hide_index=True,
                     column_config={
@@ -1372,7 +1201,7 @@ def main():
                 
                 # Tampilkan dalam bentuk kalender
                 st.subheader("Kalender")
-                show_calendar_view(filtered_jadwal)
+                show_calendar_view(store.calendar_events(posisi_dosen))
             else:
                 st.warning(f"Tidak ada jadwal untuk dosen {selected_dosen}")
 
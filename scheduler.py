@@ -0,0 +1,3135 @@
+import argparse
+import numpy as np
+import pandas as pd
+from datetime import datetime, time as dt_time, timedelta, date
+import io
+from functools import lru_cache
+from collections import defaultdict
+from bisect import bisect_left, insort
+import random
+import math
+import time
+import os
+import re
+import shutil
+import sqlite3
+import sys
+from contextlib import closing
+import warnings
+import hashlib
+import json
+import platform
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import logging
+from typing import Dict, List, Tuple, Optional, Any, NamedTuple, Sequence, Callable, Iterator, Set
+
+# ========== SETUP LOGGING ==========
+def setup_logging(filename: str = 'scheduler.log') -> None:
+    """Arahkan log ke file; dipanggil dari entry point (CLI dan aplikasi), bukan saat modul diimpor
+    
+    Tidak berbuat apa-apa jika root logger sudah punya handler, misalnya di bawah pytest.
+    """
+    logging.basicConfig(
+        filename=filename,
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+# ========== KONFIGURASI UTAMA ==========
+warnings.filterwarnings("ignore", category=UserWarning)
+
+class Config:
+    SEMESTER_KELAS = {"TI24": 1, "TI23": 3, "TI22": 5}
+    KONSENTRASI_OPTIONS = ["AI", "software", "cybersecurity", "umum"]
+    MAX_SKS_SEMESTER = 21
+    MAX_SKS_DOSEN = 12  # None berarti tanpa batas beban mengajar
+    DURASI_SKS = 50  # menit per SKS
+    MAX_SCHEDULING_ATTEMPTS = 20
+    CPSAT_TIME_LIMIT = 15  # satuan waktu deterministik CP-SAT (tidak bergantung kecepatan mesin)
+    CPSAT_WORKERS = 8  # jumlah worker tetap agar seed yang sama memberi hasil yang sama di mesin mana pun
+    CPSAT_WALL_LIMIT = 300  # detik, pengaman; jika tercapai hasil CP-SAT tidak dapat diulang
+    BACKTRACK_MAX_NODES = 20000  # batas jumlah percobaan penempatan mesin backtracking
+    BACKTRACK_MAX_MUNDUR = 200  # batas langkah mundur sebelum tugas yang buntu dilewati
+    OPTIMIZER_TIME_BUDGET = 5  # detik
+    CACHE_DIR = ".jadwal_cache"
+    CACHE_MAX_MB = 200  # batas ukuran cache hasil generate sebelum entri lama dibuang
+    WORKBOOK_LOCK_TIMEOUT = 10  # detik menunggu lock workbook sebelum menyerah
+    WORKBOOK_LOCK_STALE = 60  # detik sebelum lock yang pemiliknya tidak bisa diperiksa dianggap basi
+    STORAGE_BACKEND = "excel"  # "excel" (data.xlsx) atau "sqlite"
+    SQLITE_PATH = "data.db"  # dibuat dari data.xlsx saat pertama kali dipakai
+    IMPORT_CHUNK_ROWS = 5000  # baris per potongan saat import ketersediaan
+    IMPORT_PREVIEW_ROWS = 50  # baris pratinjau file import yang ditampilkan
+    IMPORT_CONTOH_TIDAK_VALID = 20  # contoh baris tidak valid yang dilaporkan
+    
+    # Bobot kualitas lunak untuk optimasi jadwal
+    BOBOT_HARI_KELAS = 10  # per hari kuliah sebuah kelas
+    BOBOT_JEDA_KELAS = 1  # per 10 menit jeda kosong mahasiswa
+    BOBOT_RUANGAN_NON_PRIORITAS = 2  # per sesi offline di luar ruangan prioritas
+    BOBOT_BEBAN_DOSEN = 0.1  # per kuadrat SKS dosen (mendorong beban merata)
+    PRIORITAS_RUANGAN_PREFIX = "B4"
+    URUTAN_HARI = ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu']
+    
+    HARI_PRIORITAS = {
+        'reguler': ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat'],
+        'internasional': ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat'],
+        'sabtu': ['Sabtu'],
+        'karyawan': ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu'],
+        'reguler malam': ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat']
+    }
+    
+    JAM_OPERASIONAL = {
+        'reguler': (dt_time(8, 0), dt_time(17, 0)),
+        'internasional': (dt_time(8, 0), dt_time(17, 0)),
+        'sabtu': (dt_time(8, 0), dt_time(17, 0)),
+        'karyawan': (dt_time(19, 0), dt_time(21, 0)),
+        'reguler malam': (dt_time(19, 0), dt_time(21, 0))
+    }
+    
+    WAKTU_TIDAK_BOLEH = {
+        'Jumat': [(dt_time(11, 30), dt_time(13, 0))],  # Waktu sholat Jumat
+    }
+    
+    ISTIRAHAT = [
+        (dt_time(12, 0), dt_time(13, 0)),  # Istirahat siang
+    ]
+    
+    WARNA_KELAS = {
+        'Online': '#4e79a7',
+        'Offline': '#f28e2b',
+        'Karyawan': '#59a14f',
+        'Sabtu': '#e15759',
+        'Internasional': '#edc948',
+        'AI': '#76b7b2',
+        'software': '#59a14f',
+        'cybersecurity': '#e15759',
+        'Locked': '#d62728',
+        'umum': '#bab0ac'
+    }
+    
+    MATKUL_WAJIB = {
+        1: ['Algoritma dan Struktur Data', 'Logika Informatika', 'Kalkulus', 'Statistika dan Probabilitas'],
+        3: ['Metode Numerik', 'Pemrograman Berbasis Platform', 'Jaringan Komputer dan Keamanan Informasi', 'Rekayasa Perangkat Lunak'],
+        5: ['Proyek Perangkat Lunak', 'Metodologi Penelitian', 'Basis Data']
+    }
+
+# Indeks hari untuk penyimpanan bitmask per hari
+HARI_INDEX = {hari: i for i, hari in enumerate(Config.URUTAN_HARI)}
+
+# Mesin penjadwalan yang tersedia
+SCHEDULER_ENGINES = {
+    'greedy': 'Greedy acak (cepat)',
+    'backtracking': 'Backtracking MRV',
+    'cpsat': 'CP-SAT (optimal, butuh ortools)'
+}
+
+# ========== UTILITY FUNCTIONS ==========
+def load_cp_model() -> Optional[Any]:
+    """Modul CP-SAT ortools, baru diimpor saat mesin CP-SAT dipakai (None jika ortools tidak terpasang)"""
+    try:
+        from ortools.sat.python import cp_model
+    except ImportError:
+        return None
+    return cp_model
+
+def parse_time(time_str: str) -> dt_time:
+    """Mengubah string waktu menjadi objek time dengan error handling"""
+    if isinstance(time_str, str):
+        try:
+            if len(time_str.split(':')) == 2:
+                return datetime.strptime(time_str, '%H:%M').time()
+            return datetime.strptime(time_str, '%H:%M:%S').time()
+        except ValueError as e:
+            logging.warning(f"Gagal parse waktu: {time_str}, error: {str(e)}")
+            return dt_time(8, 0)
+    elif isinstance(time_str, dt_time):
+        return time_str
+    return dt_time(8, 0)
+
+def time_to_minutes(waktu: dt_time) -> int:
+    """Konversi objek time menjadi menit sejak pukul 00:00"""
+    return waktu.hour * 60 + waktu.minute
+
+@lru_cache(maxsize=None)
+def minutes_to_time(menit: int) -> dt_time:
+    """Kebalikan time_to_minutes"""
+    return dt_time(menit // 60, menit % 60)
+
+@lru_cache(maxsize=None)
+def interval_mask(jam_mulai: dt_time, jam_selesai: dt_time) -> int:
+    """Bitmask interval [jam_mulai, jam_selesai) dengan 1 bit per menit"""
+    start = time_to_minutes(jam_mulai)
+    end = time_to_minutes(jam_selesai)
+    if end <= start:
+        return 0
+    return ((1 << (end - start)) - 1) << start
+
+def generate_time_slots(
+    jam_awal: dt_time, 
+    jam_akhir: dt_time, 
+    durasi_menit: int, 
+    hari: str, 
+    jenis_kelas: str
+) -> Tuple[Tuple[dt_time, dt_time], ...]:
+    """Generate slot waktu yang tersedia dengan penyesuaian khusus"""
+    # Tabel Config ikut menjadi kunci cache sehingga perubahan Config otomatis menghasilkan grid baru
+    return _slot_grid(
+        parse_time(jam_awal),
+        parse_time(jam_akhir),
+        int(durasi_menit),
+        hari,
+        jenis_kelas.lower(),
+        tuple(Config.ISTIRAHAT),
+        tuple(Config.WAKTU_TIDAK_BOLEH.get(hari, ()))
+    )
+
+@lru_cache(maxsize=None)
+def _slot_grid(
+    jam_awal: dt_time, 
+    jam_akhir: dt_time, 
+    durasi_menit: int, 
+    hari: str, 
+    jenis_kelas: str,
+    istirahat: Tuple[Tuple[dt_time, dt_time], ...],
+    waktu_tidak_boleh: Tuple[Tuple[dt_time, dt_time], ...]
+) -> Tuple[Tuple[dt_time, dt_time], ...]:
+    """Hitung grid slot waktu untuk satu kombinasi parameter (di-memo)"""
+    slots = []
+    
+    dummy_date = date(2023, 1, 1)
+    current_time = datetime.combine(dummy_date, jam_awal)
+    end_time = datetime.combine(dummy_date, jam_akhir)
+    durasi = timedelta(minutes=durasi_menit)
+    
+    # Penyesuaian khusus untuk jenis kelas
+    if jenis_kelas in ['karyawan', 'reguler malam']:
+        current_time = datetime.combine(dummy_date, dt_time(19, 0))
+        end_time = datetime.combine(dummy_date, dt_time(21, 0))
+    
+    while current_time + durasi <= end_time:
+        start = current_time.time()
+        end = (current_time + durasi).time()
+        
+        # Cek bentrok dengan waktu istirahat
+        is_istirahat = any(
+            start <= istirahat_start < end or istirahat_start <= start < istirahat_end 
+            for istirahat_start, istirahat_end in istirahat
+        )
+        
+        if is_istirahat:
+            current_time += timedelta(minutes=60)
+            continue
+        
+        # Cek bentrok dengan waktu khusus
+        is_waktu_khusus = any(
+            start <= waktu_start < end or waktu_start <= start < waktu_end
+            for waktu_start, waktu_end in waktu_tidak_boleh
+        )
+        if is_waktu_khusus:
+            current_time += timedelta(minutes=90)
+            continue
+        
+        slots.append((start, end))
+        current_time += timedelta(minutes=durasi_menit + 10)  # Tambah jeda antar kelas
+    
+    return tuple(slots)
+
+# Cache workbook di dalam proses: path -> ((mtime_ns, size), {nama_sheet: DataFrame})
+_WORKBOOK_CACHE: Dict[str, Tuple[Tuple[int, int], Dict[str, pd.DataFrame]]] = {}
+
+def _workbook_signature(file_path: str) -> Tuple[int, int]:
+    """Tanda tangan file (mtime, ukuran) untuk mendeteksi perubahan workbook"""
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+def read_workbook(file_path: str = "data.xlsx") -> Dict[str, pd.DataFrame]:
+    """Parse semua sheet workbook sekali jalan, hasilnya di-cache berdasarkan mtime dan ukuran file"""
+    signature = _workbook_signature(file_path)
+    cached = _WORKBOOK_CACHE.get(file_path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    
+    sheets = pd.read_excel(file_path, sheet_name=None)
+    logging.info(f"Berhasil memuat workbook {file_path} ({len(sheets)} sheet)")
+    _WORKBOOK_CACHE[file_path] = (signature, sheets)
+    return sheets
+
+def invalidate_workbook_cache(file_path: str = "data.xlsx") -> None:
+    """Hapus entri cache workbook setelah file ditulis ulang"""
+    _WORKBOOK_CACHE.pop(file_path, None)
+
+def load_data(storage: Optional[Any] = None) -> Tuple[pd.DataFrame, ...]:
+    """Memuat data dari backend penyimpanan dengan validasi dan error handling"""
+    try:
+        storage = storage or get_storage()
+        if not storage.exists():
+            logging.error(f"File {storage.path} tidak ditemukan")
+            return None, None, None, None, None, None, None
+        
+        # Baca semua sheet dengan validasi
+        sheets = {
+            "Kelas": None,
+            "matakuliah": None,
+            "Dosen": None,
+            "dosen_matakuliah": None,
+            "Hari": None,
+            "ruangan": None,
+            "availability": pd.DataFrame(columns=['dosen', 'hari', 'jam_mulai', 'jam_selesai'])
+        }
+        
+        workbook = storage.read_tables()
+        for sheet_name in sheets.keys():
+            if sheet_name in workbook:
+                # Salin agar perubahan oleh pemanggil tidak mengotori cache
+                sheets[sheet_name] = workbook[sheet_name].copy()
+                continue
+            logging.warning(f"Gagal memuat sheet {sheet_name}: sheet tidak ditemukan")
+            if sheet_name == "availability":
+                continue
+            return None, None, None, None, None, None, None
+        
+        # Bersihkan data dosen_matakuliah
+        if sheets["dosen_matakuliah"] is not None:
+            sheets["dosen_matakuliah"] = sheets["dosen_matakuliah"].dropna()
+        
+        # Perbaiki typo di status matkul
+        if sheets["matakuliah"] is not None and 'Status' in sheets["matakuliah"].columns:
+            sheets["matakuliah"]['Status'] = sheets["matakuliah"]['Status'].str.replace('offlilne', 'offline')
+        
+        return tuple(sheets.values())
+    except Exception as e:
+        logging.error(f"Gagal memuat data: {str(e)}")
+        return None, None, None, None, None, None, None
+
+def _proses_hidup(pid: int) -> Optional[bool]:
+    """Cek apakah proses dengan pid ini masih berjalan di mesin ini (None jika tidak bisa dipastikan)"""
+    if pid <= 0:
+        return None
+    if os.name == 'nt':
+        # os.kill di Windows menghentikan proses, jadi pakai OpenProcess lalu cek status keluarnya
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        try:
+            kode = ctypes.c_ulong()
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(kode)):
+                return None
+            return kode.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # proses ada tetapi milik pengguna lain
+    except OSError:
+        return None
+    return True
+
+class WorkbookLock:
+    """Lock file lintas platform (os.O_CREAT | os.O_EXCL) agar hanya satu proses menulis workbook
+    
+    File lock berisi pid dan nama host pemiliknya. Lock milik proses yang sudah mati di host yang
+    sama langsung diambil alih; umur lock (stale_after) hanya dipakai bila pemiliknya tidak bisa
+    diperiksa, misalnya lock dari host lain di drive bersama.
+    """
+    def __init__(
+        self,
+        file_path: str = "data.xlsx",
+        timeout: float = Config.WORKBOOK_LOCK_TIMEOUT,
+        stale_after: float = Config.WORKBOOK_LOCK_STALE
+    ):
+        self.path = file_path + ".lock"
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self.waktu_tunggu = 0.0
+    
+    def _pemilik(self) -> Optional[str]:
+        """Isi file lock ("pid host"), atau None jika lock sudah hilang"""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return None
+    
+    def _basi(self, pemilik: str) -> bool:
+        """Apakah lock dengan isi ini tertinggal dari proses yang sudah tidak berjalan"""
+        bagian = pemilik.split(maxsplit=1)
+        if len(bagian) == 2 and bagian[0].isdigit() and bagian[1] == platform.node():
+            hidup = _proses_hidup(int(bagian[0]))
+            if hidup is not None:
+                return not hidup
+        try:
+            return time.time() - os.path.getmtime(self.path) > self.stale_after
+        except FileNotFoundError:
+            return False
+    
+    def __enter__(self) -> "WorkbookLock":
+        mulai = time.perf_counter()
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                pemilik = self._pemilik()
+                if pemilik is None:
+                    continue
+                # Hapus hanya jika isinya belum berubah, agar lock baru milik proses lain tidak ikut terhapus
+                if self._basi(pemilik) and self._pemilik() == pemilik:
+                    logging.warning(f"Menghapus lock basi {self.path} (pemilik {pemilik or 'tidak diketahui'})")
+                    try:
+                        os.remove(self.path)
+                    except FileNotFoundError:
+                        pass
+                    continue
+                if time.perf_counter() - mulai > self.timeout:
+                    raise TimeoutError(f"Workbook sedang ditulis proses lain ({self.path}, pemilik {pemilik})")
+                time.sleep(0.05)
+                continue
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(f"{os.getpid()} {platform.node()}")
+            break
+        self.waktu_tunggu = time.perf_counter() - mulai
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+class WorkbookTransaction:
+    """Kumpulkan perubahan beberapa sheet lalu tulis sekaligus ke workbook secara atomik
+    
+    Commit menyalin workbook ke file sementara, mengganti semua sheet yang berubah dalam satu kali
+    buka-tulis, lalu memindahkannya ke file asli dengan os.replace di bawah WorkbookLock. Sheet lain
+    tidak disentuh dan pembaca tidak pernah melihat file setengah tertulis.
+    
+    Perubahan yang bergantung pada isi sheet (tambah/hapus baris) didaftarkan lewat ubah(), lalu
+    dijalankan pada isi sheet yang dibaca ulang di dalam lock, sehingga penulis lain yang commit
+    di antara baca dan tulis tidak kehilangan perubahannya.
+    """
+    def __init__(self, file_path: str = "data.xlsx"):
+        self.file_path = file_path
+        self.perubahan: Dict[str, pd.DataFrame] = {}
+        self.pengubah: List[Tuple[str, Callable[[Optional[pd.DataFrame]], Optional[pd.DataFrame]]]] = []
+        self.berhasil: Optional[bool] = None
+        self.durasi_ms = 0.0
+        self.tunggu_lock_ms = 0.0
+    
+    def put(self, sheet_name: str, df: pd.DataFrame) -> None:
+        """Antrekan isi baru sebuah sheet (menimpa antrean sebelumnya untuk sheet yang sama)"""
+        self.perubahan[sheet_name] = df
+    
+    def ubah(self, sheet_name: str, fungsi: Callable[[Optional[pd.DataFrame]], Optional[pd.DataFrame]]) -> None:
+        """Antrekan perubahan sheet berdasarkan isinya saat commit
+        
+        fungsi menerima isi sheet terbaru (None jika sheet belum ada) dan mengembalikan isi baru,
+        atau None jika sheet tidak perlu ditulis.
+        """
+        self.pengubah.append((sheet_name, fungsi))
+    
+    def _terapkan_pengubah(self) -> None:
+        """Jalankan pengubah pada isi workbook terbaru; dipanggil saat lock sudah dipegang"""
+        if not self.pengubah:
+            return
+        invalidate_workbook_cache(self.file_path)
+        sekarang = read_workbook(self.file_path) if os.path.exists(self.file_path) else {}
+        for sheet_name, fungsi in self.pengubah:
+            df = fungsi(self.perubahan.get(sheet_name, sekarang.get(sheet_name)))
+            if df is not None:
+                self.perubahan[sheet_name] = df
+        self.pengubah.clear()
+    
+    def commit(self) -> bool:
+        """Tulis semua sheet yang diantrekan dalam satu transaksi"""
+        if not self.perubahan and not self.pengubah:
+            self.berhasil = True
+            return True
+        
+        folder, nama = os.path.split(os.path.abspath(self.file_path))
+        tmp_path = os.path.join(folder, f".{nama}.{os.getpid()}.tmp.xlsx")
+        mulai = time.perf_counter()
+        try:
+            with WorkbookLock(self.file_path) as lock:
+                self.tunggu_lock_ms = lock.waktu_tunggu * 1000
+                self._terapkan_pengubah()
+                if not self.perubahan:
+                    self.berhasil = True
+                    return True
+                if os.path.exists(self.file_path):
+                    shutil.copy2(self.file_path, tmp_path)
+                    writer = pd.ExcelWriter(tmp_path, engine='openpyxl', mode='a', if_sheet_exists='replace')
+                else:
+                    writer = pd.ExcelWriter(tmp_path, engine='openpyxl')
+                with writer:
+                    for sheet_name, df in self.perubahan.items():
+                        df.to_excel(writer, sheet_name=sheet_name, index=False)
+                os.replace(tmp_path, self.file_path)
+            
+            self.durasi_ms = (time.perf_counter() - mulai) * 1000
+            logging.info(
+                f"Berhasil menyimpan sheet {', '.join(self.perubahan)} dalam {self.durasi_ms:.0f} ms "
+                f"(menunggu lock {self.tunggu_lock_ms:.0f} ms)"
+            )
+            self.perubahan.clear()
+            self.berhasil = True
+        except Exception as e:
+            logging.error(f"Gagal menyimpan sheet {', '.join(self.perubahan)}: {str(e)}")
+            self.berhasil = False
+        finally:
+            invalidate_workbook_cache(self.file_path)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return self.berhasil
+    
+    def __enter__(self) -> "WorkbookTransaction":
+        return self
+    
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.berhasil = False
+
+class ExcelStorage:
+    """Backend penyimpanan di workbook Excel; perubahan baris menulis ulang sheet yang terkena"""
+    def __init__(self, path: str = "data.xlsx"):
+        self.path = path
+    
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+    
+    def read_tables(self) -> Dict[str, pd.DataFrame]:
+        """Semua sheet sebagai {nama: DataFrame}"""
+        return read_workbook(self.path)
+    
+    def replace_tables(self, tables: Dict[str, pd.DataFrame]) -> bool:
+        """Ganti isi beberapa sheet sekaligus dalam satu transaksi"""
+        transaksi = WorkbookTransaction(self.path)
+        for nama, df in tables.items():
+            transaksi.put(nama, df)
+        return transaksi.commit()
+    
+    def _ubah(self, perubahan: Dict[str, Callable[[Optional[pd.DataFrame]], Optional[pd.DataFrame]]]) -> bool:
+        """Baca-ubah-tulis beberapa sheet dalam satu transaksi, dengan pembacaan di dalam lock"""
+        transaksi = WorkbookTransaction(self.path)
+        for nama, fungsi in perubahan.items():
+            transaksi.ubah(nama, fungsi)
+        return transaksi.commit()
+    
+    def insert_rows(self, table: str, rows: pd.DataFrame) -> bool:
+        """Tambahkan baris ke akhir sheet"""
+        def tambah(lama: Optional[pd.DataFrame]) -> pd.DataFrame:
+            if lama is None or lama.empty:
+                return rows
+            return pd.concat([lama, rows], ignore_index=True)
+        return self._ubah({table: tambah})
+    
+    @staticmethod
+    def _cocok(df: pd.DataFrame, syarat: Dict[str, Sequence[Any]]) -> np.ndarray:
+        cocok = np.ones(len(df), dtype=bool)
+        for kolom, nilai in syarat.items():
+            cocok &= df[kolom].isin(list(nilai)).to_numpy()
+        return cocok
+    
+    def delete_rows(self, kriteria: Dict[str, Dict[str, Sequence[Any]]]) -> bool:
+        """Hapus baris yang setiap kolom kriterianya bernilai salah satu nilai yang diberikan
+        
+        kriteria: {tabel: {kolom: [nilai, ...]}}, semua tabel diubah dalam satu transaksi.
+        """
+        def hapus(syarat: Dict[str, Sequence[Any]]) -> Callable[[Optional[pd.DataFrame]], Optional[pd.DataFrame]]:
+            return lambda df: None if df is None else df[~self._cocok(df, syarat)]
+        return self._ubah({table: hapus(syarat) for table, syarat in kriteria.items()})
+    
+    def replace_rows(self, table: str, syarat: Dict[str, Sequence[Any]], rows: pd.DataFrame) -> bool:
+        """Ganti baris yang cocok dengan syarat ({kolom: [nilai, ...]}) oleh rows dalam satu transaksi"""
+        def ganti(lama: Optional[pd.DataFrame]) -> pd.DataFrame:
+            if lama is None or lama.empty:
+                return rows
+            return pd.concat([lama[~self._cocok(lama, syarat)], rows], ignore_index=True)
+        return self._ubah({table: ganti})
+
+class SQLiteStorage:
+    """Backend penyimpanan SQLite dengan tabel yang sama seperti sheet di data.xlsx
+    
+    Tambah dan hapus baris dilakukan langsung dengan INSERT/DELETE tanpa menulis ulang tabel,
+    dan kolom kunci yang sering dicari (id_dosen, id_matakuliah, nama dosen) diberi indeks.
+    """
+    INDEKS = {
+        'Dosen': [('nama',)],
+        'matakuliah': [('nama',)],
+        'dosen_matakuliah': [('id_dosen',), ('id_matakuliah',)],
+        'availability': [('dosen', 'hari')],
+    }
+    
+    def __init__(self, path: str = Config.SQLITE_PATH):
+        self.path = path
+    
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+    
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=Config.WORKBOOK_LOCK_TIMEOUT)
+    
+    @staticmethod
+    def _nama(nama: Any) -> str:
+        """Identifier SQL yang aman untuk nama tabel/kolom apa pun"""
+        return '"' + str(nama).replace('"', '""') + '"'
+    
+    @staticmethod
+    def _tipe(kolom: pd.Series) -> str:
+        if pd.api.types.is_bool_dtype(kolom) or pd.api.types.is_integer_dtype(kolom):
+            return 'INTEGER'
+        if pd.api.types.is_float_dtype(kolom):
+            return 'REAL'
+        return 'TEXT'
+    
+    @staticmethod
+    def _nilai(nilai: Any) -> Any:
+        """Ubah nilai pandas/numpy menjadi tipe yang bisa disimpan sqlite3"""
+        if nilai is None or (not isinstance(nilai, (str, bytes)) and pd.isna(nilai)):
+            return None
+        if isinstance(nilai, np.generic):
+            return nilai.item()
+        if isinstance(nilai, (int, float, str, bytes)):
+            return nilai
+        return str(nilai)  # time, Timestamp, dan sejenisnya disimpan sebagai teks
+    
+    def _baris(self, df: pd.DataFrame) -> List[Tuple[Any, ...]]:
+        return [tuple(self._nilai(v) for v in baris) for baris in df.itertuples(index=False, name=None)]
+    
+    def _kolom_tabel(self, con: sqlite3.Connection, table: str) -> List[str]:
+        return [baris[1] for baris in con.execute(f"PRAGMA table_info({self._nama(table)})")]
+    
+    def _tulis_tabel(self, con: sqlite3.Connection, table: str, df: pd.DataFrame) -> None:
+        nama = self._nama(table)
+        con.execute(f"DROP TABLE IF EXISTS {nama}")
+        definisi = ", ".join(f"{self._nama(c)} {self._tipe(df[c])}" for c in df.columns)
+        con.execute(f"CREATE TABLE {nama} ({definisi})")
+        self._sisipkan(con, table, [str(c) for c in df.columns], df)
+        kolom_ada = set(str(c) for c in df.columns)
+        for kolom in self.INDEKS.get(table, []):
+            if set(kolom) <= kolom_ada:
+                indeks = self._nama(f"idx_{table}_{'_'.join(kolom)}")
+                con.execute(f"CREATE INDEX {indeks} ON {nama} ({', '.join(map(self._nama, kolom))})")
+    
+    def _sisipkan(self, con: sqlite3.Connection, table: str, kolom: List[str], df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+        tanda = ", ".join("?" * len(kolom))
+        con.executemany(
+            f"INSERT INTO {self._nama(table)} ({', '.join(map(self._nama, kolom))}) VALUES ({tanda})",
+            self._baris(df)
+        )
+    
+    def read_tables(self) -> Dict[str, pd.DataFrame]:
+        """Semua tabel sebagai {nama: DataFrame}"""
+        with closing(self._connect()) as con:
+            nama_tabel = [baris[0] for baris in con.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY rowid"
+            )]
+            return {nama: pd.read_sql_query(f"SELECT * FROM {self._nama(nama)}", con) for nama in nama_tabel}
+    
+    def _transaksi(self, keterangan: str, aksi: Callable[[sqlite3.Connection], None]) -> bool:
+        """Jalankan aksi dalam satu transaksi SQLite dan catat durasinya"""
+        mulai = time.perf_counter()
+        try:
+            with closing(self._connect()) as con:
+                with con:
+                    aksi(con)
+        except (sqlite3.Error, ValueError) as e:
+            logging.error(f"Gagal {keterangan} di {self.path}: {str(e)}")
+            return False
+        logging.info(f"Berhasil {keterangan} dalam {(time.perf_counter() - mulai) * 1000:.1f} ms")
+        return True
+    
+    def replace_tables(self, tables: Dict[str, pd.DataFrame]) -> bool:
+        """Ganti isi beberapa tabel sekaligus dalam satu transaksi"""
+        def aksi(con: sqlite3.Connection) -> None:
+            for table, df in tables.items():
+                self._tulis_tabel(con, table, df)
+        return self._transaksi(f"menyimpan tabel {', '.join(tables)}", aksi)
+    
+    def insert_rows(self, table: str, rows: pd.DataFrame) -> bool:
+        """Tambahkan baris dengan INSERT; tabel dibuat dari rows jika belum ada"""
+        def aksi(con: sqlite3.Connection) -> None:
+            kolom = self._kolom_tabel(con, table)
+            if not kolom:
+                self._tulis_tabel(con, table, rows)
+                return
+            # Kolom yang tidak dikenal tabel diabaikan, kolom yang tidak diisi menjadi NULL
+            self._sisipkan(con, table, kolom, rows.reindex(columns=kolom))
+        return self._transaksi(f"menambah {len(rows)} baris ke {table}", aksi)
+    
+    def _hapus(self, con: sqlite3.Connection, table: str, syarat: Dict[str, Sequence[Any]]) -> None:
+        klausa = []
+        parameter = []
+        for kolom, nilai in syarat.items():
+            nilai = [self._nilai(v) for v in nilai]
+            klausa.append(f"{self._nama(kolom)} IN ({', '.join('?' * len(nilai))})")
+            parameter.extend(nilai)
+        con.execute(f"DELETE FROM {self._nama(table)} WHERE {' AND '.join(klausa)}", parameter)
+    
+    def delete_rows(self, kriteria: Dict[str, Dict[str, Sequence[Any]]]) -> bool:
+        """Hapus baris dengan DELETE, format kriteria sama dengan ExcelStorage.delete_rows"""
+        def aksi(con: sqlite3.Connection) -> None:
+            for table, syarat in kriteria.items():
+                if self._kolom_tabel(con, table):
+                    self._hapus(con, table, syarat)
+        return self._transaksi(f"menghapus baris dari {', '.join(kriteria)}", aksi)
+    
+    def replace_rows(self, table: str, syarat: Dict[str, Sequence[Any]], rows: pd.DataFrame) -> bool:
+        """Ganti baris yang cocok dengan syarat oleh rows (DELETE lalu INSERT dalam satu transaksi)"""
+        def aksi(con: sqlite3.Connection) -> None:
+            kolom = self._kolom_tabel(con, table)
+            if not kolom:
+                self._tulis_tabel(con, table, rows)
+                return
+            self._hapus(con, table, syarat)
+            self._sisipkan(con, table, kolom, rows.reindex(columns=kolom))
+        return self._transaksi(f"mengganti {len(rows)} baris di {table}", aksi)
+    
+    def import_xlsx(self, file_path: str = "data.xlsx") -> bool:
+        """Salin semua sheet workbook ke database (tabel yang sama namanya ditimpa)"""
+        return self.replace_tables(dict(read_workbook(file_path)))
+    
+    def export_xlsx(self) -> bytes:
+        """Workbook Excel berisi semua tabel dengan tata letak yang sama seperti data.xlsx"""
+        output = io.BytesIO()
+        with pd.ExcelWriter(output, engine='openpyxl') as writer:
+            for nama, df in self.read_tables().items():
+                df.to_excel(writer, sheet_name=nama, index=False)
+        return output.getvalue()
+
+def get_storage() -> Any:
+    """Backend penyimpanan sesuai Config.STORAGE_BACKEND"""
+    if Config.STORAGE_BACKEND != "sqlite":
+        return ExcelStorage("data.xlsx")
+    storage = SQLiteStorage(Config.SQLITE_PATH)
+    if not storage.exists() and os.path.exists("data.xlsx"):
+        logging.info(f"Membuat {storage.path} dari data.xlsx")
+        storage.import_xlsx("data.xlsx")
+    return storage
+
+def storage_for_path(path: str) -> Any:
+    """Backend penyimpanan untuk file tertentu berdasarkan ekstensinya (.db/.sqlite atau .xlsx)"""
+    if path.lower().endswith(('.db', '.sqlite', '.sqlite3')):
+        return SQLiteStorage(path)
+    return ExcelStorage(path)
+
+def save_to_excel(df: pd.DataFrame, sheet_name: str) -> bool:
+    """Menyimpan dataframe ke sheet/tabel tertentu di backend penyimpanan dengan error handling"""
+    return get_storage().replace_tables({sheet_name: df})
+
+KOLOM_AVAILABILITY = ['dosen', 'hari', 'jam_mulai', 'jam_selesai']
+_POLA_JAM = re.compile(r'^([01]?\d|2[0-3]):[0-5]\d(:[0-5]\d)?$')
+
+def _menit_jam(kolom: pd.Series) -> pd.Series:
+    """Menit sejak 00:00 untuk setiap nilai jam (teks HH:MM[:SS], time, datetime), NaN jika tidak valid
+    
+    Nilai jam dalam satu kolom biasanya hanya sedikit variasinya, jadi parse_time cukup dipanggil
+    sekali per nilai unik.
+    """
+    peta = {}
+    for nilai in pd.unique(kolom):
+        jam = nilai.time() if isinstance(nilai, datetime) else nilai
+        if isinstance(jam, str):
+            jam = jam.strip()
+            if not _POLA_JAM.match(jam):
+                continue
+        elif not isinstance(jam, dt_time):
+            continue
+        peta[nilai] = time_to_minutes(parse_time(jam))
+    return kolom.map(peta).astype(float)
+
+def normalize_availability_chunk(
+    df: pd.DataFrame,
+    dosen_dikenal: Optional[Set[str]] = None
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Validasi dan normalisasi satu potongan data ketersediaan
+    
+    Mengembalikan (baris valid dengan kolom dosen, hari, mulai, selesai dalam menit,
+    baris tidak valid beserta kolom alasan).
+    """
+    dosen = df['dosen'].astype('string').str.strip()
+    hari = df['hari'].astype('string').str.strip().str.capitalize()
+    mulai = _menit_jam(df['jam_mulai'])
+    selesai = _menit_jam(df['jam_selesai'])
+    
+    alasan = pd.Series('', index=df.index, dtype=object)
+    alasan[selesai.isna() | (mulai >= selesai)] = 'jam selesai harus setelah jam mulai'
+    alasan[mulai.isna() | selesai.isna()] = 'format jam tidak valid'
+    alasan[~hari.isin(list(HARI_INDEX)).fillna(False).astype(bool)] = 'hari tidak dikenal'
+    if dosen_dikenal is not None:
+        alasan[~dosen.isin(list(dosen_dikenal)).fillna(False).astype(bool)] = 'dosen tidak terdaftar'
+    alasan[dosen.isna() | (dosen == '').fillna(True).astype(bool)] = 'nama dosen kosong'
+    
+    valid = (alasan == '').to_numpy()
+    hasil = pd.DataFrame({
+        'dosen': dosen[valid].astype(object),
+        'hari': hari[valid].astype(object),
+        'mulai': mulai[valid].astype(int),
+        'selesai': selesai[valid].astype(int),
+    })
+    tidak_valid = df.loc[~valid, KOLOM_AVAILABILITY].assign(alasan=alasan[~valid])
+    return hasil, tidak_valid
+
+def availability_masks(valid: pd.DataFrame) -> Dict[Tuple[str, str], int]:
+    """Gabungan interval sibuk per (dosen, hari) sebagai bitmask menit dari baris yang sudah dinormalisasi"""
+    masks: Dict[Tuple[str, str], int] = {}
+    for dosen, hari, mulai, selesai in zip(valid['dosen'], valid['hari'], valid['mulai'], valid['selesai']):
+        masks[(dosen, hari)] = masks.get((dosen, hari), 0) | (((1 << (selesai - mulai)) - 1) << mulai)
+    return masks
+
+def mask_intervals(mask: int) -> List[Tuple[int, int]]:
+    """Pecah bitmask menit menjadi interval (mulai, selesai) yang tidak saling menyentuh, terurut"""
+    hasil = []
+    while mask:
+        mulai = (mask & -mask).bit_length() - 1
+        sisa = mask >> mulai
+        panjang = (sisa ^ (sisa + 1)).bit_length() - 1
+        hasil.append((mulai, mulai + panjang))
+        mask &= ~(((1 << panjang) - 1) << mulai)
+    return hasil
+
+def iter_availability_chunks(
+    file: Any,
+    nama_file: str,
+    chunk_size: int = Config.IMPORT_CHUNK_ROWS
+) -> Iterator[Tuple[pd.DataFrame, float]]:
+    """Baca file import xlsx/csv per potongan, menghasilkan (potongan, progres 0..1)
+    
+    File xlsx dibaca baris demi baris dengan openpyxl mode read-only dan csv dengan
+    pd.read_csv(chunksize), sehingga seluruh isi file tidak pernah menjadi satu DataFrame.
+    """
+    if nama_file.lower().endswith('.xlsx'):
+        from openpyxl import load_workbook
+        workbook = load_workbook(file, read_only=True, data_only=True)
+        try:
+            sheet = workbook.worksheets[0]
+            rows = sheet.iter_rows(values_only=True)
+            header = next(rows, None) or ()
+            kolom = [str(h).strip().lower() if h is not None else '' for h in header]
+            total = max((sheet.max_row or 1) - 1, 1)
+            dibaca = 0
+            buffer: List[Tuple[Any, ...]] = []
+            for baris in rows:
+                buffer.append(baris)
+                if len(buffer) >= chunk_size:
+                    dibaca += len(buffer)
+                    yield pd.DataFrame(buffer, columns=kolom), min(dibaca / total, 1.0)
+                    buffer = []
+            if buffer or not dibaca:
+                yield pd.DataFrame(buffer, columns=kolom), 1.0
+        finally:
+            workbook.close()
+        return
+    
+    file.seek(0, os.SEEK_END)
+    total = max(file.tell(), 1)
+    file.seek(0)
+    # Reader ditutup lewat with agar file upload tidak ikut tertutup saat iterasi dihentikan
+    with pd.read_csv(file, chunksize=chunk_size, dtype=str) as reader:
+        for chunk in reader:
+            chunk.columns = [str(c).strip().lower() for c in chunk.columns]
+            yield chunk, min(file.tell() / total, 1.0)
+
+def read_availability_preview(file: Any, nama_file: str, n: int = Config.IMPORT_PREVIEW_ROWS) -> pd.DataFrame:
+    """Beberapa baris pertama file import untuk ditampilkan sebelum disimpan"""
+    potongan = iter_availability_chunks(file, nama_file, n)
+    try:
+        pratinjau, _ = next(potongan)
+    finally:
+        potongan.close()
+    file.seek(0)
+    return pratinjau
+
+def coalesce_availability(df_availability: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """Gabungkan interval sibuk yang beririsan atau bersambung per (dosen, hari)
+    
+    Hasilnya satu baris per interval yang tidak saling menyentuh, terurut per dosen, hari, dan jam.
+    Baris dengan data tidak valid dibiarkan apa adanya di akhir agar tidak ada data yang hilang.
+    """
+    if df_availability is None or df_availability.empty:
+        return pd.DataFrame(columns=KOLOM_AVAILABILITY)
+    
+    valid, tidak_valid = normalize_availability_chunk(df_availability)
+    valid = valid.assign(urutan_hari=valid['hari'].map(HARI_INDEX)).sort_values(
+        ['dosen', 'urutan_hari', 'mulai', 'selesai'], kind='stable'
+    )
+    grup_baru = (valid['dosen'] != valid['dosen'].shift()) | (valid['hari'] != valid['hari'].shift())
+    grup = grup_baru.cumsum()
+    # Interval memulai segmen baru jika mulai setelah jam selesai terjauh sebelumnya di grup yang sama
+    selesai_terjauh = valid.groupby(grup)['selesai'].cummax().groupby(grup).shift()
+    segmen = (grup_baru | (valid['mulai'] > selesai_terjauh)).cumsum()
+    hasil = valid.groupby(segmen).agg(
+        dosen=('dosen', 'first'), hari=('hari', 'first'), mulai=('mulai', 'min'), selesai=('selesai', 'max')
+    )
+    hasil = pd.DataFrame({
+        'dosen': hasil['dosen'].to_numpy(),
+        'hari': hasil['hari'].to_numpy(),
+        'jam_mulai': [minutes_to_time(m) for m in hasil['mulai']],
+        'jam_selesai': [minutes_to_time(m) for m in hasil['selesai']],
+    })
+    if len(tidak_valid):
+        hasil = pd.concat([hasil, tidak_valid[KOLOM_AVAILABILITY]], ignore_index=True)
+    return hasil
+
+def normalize_stored_availability(storage: Any, tambahan: Optional[pd.DataFrame] = None) -> Tuple[int, int]:
+    """Rapikan tabel availability di storage (beserta baris tambahan) menjadi interval minimal
+    
+    Tabel hanya ditulis ulang jika ada baris tambahan atau jumlah barisnya berkurang.
+    Mengembalikan (jumlah baris sebelum, sesudah).
+    """
+    lama = storage.read_tables().get("availability") if storage.exists() else None
+    bagian = [df for df in (lama, tambahan) if df is not None and not df.empty]
+    gabungan = pd.concat(bagian, ignore_index=True) if bagian else pd.DataFrame(columns=KOLOM_AVAILABILITY)
+    hasil = coalesce_availability(gabungan)
+    if tambahan is not None or len(hasil) < len(gabungan):
+        if not storage.replace_tables({"availability": hasil}):
+            raise IOError(f"Gagal menyimpan ketersediaan ke {storage.path}")
+        logging.info(f"Ketersediaan dirapikan: {len(gabungan)} baris menjadi {len(hasil)}")
+    return len(gabungan), len(hasil)
+
+def import_availability(
+    file: Any,
+    nama_file: str,
+    storage: Any,
+    df_availability: Optional[pd.DataFrame] = None,
+    dosen_dikenal: Optional[Set[str]] = None,
+    chunk_size: int = Config.IMPORT_CHUNK_ROWS,
+    progress_callback: Optional[Callable[[float, int], None]] = None
+) -> Dict[str, Any]:
+    """Import ketersediaan dosen secara bertahap dan hanya menambahkan interval yang belum tercakup
+    
+    Setiap potongan divalidasi dan dinormalisasi, lalu dicocokkan dengan gabungan interval sibuk
+    per (dosen, hari) dari data lama dan potongan sebelumnya. Baris yang seluruh intervalnya sudah
+    tercakup dihitung duplikat, sehingga import ulang file yang sama tidak menambah apa pun. Memori
+    yang dipakai sebanding dengan jumlah (dosen, hari), bukan jumlah baris file. Di akhir, hanya
+    baris dosen yang tersentuh import yang diganti (replace_rows) dengan interval yang sudah digabung.
+    df_availability adalah isi tabel saat ini; jika None dibaca dari storage.
+    """
+    mulai_waktu = time.perf_counter()
+    if df_availability is None and storage.exists():
+        df_availability = storage.read_tables().get("availability")
+    if df_availability is None:
+        df_availability = pd.DataFrame(columns=KOLOM_AVAILABILITY)
+    lama_valid, lama_tidak_valid = normalize_availability_chunk(df_availability)
+    sibuk = availability_masks(lama_valid)
+    stats: Dict[str, Any] = {'dibaca': 0, 'duplikat': 0, 'tidak_valid': 0, 'ditambahkan': 0, 'digabung': 0}
+    contoh_tidak_valid: List[pd.DataFrame] = []
+    tersentuh: Set[str] = set()
+    
+    for chunk, progres in iter_availability_chunks(file, nama_file, chunk_size):
+        kolom_kurang = [k for k in KOLOM_AVAILABILITY if k not in chunk.columns]
+        if kolom_kurang:
+            raise ValueError(f"Kolom wajib tidak ditemukan: {', '.join(kolom_kurang)}")
+        stats['dibaca'] += len(chunk)
+        
+        valid, tidak_valid = normalize_availability_chunk(chunk, dosen_dikenal)
+        stats['tidak_valid'] += len(tidak_valid)
+        if len(tidak_valid) and sum(map(len, contoh_tidak_valid)) < Config.IMPORT_CONTOH_TIDAK_VALID:
+            contoh_tidak_valid.append(tidak_valid.head(Config.IMPORT_CONTOH_TIDAK_VALID))
+        
+        for dosen, hari, mulai, selesai in zip(valid['dosen'], valid['hari'], valid['mulai'], valid['selesai']):
+            mask = ((1 << (selesai - mulai)) - 1) << mulai
+            ada = sibuk.get((dosen, hari), 0)
+            if not mask & ~ada:
+                stats['duplikat'] += 1
+                continue
+            sibuk[(dosen, hari)] = ada | mask
+            tersentuh.add(dosen)
+            stats['ditambahkan'] += 1
+        
+        if progress_callback:
+            progress_callback(progres, stats['dibaca'])
+    
+    if tersentuh:
+        baris = [
+            (dosen, hari, minutes_to_time(mulai), minutes_to_time(selesai))
+            for (dosen, hari), mask in sorted(sibuk.items(), key=lambda x: (x[0][0], HARI_INDEX[x[0][1]]))
+            if dosen in tersentuh
+            for mulai, selesai in mask_intervals(mask)
+        ]
+        # Baris lama yang tidak valid milik dosen yang sama dipertahankan apa adanya
+        # Nama dosen lama ditulis persis seperti di tabel agar baris dengan spasi berlebih ikut terganti
+        dosen_lama = df_availability['dosen']
+        cocok = dosen_lama.astype('string').str.strip().isin(list(tersentuh)).fillna(False).astype(bool)
+        nama_tersentuh = tersentuh | set(dosen_lama[cocok])
+        df_baru = pd.concat([
+            pd.DataFrame(baris, columns=KOLOM_AVAILABILITY),
+            lama_tidak_valid.loc[lama_tidak_valid['dosen'].isin(list(nama_tersentuh)), KOLOM_AVAILABILITY]
+        ], ignore_index=True)
+        if not storage.replace_rows("availability", {'dosen': sorted(nama_tersentuh, key=str)}, df_baru):
+            raise IOError(f"Gagal menyimpan ketersediaan ke {storage.path}")
+        stats['digabung'] = int(lama_valid['dosen'].isin(list(tersentuh)).sum()) + stats['ditambahkan'] - len(baris)
+    
+    stats['contoh_tidak_valid'] = (
+        pd.concat(contoh_tidak_valid).head(Config.IMPORT_CONTOH_TIDAK_VALID) if contoh_tidak_valid else None
+    )
+    stats['durasi_detik'] = time.perf_counter() - mulai_waktu
+    logging.info(
+        f"Import ketersediaan: {stats['dibaca']} dibaca, {stats['ditambahkan']} ditambahkan, "
+        f"{stats['duplikat']} duplikat, {stats['tidak_valid']} tidak valid, {stats['digabung']} digabung "
+        f"dalam {stats['durasi_detik']:.1f} detik"
+    )
+    return stats
+
+class ResourceCalendar:
+    """Kalender mingguan satu jenis resource: nama -> id integer -> bitmask per hari"""
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.masks: List[List[int]] = []
+    
+    def get_id(self, nama: str) -> int:
+        """Ambil id integer resource, daftarkan jika belum ada"""
+        resource_id = self.ids.get(nama)
+        if resource_id is None:
+            resource_id = len(self.masks)
+            self.ids[nama] = resource_id
+            self.masks.append([0] * len(HARI_INDEX))
+        return resource_id
+    
+    def add(self, nama: str, hari: str, mask: int) -> None:
+        """Tandai interval (bitmask) sebagai terpakai"""
+        hari_idx = HARI_INDEX.get(hari)
+        if hari_idx is None:
+            logging.warning(f"Hari tidak dikenal: {hari}")
+            return
+        self.masks[self.get_id(nama)][hari_idx] |= mask
+    
+    def overlaps(self, nama: str, hari: str, mask: int) -> bool:
+        """Cek apakah interval (bitmask) beririsan dengan jadwal yang sudah ada"""
+        resource_id = self.ids.get(nama)
+        hari_idx = HARI_INDEX.get(hari)
+        if resource_id is None or hari_idx is None:
+            return False
+        return bool(self.masks[resource_id][hari_idx] & mask)
+    
+    def remove(self, nama: str, hari: str, mask: int) -> None:
+        """Lepaskan interval (bitmask) yang sebelumnya ditandai terpakai"""
+        resource_id = self.ids.get(nama)
+        hari_idx = HARI_INDEX.get(hari)
+        if resource_id is None or hari_idx is None:
+            return
+        self.masks[resource_id][hari_idx] &= ~mask
+
+class ResourceTracker:
+    """Class untuk melacak penggunaan resource (kelas, dosen, ruangan)"""
+    def __init__(self):
+        self.kelas = ResourceCalendar()
+        self.dosen = ResourceCalendar()
+        self.ruangan = ResourceCalendar()
+        self.beban_dosen: Dict[str, int] = {}  # total SKS terjadwal per dosen
+    
+    def add_schedule(
+        self, 
+        kelas: str, 
+        dosen: str, 
+        ruangan: str, 
+        hari: str, 
+        jam_mulai: dt_time, 
+        jam_selesai: dt_time,
+        sks: int = 0
+    ) -> None:
+        """Tambahkan jadwal ke resource tracker"""
+        mask = interval_mask(jam_mulai, jam_selesai)
+        
+        self.beban_dosen[dosen] = self.beban_dosen.get(dosen, 0) + sks
+        self.kelas.add(kelas, hari, mask)
+        self.dosen.add(dosen, hari, mask)
+        if ruangan and ruangan != "Zoom":
+            self.ruangan.add(ruangan, hari, mask)
+    
+    def remove_schedule(
+        self, 
+        kelas: str, 
+        dosen: str, 
+        ruangan: str, 
+        hari: str, 
+        jam_mulai: dt_time, 
+        jam_selesai: dt_time,
+        sks: int = 0
+    ) -> None:
+        """Hapus jadwal dari resource tracker (kebalikan add_schedule)"""
+        mask = interval_mask(jam_mulai, jam_selesai)
+        
+        self.beban_dosen[dosen] = self.beban_dosen.get(dosen, 0) - sks
+        self.kelas.remove(kelas, hari, mask)
+        self.dosen.remove(dosen, hari, mask)
+        if ruangan and ruangan != "Zoom":
+            self.ruangan.remove(ruangan, hari, mask)
+    
+    def within_load_limit(self, dosen: str, sks: int) -> bool:
+        """Cek apakah dosen masih bisa menerima tambahan SKS tanpa melebihi MAX_SKS_DOSEN"""
+        return Config.MAX_SKS_DOSEN is None or self.beban_dosen.get(dosen, 0) + sks <= Config.MAX_SKS_DOSEN
+    
+    def is_conflict(
+        self, 
+        kelas: str, 
+        dosen: str, 
+        ruangan: str, 
+        hari: str, 
+        jam_mulai: dt_time, 
+        jam_selesai: dt_time
+    ) -> bool:
+        """Cek apakah ada konflik jadwal"""
+        mask = interval_mask(jam_mulai, jam_selesai)
+        
+        # Cek konflik kelas dan dosen
+        if self.kelas.overlaps(kelas, hari, mask) or self.dosen.overlaps(dosen, hari, mask):
+            return True
+        
+        # Cek konflik ruangan (kecuali online)
+        if ruangan and ruangan != "Zoom":
+            return self.ruangan.overlaps(ruangan, hari, mask)
+        
+        return False
+
+class AvailabilityIndex:
+    """Indeks jam sibuk dosen dari sheet availability: (dosen, hari) -> bitmask menit"""
+    def __init__(self, df_availability: Optional[pd.DataFrame] = None):
+        self.masks: Dict[Tuple[str, str], int] = {}
+        if df_availability is None or df_availability.empty:
+            return
+        
+        rows = df_availability[['dosen', 'hari', 'jam_mulai', 'jam_selesai']].itertuples(index=False, name=None)
+        for nama_dosen, hari, jam_mulai, jam_selesai in rows:
+            # Baris tanpa jam tidak pernah dianggap sibuk
+            if pd.isna(jam_mulai) or pd.isna(jam_selesai):
+                continue
+            if isinstance(jam_mulai, datetime):
+                jam_mulai = jam_mulai.time()
+            if isinstance(jam_selesai, datetime):
+                jam_selesai = jam_selesai.time()
+            self.add(nama_dosen, hari, parse_time(jam_mulai), parse_time(jam_selesai))
+    
+    def add(self, nama_dosen: str, hari: str, jam_mulai: dt_time, jam_selesai: dt_time) -> None:
+        """Tambahkan interval sibuk dosen ke indeks"""
+        key = (nama_dosen, hari)
+        self.masks[key] = self.masks.get(key, 0) | interval_mask(jam_mulai, jam_selesai)
+    
+    def is_busy(self, nama_dosen: str, hari: str, jam_mulai: dt_time, jam_selesai: dt_time) -> bool:
+        """Cek apakah interval beririsan dengan jam sibuk dosen"""
+        return bool(self.masks.get((nama_dosen, hari), 0) & interval_mask(jam_mulai, jam_selesai))
+
+def is_dosen_busy(
+    nama_dosen: str, 
+    hari: str, 
+    jam_mulai: dt_time, 
+    jam_selesai: dt_time, 
+    availability_index: AvailabilityIndex, 
+    resource_tracker: ResourceTracker
+) -> bool:
+    """Cek apakah dosen sibuk di waktu tertentu"""
+    # Cek dari availability sheet
+    if availability_index.is_busy(nama_dosen, hari, jam_mulai, jam_selesai):
+        return True
+    
+    # Cek dari resource tracker
+    return resource_tracker.dosen.overlaps(nama_dosen, hari, interval_mask(jam_mulai, jam_selesai))
+
+class KelasRecord(NamedTuple):
+    """Satu baris sheet Kelas dalam bentuk ringkas untuk mesin penjadwalan"""
+    nama: str
+    jenis: str
+    konsentrasi: str
+
+class MatkulRecord(NamedTuple):
+    """Satu baris sheet matakuliah dalam bentuk ringkas untuk mesin penjadwalan"""
+    id: int
+    nama: str
+    sks: int
+    semester: int
+    status: str
+
+class DosenRecord(NamedTuple):
+    """Satu baris sheet Dosen dalam bentuk ringkas untuk mesin penjadwalan"""
+    id: int
+    nama: str
+
+def to_kelas_records(df_kelas: pd.DataFrame) -> List[KelasRecord]:
+    """Konversi sheet Kelas menjadi list KelasRecord"""
+    konsentrasi = df_kelas['konsentrasi'] if 'konsentrasi' in df_kelas.columns else ['umum'] * len(df_kelas)
+    return [
+        KelasRecord(nama, jenis, k)
+        for nama, jenis, k in zip(df_kelas['nama'], df_kelas['jenis'], konsentrasi)
+    ]
+
+def to_matkul_records(df_matkul: pd.DataFrame) -> List[MatkulRecord]:
+    """Konversi sheet matakuliah menjadi list MatkulRecord"""
+    return [
+        MatkulRecord(id_matkul, nama, int(sks), int(semester), status)
+        for id_matkul, nama, sks, semester, status in zip(
+            df_matkul['id'].tolist(), df_matkul['nama'], df_matkul['sks'], df_matkul['semester'], df_matkul['Status']
+        )
+    ]
+
+def to_dosen_records(df_dosen: pd.DataFrame) -> List[DosenRecord]:
+    """Konversi sheet Dosen menjadi list DosenRecord"""
+    return [DosenRecord(id_dosen, nama) for id_dosen, nama in zip(df_dosen['id'].tolist(), df_dosen['nama'])]
+
+class DosenMatkulIndex:
+    """Indeks hubungan dosen-matakuliah: id matkul -> dosen pengampu dan id dosen -> matkul"""
+    def __init__(self, df_dosen: pd.DataFrame, df_dosen_matkul: pd.DataFrame):
+        # id_dosen -> id matkul yang diampu (tanpa duplikat, urut sesuai sheet)
+        self.matkul_per_dosen: Dict[Any, Tuple[Any, ...]] = {}
+        links: Dict[Any, Dict[Any, None]] = {}
+        for id_dosen, id_matkul in zip(df_dosen_matkul['id_dosen'].tolist(), df_dosen_matkul['id_matakuliah'].tolist()):
+            links.setdefault(id_dosen, {})[id_matkul] = None
+        for id_dosen, matkul_ids in links.items():
+            self.matkul_per_dosen[id_dosen] = tuple(matkul_ids)
+        
+        # Semua matkul yang punya baris hubungan, walaupun dosennya tidak ada di sheet Dosen
+        self.matkul_terhubung = {id_matkul for matkul_ids in links.values() for id_matkul in matkul_ids}
+        
+        # id matkul -> dosen pengampu, urut sesuai sheet Dosen
+        dosen_per_matkul: Dict[Any, List[DosenRecord]] = {}
+        for dosen in to_dosen_records(df_dosen):
+            for id_matkul in self.matkul_per_dosen.get(dosen.id, ()):
+                dosen_per_matkul.setdefault(id_matkul, []).append(dosen)
+        self.dosen_per_matkul: Dict[Any, Tuple[DosenRecord, ...]] = {
+            id_matkul: tuple(daftar) for id_matkul, daftar in dosen_per_matkul.items()
+        }
+    
+    def dosen_for(self, id_matkul: Any) -> Tuple[DosenRecord, ...]:
+        """Daftar dosen yang mengampu matkul"""
+        return self.dosen_per_matkul.get(id_matkul, ())
+    
+    def matkul_for(self, id_dosen: Any) -> Tuple[Any, ...]:
+        """Daftar id matkul yang diampu dosen"""
+        return self.matkul_per_dosen.get(id_dosen, ())
+    
+    def has_dosen(self, id_matkul: Any) -> bool:
+        """Cek apakah matkul memiliki baris hubungan dosen-matkul"""
+        return id_matkul in self.matkul_terhubung
+
+def filter_matkul_by_konsentrasi(
+    df_matkul: pd.DataFrame, 
+    semester: int, 
+    konsentrasi: str
+) -> pd.DataFrame:
+    """Filter matkul berdasarkan semester dan konsentrasi"""
+    if df_matkul is None:
+        return pd.DataFrame()
+    
+    # Filter berdasarkan semester
+    filtered = df_matkul[df_matkul['semester'] == semester].copy()
+    
+    # Untuk semester 1 dan 3 hanya matkul umum
+    if semester in [1, 3]:
+        return filtered[filtered['Konsentrasi'] == 'umum']
+    
+    # Untuk semester 5 filter berdasarkan konsentrasi
+    if konsentrasi != 'umum':
+        filtered = filtered[
+            filtered['Konsentrasi'].apply(
+                lambda x: konsentrasi in [k.strip() for k in str(x).split(',')]
+            )
+        ]
+    
+    return filtered
+
+def adjust_sks(df_matkul: pd.DataFrame) -> pd.DataFrame:
+    """Sesuaikan SKS agar tidak melebihi batas maksimal"""
+    if df_matkul.empty:
+        return df_matkul
+    
+    total_sks = df_matkul['sks'].sum()
+    if total_sks <= Config.MAX_SKS_SEMESTER:
+        return df_matkul
+    
+    # Prioritaskan matkul wajib untuk dipertahankan
+    wajib = []
+    for matkul_list in Config.MATKUL_WAJIB.values():
+        wajib.extend(matkul_list)
+    
+    df_wajib = df_matkul[df_matkul['nama'].str.contains('|'.join(wajib))]
+    df_opsional = df_matkul[~df_matkul['nama'].str.contains('|'.join(wajib))]
+    
+    # Kurangi dari matkul opsional terlebih dahulu
+    while total_sks > Config.MAX_SKS_SEMESTER and not df_opsional.empty:
+        df_opsional = df_opsional.iloc[:-1]  # Hapus matkul terakhir
+        total_sks = df_wajib['sks'].sum() + df_opsional['sks'].sum()
+    
+    return pd.concat([df_wajib, df_opsional])
+
+def prioritize_matkul(df_matkul: pd.DataFrame) -> pd.DataFrame:
+    """Prioritaskan matkul berdasarkan SKS dan status wajib"""
+    df = df_matkul.copy()
+    
+    # Tambahkan kolom prioritas
+    df['prioritas'] = df['sks'] * 2  # Matkul dengan SKS lebih besar lebih diprioritaskan
+    
+    # Tingkatkan prioritas untuk matkul wajib
+    wajib = []
+    for matkul_list in Config.MATKUL_WAJIB.values():
+        wajib.extend(matkul_list)
+    
+    df['prioritas'] = df.apply(
+        lambda x: x['prioritas'] + 10 if x['nama'] in wajib else x['prioritas'],
+        axis=1
+    )
+    
+    # Urutkan berdasarkan prioritas (descending)
+    return df.sort_values('prioritas', ascending=False)
+
+def validate_all_data(
+    df_kelas: pd.DataFrame, 
+    df_matkul: pd.DataFrame, 
+    df_dosen: pd.DataFrame, 
+    df_dosen_matkul: pd.DataFrame,
+    dosen_matkul_index: Optional[DosenMatkulIndex] = None
+) -> List[str]:
+    """Validasi semua data sebelum generate jadwal"""
+    errors = []
+    
+    if df_kelas is None or df_matkul is None or df_dosen is None or df_dosen_matkul is None:
+        return ["Data tidak lengkap, pastikan semua sheet ada di file Excel"]
+    
+    if dosen_matkul_index is None:
+        dosen_matkul_index = DosenMatkulIndex(df_dosen, df_dosen_matkul)
+    
+    # Validasi matkul wajib untuk semua semester
+    for semester, matkul_wajib in Config.MATKUL_WAJIB.items():
+        matkul_sem = df_matkul[df_matkul['semester'] == semester]
+        for m in matkul_wajib:
+            if m not in matkul_sem['nama'].values:
+                errors.append(f"Matkul wajib {m} tidak ada di semester {semester}")
+    
+    # Validasi jenis kelas
+    jenis_kelas_valid = ['reguler', 'internasional', 'sabtu', 'karyawan', 'reguler malam']
+    invalid_jenis = df_kelas[~df_kelas['jenis'].isin(jenis_kelas_valid)]
+    if not invalid_jenis.empty:
+        errors.append(f"Jenis kelas tidak valid: {invalid_jenis['jenis'].unique()}")
+    
+    # Validasi hubungan dosen-matkul
+    for id_matkul, nama_matkul in zip(df_matkul['id'].tolist(), df_matkul['nama']):
+        if not dosen_matkul_index.has_dosen(id_matkul):
+            errors.append(f"Matkul {nama_matkul} tidak memiliki dosen")
+    
+    return errors
+
+def format_jam(jam_mulai: dt_time, jam_selesai: dt_time) -> str:
+    """Format rentang jam menjadi string HH:MM-HH:MM"""
+    return f"{jam_mulai.strftime('%H:%M')}-{jam_selesai.strftime('%H:%M')}"
+
+@lru_cache(maxsize=4096)
+def parse_jam(jam: Any) -> Optional[Tuple[dt_time, dt_time]]:
+    """Parse string HH:MM-HH:MM menjadi (jam_mulai, jam_selesai), None jika tidak valid"""
+    if not isinstance(jam, str):
+        return None
+    jam_parts = jam.split('-')
+    if len(jam_parts) != 2:
+        return None
+    try:
+        jam_mulai = datetime.strptime(jam_parts[0].strip(), '%H:%M').time()
+        jam_selesai = datetime.strptime(jam_parts[1].strip(), '%H:%M').time()
+    except ValueError:
+        return None
+    if jam_mulai >= jam_selesai:
+        return None
+    return jam_mulai, jam_selesai
+
+def build_jadwal_row(
+    kelas: KelasRecord,
+    matkul: MatkulRecord,
+    is_online: bool,
+    hari: str,
+    jam: str,
+    dosen: str,
+    ruangan: str,
+    keterangan: str
+) -> Dict[str, Any]:
+    """Susun satu baris jadwal sesuai kolom DataFrame hasil generate"""
+    return {
+        'Kelas': kelas.nama,
+        'Konsentrasi': kelas.konsentrasi,
+        'Hari': hari,
+        'Jam': jam,
+        'Mata Kuliah': matkul.nama,
+        'Dosen': dosen,
+        'Ruangan': ruangan,
+        'SKS': matkul.sks,
+        'Semester': matkul.semester,
+        'Status': 'Online' if is_online else 'Offline',
+        'Keterangan': keterangan,
+        'Warna': Config.WARNA_KELAS['Online'] if is_online else Config.WARNA_KELAS.get(kelas.konsentrasi, Config.WARNA_KELAS['Offline']),
+        'is_locked': False
+    }
+
+def is_matkul_online(matkul: MatkulRecord) -> bool:
+    """Tentukan mode matkul: praktikum/lab/jaringan selalu offline, sisanya mengikuti Status"""
+    if any(x in matkul.nama.lower() for x in ['praktikum', 'lab', 'jaringan']):
+        return False
+    return matkul.status.lower().strip() == 'online'
+
+def schedule_matkul(
+    matkul: MatkulRecord,
+    kelas: KelasRecord,
+    dosen_matkul_index: DosenMatkulIndex,
+    df_ruangan: pd.DataFrame,
+    availability_index: AvailabilityIndex,
+    resource_tracker: ResourceTracker,
+    ruangan_prioritas: List[str],
+    rng: Optional[random.Random] = None
+) -> Dict[str, Any]:
+    """Coba menjadwalkan satu mata kuliah"""
+    rng = rng or random.Random()
+    nama_kelas = kelas.nama
+    jenis_kelas = kelas.jenis
+    
+    # Tentukan apakah harus offline atau bisa online
+    is_online = is_matkul_online(matkul)
+    ruangan_options = ["Zoom"] if is_online else ruangan_prioritas.copy()
+    if not is_online:
+        rng.shuffle(ruangan_options)
+
+    # Atur hari tersedia (salinan, agar urutan di Config tidak ikut teracak)
+    hari_tersedia = list(Config.HARI_PRIORITAS.get(jenis_kelas.lower(), ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat']))
+    
+    # Daftar dosen yang tersedia untuk matkul ini
+    dosen_tersedia = list(dosen_matkul_index.dosen_for(matkul.id))
+    
+    if not dosen_tersedia:
+        return build_jadwal_row(
+            kelas, matkul, is_online, 'Cek EdLink', 'Cek EdLink', 'Belum Ditentukan',
+            'Zoom' if is_online else 'Cek EdLink', '⚠️ Tanpa Dosen'
+        )
+    
+    # Dosen yang bebannya sudah penuh dipangkas sebelum mencari slot dan ruangan
+    dosen_tersedia = [d for d in dosen_tersedia if resource_tracker.within_load_limit(d.nama, matkul.sks)]
+    if not dosen_tersedia:
+        return build_jadwal_row(
+            kelas, matkul, is_online, 'Cek EdLink', 'Cek EdLink', dosen_matkul_index.dosen_for(matkul.id)[0].nama,
+            'Zoom' if is_online else 'Cek EdLink', '⚠️ Beban dosen penuh'
+        )
+    
+    # Slot waktu per hari tidak bergantung pada percobaan, cukup dihitung sekali
+    jam_awal, jam_akhir = Config.JAM_OPERASIONAL.get(jenis_kelas.lower(), (dt_time(8, 0), dt_time(17, 0)))
+    durasi = matkul.sks * Config.DURASI_SKS
+    slot_per_hari = {
+        hari: generate_time_slots(jam_awal, jam_akhir, durasi, hari, jenis_kelas)
+        for hari in hari_tersedia
+    }
+    
+    # Coba menjadwalkan
+    for _ in range(Config.MAX_SCHEDULING_ATTEMPTS):
+        rng.shuffle(hari_tersedia)
+        rng.shuffle(dosen_tersedia)  # Acak urutan dosen
+        
+        for hari in hari_tersedia:
+            for jam_mulai, jam_selesai in slot_per_hari[hari]:
+                for dosen in dosen_tersedia:
+                    nama_dosen = dosen.nama
+                    
+                    # Cek ketersediaan dosen
+                    if is_dosen_busy(nama_dosen, hari, jam_mulai, jam_selesai, availability_index, resource_tracker):
+                        continue
+                        
+                    if is_online:
+                        if not resource_tracker.is_conflict(nama_kelas, nama_dosen, None, hari, jam_mulai, jam_selesai):
+                            resource_tracker.add_schedule(nama_kelas, nama_dosen, "Zoom", hari, jam_mulai, jam_selesai, matkul.sks)
+                            return build_jadwal_row(
+                                kelas, matkul, True, hari, format_jam(jam_mulai, jam_selesai),
+                                nama_dosen, "Zoom", '✅'
+                            )
+                    else:
+                        for ruangan in ruangan_options:
+                            if not resource_tracker.is_conflict(nama_kelas, nama_dosen, ruangan, hari, jam_mulai, jam_selesai):
+                                resource_tracker.add_schedule(nama_kelas, nama_dosen, ruangan, hari, jam_mulai, jam_selesai, matkul.sks)
+                                return build_jadwal_row(
+                                    kelas, matkul, False, hari, format_jam(jam_mulai, jam_selesai),
+                                    nama_dosen, ruangan, '✅'
+                                )
+    
+    # Jika gagal setelah semua percobaan
+    return build_jadwal_row(
+        kelas, matkul, is_online, 'Cek EdLink', 'Cek EdLink', rng.choice(dosen_tersedia).nama,
+        'Zoom' if is_online else 'Cek EdLink', f'⚠️ Gagal setelah {Config.MAX_SCHEDULING_ATTEMPTS}x attempt'
+    )
+
+def prepare_ruangan_prioritas(df_ruangan: pd.DataFrame) -> List[str]:
+    """Urutkan ruangan: ruangan berawalan PRIORITAS_RUANGAN_PREFIX lebih dulu"""
+    ruangan_prioritas = [r for r in df_ruangan['nama'] if Config.PRIORITAS_RUANGAN_PREFIX in r]
+    ruangan_lain = [r for r in df_ruangan['nama'] if Config.PRIORITAS_RUANGAN_PREFIX not in r]
+    return ruangan_prioritas + ruangan_lain
+
+def build_tasks(
+    daftar_kelas: List[KelasRecord],
+    df_matkul: pd.DataFrame
+) -> Tuple[List[Tuple[KelasRecord, MatkulRecord]], List[str]]:
+    """Susun daftar tugas (kelas, matkul) yang harus dijadwalkan beserta peringatan"""
+    tasks = []
+    peringatan = []
+    
+    # Daftar matkul per (semester, konsentrasi) cukup disusun sekali untuk semua kelas
+    matkul_per_kelompok: Dict[Tuple[int, str], List[MatkulRecord]] = {}
+    
+    for kelas in daftar_kelas:
+        prefix_kelas = kelas.nama[:4]
+        
+        if prefix_kelas not in Config.SEMESTER_KELAS:
+            continue
+
+        semester = Config.SEMESTER_KELAS[prefix_kelas]
+        kelompok = (semester, kelas.konsentrasi)
+        
+        if kelompok not in matkul_per_kelompok:
+            # Filter matkul berdasarkan semester dan konsentrasi
+            matkul_kelas = filter_matkul_by_konsentrasi(df_matkul, semester, kelas.konsentrasi)
+            
+            # Sesuaikan SKS
+            matkul_kelas = adjust_sks(matkul_kelas)
+            
+            # Prioritaskan matkul (yang SKS besar dan wajib dijadwal lebih awal)
+            if not matkul_kelas.empty:
+                matkul_kelas = prioritize_matkul(matkul_kelas)
+            matkul_per_kelompok[kelompok] = to_matkul_records(matkul_kelas)
+        
+        daftar_matkul = matkul_per_kelompok[kelompok]
+        if not daftar_matkul:
+            peringatan.append(f"Tidak ada mata kuliah untuk semester {semester}")
+            continue
+        
+        tasks.extend((kelas, matkul) for matkul in daftar_matkul)
+    
+    return tasks, peringatan
+
+def schedule_greedy(
+    tasks: List[Tuple[KelasRecord, MatkulRecord]],
+    dosen_matkul_index: DosenMatkulIndex,
+    df_ruangan: pd.DataFrame,
+    availability_index: AvailabilityIndex,
+    resource_tracker: ResourceTracker,
+    ruangan_prioritas: List[str],
+    progress_callback: Optional[Callable[[float], None]] = None,
+    rng: Optional[random.Random] = None
+) -> List[Dict[str, Any]]:
+    """Mesin greedy acak: jadwalkan tugas satu per satu sesuai urutan"""
+    rng = rng or random.Random()
+    jadwal_all = []
+    for i, (kelas, matkul) in enumerate(tasks):
+        jadwal_all.append(schedule_matkul(
+            matkul, kelas, dosen_matkul_index, 
+            df_ruangan, availability_index, resource_tracker, 
+            ruangan_prioritas, rng
+        ))
+        if progress_callback is not None:
+            progress_callback((i + 1) / len(tasks))
+    return jadwal_all
+
+class _OpsiSlot(NamedTuple):
+    """Satu nilai domain mesin backtracking: (hari, jam, dosen)"""
+    hari: str
+    jam_mulai: dt_time
+    jam_selesai: dt_time
+    mask: int
+    dosen: str
+
+def schedule_backtracking(
+    tasks: List[Tuple[KelasRecord, MatkulRecord]],
+    dosen_matkul_index: DosenMatkulIndex,
+    availability_index: AvailabilityIndex,
+    resource_tracker: ResourceTracker,
+    ruangan_prioritas: List[str],
+    max_nodes: int = Config.BACKTRACK_MAX_NODES,
+    progress_callback: Optional[Callable[[float], None]] = None,
+    rng: Optional[random.Random] = None
+) -> List[Dict[str, Any]]:
+    """Mesin backtracking global dengan forward checking dan urutan MRV
+    
+    Setiap tugas menyimpan domain opsi (hari, slot, dosen) yang masih layak. Tugas dengan domain
+    tersisa paling sedikit dijadwalkan lebih dulu, domain tugas lain yang berbagi kelas atau dosen
+    dipangkas setelah setiap penempatan, dan pencarian mundur jika ada domain yang kosong. Ruangan
+    dipilih saat penempatan (prioritas B4). Jika batas percobaan habis, penempatan terbaik yang
+    pernah dicapai dipakai dan sisa tugas dicoba sekali lagi secara greedy.
+    """
+    rng = rng or random.Random()
+    rows: List[Optional[Dict[str, Any]]] = [None] * len(tasks)
+    opsi_tugas: List[List[_OpsiSlot]] = [[] for _ in tasks]
+    opsi_per_hari: List[Dict[str, List[int]]] = [{} for _ in tasks]
+    opsi_per_dosen: List[Dict[str, List[int]]] = [{} for _ in tasks]
+    online = [is_matkul_online(matkul) for _, matkul in tasks]
+    
+    # Bangun domain awal setiap tugas
+    aktif_idx = []
+    for t, (kelas, matkul) in enumerate(tasks):
+        dosen_tersedia = dosen_matkul_index.dosen_for(matkul.id)
+        if not dosen_tersedia:
+            rows[t] = build_jadwal_row(
+                kelas, matkul, online[t], 'Cek EdLink', 'Cek EdLink', 'Belum Ditentukan',
+                'Zoom' if online[t] else 'Cek EdLink', '⚠️ Tanpa Dosen'
+            )
+            continue
+        
+        hari_tersedia = Config.HARI_PRIORITAS.get(kelas.jenis.lower(), ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat'])
+        jam_awal, jam_akhir = Config.JAM_OPERASIONAL.get(kelas.jenis.lower(), (dt_time(8, 0), dt_time(17, 0)))
+        durasi = matkul.sks * Config.DURASI_SKS
+        for hari in hari_tersedia:
+            for jam_mulai, jam_selesai in generate_time_slots(jam_awal, jam_akhir, durasi, hari, kelas.jenis):
+                mask = interval_mask(jam_mulai, jam_selesai)
+                if resource_tracker.kelas.overlaps(kelas.nama, hari, mask):
+                    continue
+                for dosen in dosen_tersedia:
+                    if not resource_tracker.within_load_limit(dosen.nama, matkul.sks):
+                        continue
+                    if is_dosen_busy(dosen.nama, hari, jam_mulai, jam_selesai, availability_index, resource_tracker):
+                        continue
+                    opsi_per_hari[t].setdefault(hari, []).append(len(opsi_tugas[t]))
+                    opsi_per_dosen[t].setdefault(dosen.nama, []).append(len(opsi_tugas[t]))
+                    opsi_tugas[t].append(_OpsiSlot(hari, jam_mulai, jam_selesai, mask, dosen.nama))
+        
+        # Tugas tanpa opsi sama sekali tidak mungkin dijadwalkan, jangan ikut pencarian
+        if opsi_tugas[t]:
+            aktif_idx.append(t)
+    
+    tugas_per_kelas = defaultdict(list)
+    tugas_per_dosen = defaultdict(list)
+    for t in aktif_idx:
+        tugas_per_kelas[tasks[t][0].nama].append(t)
+        for nama_dosen in {opsi.dosen for opsi in opsi_tugas[t]}:
+            tugas_per_dosen[nama_dosen].append(t)
+    
+    hidup = [[True] * len(opsi) for opsi in opsi_tugas]
+    ukuran = [len(opsi) for opsi in opsi_tugas]
+    penempatan: Dict[int, Tuple[int, str]] = {}  # tugas -> (indeks opsi, ruangan)
+    jejak: List[Tuple[int, int]] = []  # opsi yang dipangkas, untuk dikembalikan saat mundur
+    
+    def pilih_ruangan(t: int, opsi: _OpsiSlot) -> Optional[str]:
+        if online[t]:
+            return "Zoom"
+        return next((r for r in ruangan_prioritas if not resource_tracker.ruangan.overlaps(r, opsi.hari, opsi.mask)), None)
+    
+    def pangkas(u: int, opsi: _OpsiSlot, hanya_dosen: Optional[str]) -> None:
+        """Pangkas opsi tugas u yang bentrok dengan opsi yang baru ditempatkan"""
+        daftar_hidup = hidup[u]
+        for o in opsi_per_hari[u].get(opsi.hari, ()):
+            if not daftar_hidup[o]:
+                continue
+            kandidat = opsi_tugas[u][o]
+            if hanya_dosen is not None and kandidat.dosen != hanya_dosen:
+                continue
+            if kandidat.mask & opsi.mask:
+                daftar_hidup[o] = False
+                ukuran[u] -= 1
+                jejak.append((u, o))
+    
+    def pangkas_beban(u: int, nama_dosen: str) -> None:
+        """Pangkas semua opsi tugas u dengan dosen yang bebannya tidak cukup lagi untuk tugas itu"""
+        if resource_tracker.within_load_limit(nama_dosen, tasks[u][1].sks):
+            return
+        daftar_hidup = hidup[u]
+        for o in opsi_per_dosen[u].get(nama_dosen, ()):
+            if daftar_hidup[o]:
+                daftar_hidup[o] = False
+                ukuran[u] -= 1
+                jejak.append((u, o))
+    
+    def tempatkan(t: int, o: int, ruangan: str) -> None:
+        """Tempatkan tugas t pada opsi o lalu pangkas domain tugas yang berbagi kelas atau dosen
+        
+        Domain yang menjadi kosong langsung terpilih oleh MRV pada langkah berikutnya sehingga
+        pencarian segera mundur (forward checking).
+        """
+        kelas, matkul = tasks[t]
+        opsi = opsi_tugas[t][o]
+        resource_tracker.add_schedule(kelas.nama, opsi.dosen, ruangan, opsi.hari, opsi.jam_mulai, opsi.jam_selesai, matkul.sks)
+        penempatan[t] = (o, ruangan)
+        for u in tugas_per_kelas[kelas.nama]:
+            if u not in penempatan:
+                pangkas(u, opsi, None)
+        for u in tugas_per_dosen[opsi.dosen]:
+            if u not in penempatan:
+                pangkas(u, opsi, opsi.dosen)
+                pangkas_beban(u, opsi.dosen)
+    
+    def lepaskan(t: int, batas_jejak: int) -> None:
+        """Batalkan penempatan tugas t dan kembalikan domain yang dipangkas sejak batas_jejak"""
+        kelas, matkul = tasks[t]
+        o, ruangan = penempatan.pop(t)
+        opsi = opsi_tugas[t][o]
+        resource_tracker.remove_schedule(kelas.nama, opsi.dosen, ruangan, opsi.hari, opsi.jam_mulai, opsi.jam_selesai, matkul.sks)
+        while len(jejak) > batas_jejak:
+            u, o_pangkas = jejak.pop()
+            hidup[u][o_pangkas] = True
+            ukuran[u] += 1
+    
+    def pilih_tugas() -> Optional[int]:
+        """MRV: tugas belum terjadwal dengan domain tersisa paling sedikit (seri: SKS terbesar)"""
+        terbaik = None
+        for t in aktif_idx:
+            if t in penempatan or t in dilewati:
+                continue
+            if terbaik is None or (ukuran[t], -tasks[t][1].sks) < (ukuran[terbaik], -tasks[terbaik][1].sks):
+                terbaik = t
+        return terbaik
+    
+    def buka_frame(t: int) -> List[Any]:
+        kandidat = [o for o in range(len(opsi_tugas[t])) if hidup[t][o]]
+        rng.shuffle(kandidat)
+        return [t, kandidat, 0, len(jejak)]
+    
+    # Frame pencarian: [tugas, kandidat opsi, posisi kandidat berikutnya, batas jejak]
+    stack: List[List[Any]] = []
+    terbaik_penempatan: Dict[int, Tuple[int, str]] = {}
+    dilewati: set = set()  # tugas buntu yang sengaja dilepas agar pencarian tetap maju
+    jumlah_percobaan = 0
+    jumlah_mundur = 0  # langkah mundur sejak kemajuan terakhir
+    selesai = False
+    
+    t = pilih_tugas()
+    if t is None:
+        selesai = True
+    else:
+        stack.append(buka_frame(t))
+    
+    while stack and jumlah_percobaan < max_nodes:
+        frame = stack[-1]
+        t, kandidat, posisi, batas_jejak = frame
+        
+        # Lepaskan penempatan sebelumnya di frame ini sebelum mencoba kandidat berikutnya
+        if t in penempatan:
+            lepaskan(t, batas_jejak)
+        
+        ditempatkan = False
+        while posisi < len(kandidat):
+            o = kandidat[posisi]
+            posisi += 1
+            ruangan = pilih_ruangan(t, opsi_tugas[t][o])
+            if ruangan is None:
+                continue
+            jumlah_percobaan += 1
+            tempatkan(t, o, ruangan)
+            ditempatkan = True
+            break
+        frame[2] = posisi
+        
+        if not ditempatkan:
+            # Domain habis: mundur ke tugas sebelumnya, kecuali sudah terlalu lama buntu atau
+            # frame sebelumnya adalah tugas yang dilewati (batas mundur)
+            bisa_mundur = len(stack) > 1 and stack[-2][0] not in dilewati
+            if bisa_mundur and jumlah_mundur < Config.BACKTRACK_MAX_MUNDUR:
+                jumlah_mundur += 1
+                stack.pop()
+                continue
+            # Lewati tugas ini dan lanjutkan dengan tugas lain
+            dilewati.add(t)
+            jumlah_mundur = 0
+        
+        if len(penempatan) > len(terbaik_penempatan):
+            terbaik_penempatan = dict(penempatan)
+            jumlah_mundur = 0
+            if progress_callback is not None:
+                progress_callback(len(terbaik_penempatan) / max(len(aktif_idx), 1))
+        
+        berikutnya = pilih_tugas()
+        if berikutnya is None:
+            selesai = True
+            break
+        stack.append(buka_frame(berikutnya))
+    
+    logging.info(
+        f"Backtracking selesai: {len(terbaik_penempatan)}/{len(aktif_idx)} tugas, "
+        f"{jumlah_percobaan} percobaan, {len(dilewati)} dilewati, {'lengkap' if selesai else 'batas tercapai'}"
+    )
+    
+    # Kembalikan tracker ke kondisi awal lalu pasang penempatan terbaik
+    while stack:
+        t, _, _, batas_jejak = stack.pop()
+        if t in penempatan:
+            lepaskan(t, batas_jejak)
+        dilewati.discard(t)
+    for t, (o, ruangan) in terbaik_penempatan.items():
+        kelas, matkul = tasks[t]
+        opsi = opsi_tugas[t][o]
+        resource_tracker.add_schedule(kelas.nama, opsi.dosen, ruangan, opsi.hari, opsi.jam_mulai, opsi.jam_selesai, matkul.sks)
+        rows[t] = build_jadwal_row(
+            kelas, matkul, online[t], opsi.hari, format_jam(opsi.jam_mulai, opsi.jam_selesai),
+            opsi.dosen, ruangan, '✅'
+        )
+    
+    # Sisa tugas dicoba sekali secara greedy di atas penempatan terbaik
+    for t in range(len(tasks)):
+        if rows[t] is not None:
+            continue
+        kelas, matkul = tasks[t]
+        for opsi in opsi_tugas[t]:
+            if not resource_tracker.within_load_limit(opsi.dosen, matkul.sks):
+                continue
+            if resource_tracker.is_conflict(kelas.nama, opsi.dosen, None, opsi.hari, opsi.jam_mulai, opsi.jam_selesai):
+                continue
+            ruangan = pilih_ruangan(t, opsi)
+            if ruangan is None:
+                continue
+            resource_tracker.add_schedule(kelas.nama, opsi.dosen, ruangan, opsi.hari, opsi.jam_mulai, opsi.jam_selesai, matkul.sks)
+            rows[t] = build_jadwal_row(
+                kelas, matkul, online[t], opsi.hari, format_jam(opsi.jam_mulai, opsi.jam_selesai),
+                opsi.dosen, ruangan, '✅'
+            )
+            break
+        else:
+            rows[t] = build_jadwal_row(
+                kelas, matkul, online[t], 'Cek EdLink', 'Cek EdLink',
+                dosen_matkul_index.dosen_for(matkul.id)[0].nama,
+                'Zoom' if online[t] else 'Cek EdLink',
+                '⚠️ Tidak ada slot layak' if not opsi_tugas[t] else '⚠️ Gagal (backtracking)'
+            )
+    
+    if progress_callback is not None:
+        progress_callback(1.0)
+    return rows
+
+def _add_interval_capacity(model: Any, items: List[Tuple[Tuple[int, int], Any]], kapasitas: Callable[[int], int]) -> None:
+    """Batasi jumlah opsi yang aktif di setiap titik mulai interval (cukup untuk interval pada satu garis waktu)"""
+    for titik in sorted({start for (start, _), _ in items}):
+        aktif = [var for (start, end), var in items if start <= titik < end]
+        batas = kapasitas(titik)
+        if len(aktif) <= batas:
+            continue
+        if batas == 1:
+            model.AddAtMostOne(aktif)
+        else:
+            model.Add(sum(aktif) <= max(batas, 0))
+
+def schedule_cpsat(
+    tasks: List[Tuple[KelasRecord, MatkulRecord]],
+    dosen_matkul_index: DosenMatkulIndex,
+    availability_index: AvailabilityIndex,
+    resource_tracker: ResourceTracker,
+    ruangan_prioritas: List[str],
+    time_limit: float = Config.CPSAT_TIME_LIMIT,
+    seed: int = 0
+) -> Tuple[Optional[List[Dict[str, Any]]], str, bool]:
+    """Mesin CP-SAT: modelkan semua penugasan (kelas, matkul) sekaligus
+    
+    Constraint keras sama dengan mesin greedy (bentrok kelas, dosen, ruangan, ketersediaan dosen,
+    sholat Jumat, istirahat, jam operasional). Objektif: maksimalkan jumlah matkul terjadwal, lalu
+    minimalkan jumlah hari kuliah per kelas. Status OPTIMAL berarti terbukti tidak ada jadwal yang
+    bisa menempatkan lebih banyak matkul.
+    
+    Solver memakai seed, jumlah worker tetap, pencarian interleave, dan batas waktu deterministik
+    sehingga input dan seed yang sama memberi jadwal yang sama. Mengembalikan (baris jadwal atau None,
+    nama status solver, dapat diulang); hasil tidak dapat diulang jika batas waktu dinding tercapai.
+    """
+    cp_model = load_cp_model()
+    model = cp_model.CpModel()
+    rows: List[Optional[Dict[str, Any]]] = [None] * len(tasks)
+    opsi_per_tugas: List[List[Tuple[Any, str, dt_time, dt_time, str, List[Tuple[Any, str]]]]] = []
+    terjadwal_vars = []
+    
+    per_kelas = defaultdict(list)
+    per_dosen = defaultdict(list)
+    sks_per_dosen = defaultdict(list)
+    offline_per_hari = defaultdict(list)
+    per_ruangan = defaultdict(list)
+    hari_kelas_vars: Dict[Tuple[str, str], Any] = {}
+    
+    # Ruangan yang kosong sepanjang hari saling dapat dipertukarkan (cukup batasan kapasitas);
+    # ruangan yang sebagian sudah terpakai (mis. baris terkunci) dimodelkan satu per satu
+    ruangan_kosong: Dict[str, List[str]] = {}
+    ruangan_sebagian: Dict[str, List[str]] = {}
+    for hari in Config.URUTAN_HARI:
+        ruangan_kosong[hari] = [r for r in ruangan_prioritas if not resource_tracker.ruangan.overlaps(r, hari, -1)]
+        ruangan_sebagian[hari] = [r for r in ruangan_prioritas if resource_tracker.ruangan.overlaps(r, hari, -1)]
+    
+    for t, (kelas, matkul) in enumerate(tasks):
+        is_online = is_matkul_online(matkul)
+        dosen_tersedia = dosen_matkul_index.dosen_for(matkul.id)
+        opsi = []
+        opsi_per_tugas.append(opsi)
+        
+        if not dosen_tersedia:
+            rows[t] = build_jadwal_row(
+                kelas, matkul, is_online, 'Cek EdLink', 'Cek EdLink', 'Belum Ditentukan',
+                'Zoom' if is_online else 'Cek EdLink', '⚠️ Tanpa Dosen'
+            )
+            continue
+        
+        hari_tersedia = Config.HARI_PRIORITAS.get(kelas.jenis.lower(), ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat'])
+        jam_awal, jam_akhir = Config.JAM_OPERASIONAL.get(kelas.jenis.lower(), (dt_time(8, 0), dt_time(17, 0)))
+        durasi = matkul.sks * Config.DURASI_SKS
+        
+        for hari in hari_tersedia:
+            for jam_mulai, jam_selesai in generate_time_slots(jam_awal, jam_akhir, durasi, hari, kelas.jenis):
+                if resource_tracker.kelas.overlaps(kelas.nama, hari, interval_mask(jam_mulai, jam_selesai)):
+                    continue
+                interval = (time_to_minutes(jam_mulai), time_to_minutes(jam_selesai))
+                ruangan_cocok = [] if is_online else [
+                    r for r in ruangan_sebagian.get(hari, [])
+                    if not resource_tracker.ruangan.overlaps(r, hari, interval_mask(jam_mulai, jam_selesai))
+                ]
+                if not is_online and not ruangan_kosong.get(hari) and not ruangan_cocok:
+                    continue
+                for dosen in dosen_tersedia:
+                    if not resource_tracker.within_load_limit(dosen.nama, matkul.sks):
+                        continue
+                    if is_dosen_busy(dosen.nama, hari, jam_mulai, jam_selesai, availability_index, resource_tracker):
+                        continue
+                    var = model.NewBoolVar(f"x_{t}_{len(opsi)}")
+                    ruangan_vars: List[Tuple[Any, str]] = []
+                    opsi.append((var, hari, jam_mulai, jam_selesai, dosen.nama, ruangan_vars))
+                    per_kelas[(kelas.nama, hari)].append((interval, var))
+                    per_dosen[(dosen.nama, hari)].append((interval, var))
+                    sks_per_dosen[dosen.nama].append((matkul.sks, var))
+                    if not is_online and not ruangan_cocok:
+                        offline_per_hari[hari].append((interval, var))
+                    elif not is_online:
+                        # Opsi ini memakai salah satu ruangan kosong atau tepat satu ruangan sebagian
+                        pilihan_ruangan = []
+                        if ruangan_kosong.get(hari):
+                            var_kosong = model.NewBoolVar(f"x_{t}_{len(opsi)}_kosong")
+                            offline_per_hari[hari].append((interval, var_kosong))
+                            pilihan_ruangan.append(var_kosong)
+                        for ruangan in ruangan_cocok:
+                            var_ruangan = model.NewBoolVar(f"x_{t}_{len(opsi)}_{ruangan}")
+                            per_ruangan[(ruangan, hari)].append((interval, var_ruangan))
+                            ruangan_vars.append((var_ruangan, ruangan))
+                            pilihan_ruangan.append(var_ruangan)
+                        model.Add(sum(pilihan_ruangan) == var)
+                    
+                    # Tandai hari kuliah kelas terpakai jika opsi ini dipilih
+                    kunci_hari = (kelas.nama, hari)
+                    if kunci_hari not in hari_kelas_vars:
+                        hari_kelas_vars[kunci_hari] = model.NewBoolVar(f"hari_{kelas.nama}_{hari}")
+                    model.AddImplication(var, hari_kelas_vars[kunci_hari])
+        
+        terjadwal = model.NewBoolVar(f"terjadwal_{t}")
+        model.Add(sum(var for var, *_ in opsi) == terjadwal)
+        terjadwal_vars.append(terjadwal)
+    
+    # Bentrok kelas dan dosen: paling banyak satu sesi aktif di setiap titik waktu
+    for items in list(per_kelas.values()) + list(per_dosen.values()):
+        _add_interval_capacity(model, items, lambda titik: 1)
+    
+    # Beban mengajar: total SKS dosen (termasuk yang sudah ada di tracker) tidak melebihi batas
+    if Config.MAX_SKS_DOSEN is not None:
+        for nama_dosen, items in sks_per_dosen.items():
+            sisa = Config.MAX_SKS_DOSEN - resource_tracker.beban_dosen.get(nama_dosen, 0)
+            model.Add(sum(sks * var for sks, var in items) <= max(sisa, 0))
+    
+    # Ruangan kosong dapat dipertukarkan, cukup batasi jumlah sesi offline dengan jumlah ruangan kosong;
+    # ruangan sebagian hanya ditawarkan bila bebas sepanjang interval, paling banyak satu sesi sekaligus
+    for hari, items in offline_per_hari.items():
+        _add_interval_capacity(model, items, lambda titik, hari=hari: len(ruangan_kosong.get(hari, [])))
+    for items in per_ruangan.values():
+        _add_interval_capacity(model, items, lambda titik: 1)
+    
+    solver = cp_model.CpSolver()
+    solver.parameters.random_seed = seed % (2 ** 31)
+    solver.parameters.num_workers = Config.CPSAT_WORKERS
+    solver.parameters.interleave_search = True
+    
+    # Tahap 1: maksimalkan jumlah matkul terjadwal
+    model.Maximize(sum(terjadwal_vars))
+    solver.parameters.max_deterministic_time = time_limit
+    solver.parameters.max_time_in_seconds = Config.CPSAT_WALL_LIMIT
+    status = solver.Solve(model)
+    waktu_dinding = solver.WallTime()
+    waktu_deterministik = solver.deterministic_time
+    jumlah_terbukti = status == cp_model.OPTIMAL
+    
+    def ambil_pilihan() -> List[Tuple[str, dt_time, int, dt_time, str, Optional[str]]]:
+        """Ambil opsi terpilih dari solusi terakhir solver (ruangan None berarti ruangan kosong mana saja)"""
+        pilihan = []
+        for t, opsi in enumerate(opsi_per_tugas):
+            for var, hari, jam_mulai, jam_selesai, nama_dosen, ruangan_vars in opsi:
+                if solver.Value(var):
+                    ruangan = next((r for var_ruangan, r in ruangan_vars if solver.Value(var_ruangan)), None)
+                    pilihan.append((hari, jam_mulai, t, jam_selesai, nama_dosen, ruangan))
+                    break
+        return pilihan
+    
+    terpilih = ambil_pilihan() if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else []
+    
+    # Tahap 2: kunci jumlah terjadwal, lalu minimalkan jumlah hari kuliah per kelas dengan sisa waktu
+    sisa_waktu = time_limit - waktu_deterministik
+    sisa_dinding = Config.CPSAT_WALL_LIMIT - waktu_dinding
+    if jumlah_terbukti and hari_kelas_vars and sisa_waktu > 0 and sisa_dinding > 0:
+        model.Add(sum(terjadwal_vars) == round(solver.ObjectiveValue()))
+        for var in terjadwal_vars:
+            model.AddHint(var, solver.Value(var))
+        for opsi in opsi_per_tugas:
+            for var, *_, ruangan_vars in opsi:
+                model.AddHint(var, solver.Value(var))
+                for var_ruangan, _ in ruangan_vars:
+                    model.AddHint(var_ruangan, solver.Value(var_ruangan))
+        model.Minimize(sum(hari_kelas_vars.values()))
+        solver.parameters.max_deterministic_time = sisa_waktu
+        solver.parameters.max_time_in_seconds = sisa_dinding
+        status_tahap2 = solver.Solve(model)
+        waktu_dinding += solver.WallTime()
+        if status_tahap2 in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            status = status_tahap2
+            terpilih = ambil_pilihan()
+    
+    status_name = solver.StatusName(status)
+    dapat_diulang = waktu_dinding < Config.CPSAT_WALL_LIMIT
+    logging.info(f"CP-SAT selesai: {status_name}, {len(tasks)} tugas, {len(terpilih)} terjadwal, {waktu_dinding:.1f} detik")
+    if not dapat_diulang:
+        logging.warning(f"CP-SAT berhenti oleh batas waktu dinding {Config.CPSAT_WALL_LIMIT} detik, hasil tidak dapat diulang")
+    
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return None, status_name, dapat_diulang
+    
+    # Tetapkan ruangan per hari berurutan menurut jam mulai (partisi interval, ruangan prioritas dulu)
+    for hari, jam_mulai, t, jam_selesai, nama_dosen, ruangan in sorted(terpilih, key=lambda x: (HARI_INDEX.get(x[0], 0), x[1], x[2])):
+        kelas, matkul = tasks[t]
+        is_online = is_matkul_online(matkul)
+        if is_online:
+            ruangan = "Zoom"
+        elif ruangan is None:
+            mask = interval_mask(jam_mulai, jam_selesai)
+            ruangan = next((r for r in ruangan_kosong[hari] if not resource_tracker.ruangan.overlaps(r, hari, mask)), None)
+            if ruangan is None:
+                # Model menjamin kapasitas ruangan, jadi ini bug model, bukan keterbatasan data
+                raise RuntimeError(
+                    f"CP-SAT memilih {matkul.nama} ({kelas.nama}) {hari} {format_jam(jam_mulai, jam_selesai)} "
+                    "tetapi tidak ada ruangan bebas"
+                )
+        resource_tracker.add_schedule(kelas.nama, nama_dosen, ruangan, hari, jam_mulai, jam_selesai, matkul.sks)
+        rows[t] = build_jadwal_row(
+            kelas, matkul, is_online, hari, format_jam(jam_mulai, jam_selesai), nama_dosen, ruangan, '✅'
+        )
+    
+    keterangan_gagal = '⚠️ Tidak ada slot layak (CP-SAT)' if jumlah_terbukti else '⚠️ Tidak terjadwal (CP-SAT)'
+    for t, (kelas, matkul) in enumerate(tasks):
+        if rows[t] is None:
+            is_online = is_matkul_online(matkul)
+            rows[t] = build_jadwal_row(
+                kelas, matkul, is_online, 'Cek EdLink', 'Cek EdLink',
+                dosen_matkul_index.dosen_for(matkul.id)[0].nama,
+                'Zoom' if is_online else 'Cek EdLink', keterangan_gagal
+            )
+    
+    return rows, status_name, dapat_diulang
+
+def new_seed() -> int:
+    """Ambil seed acak baru untuk satu kali generate"""
+    return random.SystemRandom().randrange(2 ** 31)
+
+# Cache hash workbook: path -> ((mtime_ns, size), sha256)
+_WORKBOOK_HASH_CACHE: Dict[str, Tuple[Tuple[int, int], str]] = {}
+
+def workbook_hash(file_path: str = "data.xlsx") -> str:
+    """Hash SHA-256 isi file workbook (di-cache berdasarkan mtime dan ukuran file)"""
+    signature = _workbook_signature(file_path)
+    cached = _WORKBOOK_HASH_CACHE.get(file_path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for blok in iter(lambda: f.read(1 << 20), b''):
+            digest.update(blok)
+    _WORKBOOK_HASH_CACHE[file_path] = (signature, digest.hexdigest())
+    return digest.hexdigest()
+
+@lru_cache(maxsize=1)
+def code_hash() -> str:
+    """Hash SHA-256 kode modul penjadwalan ini, agar perubahan mesin membuat hasil lama di cache tidak terpakai"""
+    with open(os.path.abspath(__file__), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def config_snapshot() -> Dict[str, Any]:
+    """Salinan nilai Config dalam bentuk yang bisa diserialisasi ke JSON"""
+    return json.loads(json.dumps(
+        {nama: nilai for nama, nilai in vars(Config).items() if nama.isupper()},
+        default=str, sort_keys=True
+    ))
+
+def jadwal_hash(jadwal_df: pd.DataFrame) -> str:
+    """Hash SHA-256 isi jadwal untuk membandingkan hasil antar run"""
+    return hashlib.sha256(jadwal_df.to_csv(index=False).encode('utf-8')).hexdigest()
+
+def cpsat_parameters(seed: Optional[int]) -> Dict[str, Any]:
+    """Parameter solver CP-SAT yang menentukan hasil untuk seed tertentu (dicatat di manifest)"""
+    versi_ortools = None
+    if load_cp_model() is not None:
+        import ortools
+        versi_ortools = ortools.__version__
+    return {
+        'random_seed': None if seed is None else seed % (2 ** 31),
+        'num_workers': Config.CPSAT_WORKERS,
+        'interleave_search': True,
+        'max_deterministic_time': Config.CPSAT_TIME_LIMIT,
+        'max_time_in_seconds': Config.CPSAT_WALL_LIMIT,
+        'ortools': versi_ortools,
+    }
+
+def build_run_manifest(
+    seed: Optional[int],
+    engine: str,
+    file_path: str = "data.xlsx",
+    jadwal_df: Optional[pd.DataFrame] = None,
+    **extra: Any
+) -> Dict[str, Any]:
+    """Manifest satu run generate: seed, hash workbook, dan nilai Config untuk reproduksi"""
+    manifest = {
+        'seed': seed,
+        'engine': engine,
+        'workbook': file_path,
+        'workbook_sha256': workbook_hash(file_path),
+        'config': config_snapshot(),
+        'kode_sha256': code_hash(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'dibuat': datetime.now().isoformat(timespec='seconds'),
+    }
+    if jadwal_df is not None:
+        manifest['jadwal_sha256'] = jadwal_hash(jadwal_df)
+    manifest.update(extra)
+    return manifest
+
+class GenerationResult(NamedTuple):
+    """Hasil satu kali generate jadwal beserta pesan untuk ditampilkan"""
+    jadwal: Optional[pd.DataFrame]
+    errors: List[str]
+    warnings: List[str]
+    info: List[str]
+    seed: Optional[int] = None
+    dapat_diulang: bool = True  # False jika seed yang sama belum tentu memberi jadwal yang sama
+
+def data_hash(data: Tuple[Optional[pd.DataFrame], ...]) -> str:
+    """Hash SHA-256 isi semua sheet input (kolom dan nilai)"""
+    digest = hashlib.sha256()
+    for df in data:
+        if df is None:
+            digest.update(b'<none>')
+            continue
+        digest.update(json.dumps([str(c) for c in df.columns]).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(df.astype(str), index=False).values.tobytes())
+    return digest.hexdigest()
+
+class ScheduleCache:
+    """Cache hasil generate di disk, dialamatkan oleh hash input + Config + engine + seed
+    
+    Setiap entri berupa file jadwal (Parquet, atau pickle jika pyarrow tidak tersedia) dan file
+    JSON berisi manifest serta pesan run. Entri yang paling lama tidak dipakai dibuang saat total
+    ukuran melebihi batas.
+    """
+    def __init__(self, directory: str = Config.CACHE_DIR, max_mb: float = Config.CACHE_MAX_MB):
+        self.directory = directory
+        self.max_bytes = int(max_mb * 1024 * 1024)
+    
+    @staticmethod
+    def make_key(
+        data: Tuple[Optional[pd.DataFrame], ...],
+        engine: str,
+        seed: int,
+        n_runs: int = 1,
+        jadwal_terkunci: Optional[pd.DataFrame] = None
+    ) -> str:
+        """Kunci cache untuk satu permintaan generate
+        
+        Hash kode modul ikut di kunci, sehingga perubahan mesin penjadwalan tidak menyajikan hasil lama.
+        Untuk CP-SAT, parameter solver dan versi ortools ikut menentukan hasil sehingga ikut di kunci.
+        """
+        isi = json.dumps({
+            'kode': code_hash(),
+            'data': data_hash(data),
+            'terkunci': data_hash((jadwal_terkunci,)),
+            'config': config_snapshot(),
+            'engine': engine,
+            'seed': seed,
+            'percobaan': n_runs,
+            'solver': cpsat_parameters(seed) if engine == "cpsat" else None,
+        }, sort_keys=True)
+        return hashlib.sha256(isi.encode('utf-8')).hexdigest()
+    
+    def _paths(self, key: str) -> Tuple[str, str, str]:
+        base = os.path.join(self.directory, key)
+        return base + '.parquet', base + '.pkl', base + '.json'
+    
+    def get(self, key: str) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        """Ambil (jadwal, metadata) dari cache, atau None jika tidak ada"""
+        path_parquet, path_pickle, path_meta = self._paths(key)
+        try:
+            with open(path_meta, encoding='utf-8') as f:
+                meta = json.load(f)
+            if os.path.exists(path_parquet):
+                path_data = path_parquet
+                jadwal = pd.read_parquet(path_parquet)
+            else:
+                path_data = path_pickle
+                jadwal = pd.read_pickle(path_pickle)
+        except (OSError, ValueError, ImportError) as e:
+            if not isinstance(e, FileNotFoundError):
+                logging.warning(f"Entri cache {key[:12]} tidak bisa dibaca: {str(e)}")
+            return None
+        
+        # Tandai sebagai baru dipakai untuk urutan LRU
+        for path in (path_data, path_meta):
+            os.utime(path)
+        return jadwal, meta
+    
+    def put(self, key: str, jadwal: pd.DataFrame, meta: Dict[str, Any]) -> None:
+        """Simpan jadwal dan metadata ke cache lalu buang entri lama jika melebihi batas"""
+        path_parquet, path_pickle, path_meta = self._paths(key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            try:
+                jadwal.to_parquet(path_parquet, index=False)
+            except ImportError:
+                jadwal.to_pickle(path_pickle)
+            with open(path_meta, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False, default=str)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Gagal menyimpan cache {key[:12]}: {str(e)}")
+            return
+        self.evict()
+    
+    def evict(self) -> int:
+        """Buang entri yang paling lama tidak dipakai sampai ukuran cache di bawah batas"""
+        if not os.path.isdir(self.directory):
+            return 0
+        entri: Dict[str, List[Tuple[str, os.stat_result]]] = defaultdict(list)
+        for nama in os.listdir(self.directory):
+            path = os.path.join(self.directory, nama)
+            entri[os.path.splitext(nama)[0]].append((path, os.stat(path)))
+        
+        total = sum(stat.st_size for files in entri.values() for _, stat in files)
+        dibuang = 0
+        for key, files in sorted(entri.items(), key=lambda x: max(stat.st_mtime_ns for _, stat in x[1])):
+            if total <= self.max_bytes:
+                break
+            for path, stat in files:
+                os.remove(path)
+                total -= stat.st_size
+            dibuang += 1
+        if dibuang:
+            logging.info(f"Cache jadwal: {dibuang} entri lama dibuang")
+        return dibuang
+
+def run_generation(
+    data: Tuple[pd.DataFrame, ...],
+    engine: str = "greedy",
+    progress_callback: Optional[Callable[[float], None]] = None,
+    seed: Optional[int] = None,
+    jadwal_terkunci: Optional[pd.DataFrame] = None
+) -> GenerationResult:
+    """Inti generate jadwal dari data workbook (tanpa UI)
+    
+    Semua keputusan acak memakai RNG privat dari seed, sehingga input dan seed yang sama
+    menghasilkan jadwal yang identik. Tanpa seed, seed baru diambil dan dicatat di hasil.
+    Baris di jadwal_terkunci dipertahankan apa adanya: waktunya lebih dulu dimasukkan ke tracker
+    dan tugas (kelas, matkul) yang sama tidak dijadwalkan lagi.
+    """
+    if seed is None:
+        seed = new_seed()
+    rng = random.Random(seed)
+    df_kelas, df_matkul, df_dosen, df_dosen_matkul, df_hari, df_ruangan, df_availability = data
+    warnings_list: List[str] = []
+    info: List[str] = []
+    if df_kelas is None or df_matkul is None or df_dosen is None or df_dosen_matkul is None:
+        return GenerationResult(None, ["Data tidak lengkap, pastikan semua sheet ada di file Excel"], [], [], seed)
+
+    # Indeks hubungan dosen-matkul dipakai bersama oleh validasi dan penjadwalan
+    dosen_matkul_index = DosenMatkulIndex(df_dosen, df_dosen_matkul)
+    
+    # Validasi data
+    validation_errors = validate_all_data(df_kelas, df_matkul, df_dosen, df_dosen_matkul, dosen_matkul_index)
+    if validation_errors:
+        return GenerationResult(None, ["Error validasi data:\n- " + "\n- ".join(validation_errors)], [], [], seed)
+
+    if jadwal_terkunci is None:
+        jadwal_terkunci = pd.DataFrame(columns=['Kelas', 'Konsentrasi', 'Hari', 'Jam', 'Mata Kuliah', 'Dosen', 'Ruangan', 'SKS', 'Semester'])
+    
+    # Inisialisasi konsentrasi jika belum ada (kelas dengan baris terkunci memakai konsentrasi barisnya)
+    df_kelas = df_kelas.copy()
+    if 'konsentrasi' not in df_kelas.columns:
+        konsentrasi_terkunci = dict(zip(jadwal_terkunci['Kelas'], jadwal_terkunci['Konsentrasi']))
+        df_kelas['konsentrasi'] = df_kelas['nama'].apply(
+            lambda x: konsentrasi_terkunci.get(x) or (
+                'umum' if x[:4] in ['TI24', 'TI23'] else rng.choice(Config.KONSENTRASI_OPTIONS)
+            )
+        )
+    
+    # Prioritaskan ruangan
+    ruangan_prioritas = prepare_ruangan_prioritas(df_ruangan)
+    
+    semua_tasks, peringatan = build_tasks(to_kelas_records(df_kelas), df_matkul)
+    warnings_list.extend(peringatan)
+    
+    # Tugas yang sudah punya baris terkunci tidak dijadwalkan ulang
+    terkunci_per_tugas: Dict[Tuple[str, str, int], List[Dict[str, Any]]] = defaultdict(list)
+    for baris in jadwal_terkunci.to_dict('records'):
+        terkunci_per_tugas[(baris['Kelas'], baris['Mata Kuliah'], baris['Semester'])].append(baris)
+    urutan: List[Optional[Dict[str, Any]]] = []
+    tasks = []
+    for kelas, matkul in semua_tasks:
+        daftar = terkunci_per_tugas.get((kelas.nama, matkul.nama, matkul.semester))
+        if daftar:
+            urutan.append(daftar.pop(0))
+        else:
+            urutan.append(None)
+            tasks.append((kelas, matkul))
+    sisa_terkunci = [baris for daftar in terkunci_per_tugas.values() for baris in daftar]
+    if sisa_terkunci:
+        warnings_list.append(
+            f"{len(sisa_terkunci)} baris terkunci tidak cocok dengan daftar mata kuliah saat ini, tetap dipertahankan"
+        )
+    if len(jadwal_terkunci):
+        info.append(f"{len(jadwal_terkunci)} baris terkunci dipertahankan, {len(tasks)} sesi dijadwalkan")
+    
+    def gabung(jadwal_all: List[Dict[str, Any]]) -> pd.DataFrame:
+        """Sisipkan hasil penjadwalan ke posisi tugasnya di antara baris terkunci"""
+        hasil = iter(jadwal_all)
+        rows = [baris if baris is not None else next(hasil) for baris in urutan]
+        return pd.DataFrame(rows + sisa_terkunci)
+    
+    resource_tracker = tracker_from_jadwal(jadwal_terkunci)
+    availability_index = AvailabilityIndex(df_availability)
+    
+    if engine == "cpsat":
+        if load_cp_model() is None:
+            warnings_list.append("Mesin CP-SAT membutuhkan package ortools. Install dengan: pip install ortools. Memakai mesin greedy.")
+        else:
+            jadwal_all, status, dapat_diulang = schedule_cpsat(
+                tasks, dosen_matkul_index, availability_index, resource_tracker, ruangan_prioritas, seed=seed
+            )
+            if not dapat_diulang:
+                warnings_list.append(
+                    f"CP-SAT berhenti oleh batas waktu {Config.CPSAT_WALL_LIMIT} detik, "
+                    f"jadwal dengan seed {seed} belum tentu bisa diulang"
+                )
+            if jadwal_all is not None:
+                info.append(f"Status solver CP-SAT: {status}")
+                return GenerationResult(gabung(jadwal_all), [], warnings_list, info, seed, dapat_diulang)
+            warnings_list.append(f"CP-SAT tidak menemukan solusi (status {status}). Memakai mesin greedy.")
+            resource_tracker = tracker_from_jadwal(jadwal_terkunci)
+    
+    if engine == "backtracking":
+        jadwal_all = schedule_backtracking(
+            tasks, dosen_matkul_index, availability_index, resource_tracker,
+            ruangan_prioritas, progress_callback=progress_callback, rng=rng
+        )
+    else:
+        jadwal_all = schedule_greedy(
+            tasks, dosen_matkul_index, df_ruangan, availability_index, 
+            resource_tracker, ruangan_prioritas, progress_callback, rng
+        )
+    
+    return GenerationResult(gabung(jadwal_all), [], warnings_list, info, seed)
+
+def count_conflicts(jadwal_df: pd.DataFrame) -> int:
+    """Hitung jumlah baris jadwal yang bentrok (kelas, dosen, atau ruangan) dengan baris sebelumnya"""
+    tracker = ResourceTracker()
+    konflik = 0
+    for kelas, hari, jam, dosen, ruangan in zip(
+        jadwal_df['Kelas'], jadwal_df['Hari'], jadwal_df['Jam'], jadwal_df['Dosen'], jadwal_df['Ruangan']
+    ):
+        rentang = parse_jam(jam)
+        if rentang is None:
+            continue
+        if tracker.is_conflict(kelas, dosen, ruangan, hari, *rentang):
+            konflik += 1
+        tracker.add_schedule(kelas, dosen, ruangan, hari, *rentang)
+    return konflik
+
+def score_jadwal(jadwal_df: pd.DataFrame) -> Tuple[int, int, float]:
+    """Skor kualitas jadwal (makin kecil makin baik): (tidak terjadwal, bentrok, simpangan beban SKS dosen)"""
+    terjadwal = jadwal_df['Hari'] != 'Cek EdLink'
+    beban = jadwal_df[terjadwal].groupby('Dosen')['SKS'].sum()
+    simpangan = float(beban.std(ddof=0)) if len(beban) > 1 else 0.0
+    return int((~terjadwal).sum()), count_conflicts(jadwal_df), round(simpangan, 4)
+
+class ConflictIndex:
+    """Indeks interval terurut per sumber daya untuk mendeteksi konflik jadwal secara inkremental
+    
+    Setiap (jenis, nama, hari) menyimpan list (menit mulai, menit selesai, baris) yang terurut,
+    sehingga perubahan satu baris hanya memeriksa interval di sekitar baris itu. Selain bentrok
+    kelas, dosen, dan ruangan, indeks juga mencatat pelanggaran ketersediaan dosen, waktu
+    terlarang (sholat Jumat), waktu istirahat, dan format jam yang tidak valid.
+    """
+    KOLOM = ['Hari', 'Jam', 'Kelas', 'Dosen', 'Ruangan']
+    
+    def __init__(self, jadwal_df: pd.DataFrame, availability_index: Optional[AvailabilityIndex] = None):
+        self.availability_index = availability_index or AvailabilityIndex()
+        self.intervals: Dict[Tuple[str, str, str], List[Tuple[int, int, Any]]] = defaultdict(list)
+        self.rows: Dict[Any, Tuple[Any, ...]] = {}
+        self.bentrok: Dict[Any, Dict[Any, set]] = {}  # baris -> {baris lain: {jenis sumber daya}}
+        self.pelanggaran: Dict[Any, List[Tuple[str, str]]] = {}  # baris -> [(jenis, keterangan)]
+        self.jumlah_konflik = 0  # pasangan bentrok per jenis sumber daya ditambah pelanggaran
+        self.max_durasi = 0
+        for baris, values in zip(jadwal_df.index, zip(*(jadwal_df[c] for c in self.KOLOM))):
+            self.update_row(baris, *values)
+    
+    @staticmethod
+    def _sumber(kelas: Any, dosen: Any, ruangan: Any) -> List[Tuple[str, Any]]:
+        """Sumber daya yang dipakai satu baris (dosen belum ditentukan dan ruangan online diabaikan)"""
+        sumber = [('Kelas', kelas)]
+        if isinstance(dosen, str) and dosen != 'Belum Ditentukan':
+            sumber.append(('Dosen', dosen))
+        if isinstance(ruangan, str) and ruangan not in ('Zoom', 'Cek EdLink'):
+            sumber.append(('Ruangan', ruangan))
+        return sumber
+    
+    def _cek_pelanggaran(self, hari: str, jam: Any, dosen: Any) -> List[Tuple[str, str]]:
+        """Pelanggaran aturan waktu satu baris"""
+        rentang = parse_jam(jam)
+        if rentang is None:
+            if hari == 'Cek EdLink' or jam == 'Cek EdLink':
+                return []
+            return [('Format jam', f"Jam '{jam}' tidak valid (format HH:MM-HH:MM)")]
+        
+        mask = interval_mask(*rentang)
+        pelanggaran = []
+        if self.availability_index.masks.get((dosen, hari), 0) & mask:
+            pelanggaran.append(('Ketersediaan dosen', f"{dosen} tidak tersedia {hari} {jam}"))
+        for mulai, selesai in Config.WAKTU_TIDAK_BOLEH.get(hari, ()):
+            if interval_mask(mulai, selesai) & mask:
+                jenis = 'Sholat Jumat' if hari == 'Jumat' else 'Waktu terlarang'
+                pelanggaran.append((jenis, f"{hari} {jam} beririsan dengan {format_jam(mulai, selesai)}"))
+        for mulai, selesai in Config.ISTIRAHAT:
+            if interval_mask(mulai, selesai) & mask:
+                pelanggaran.append(('Istirahat', f"{hari} {jam} beririsan dengan istirahat {format_jam(mulai, selesai)}"))
+        return pelanggaran
+    
+    def update_row(self, baris: Any, hari: Any, jam: Any, kelas: Any, dosen: Any, ruangan: Any) -> bool:
+        """Perbarui satu baris di indeks, kembalikan True jika nilainya berubah"""
+        entri = (hari, jam, kelas, dosen, ruangan)
+        if self.rows.get(baris) == entri:
+            return False
+        self.remove_row(baris)
+        self.rows[baris] = entri
+        
+        pelanggaran = self._cek_pelanggaran(hari, jam, dosen)
+        if pelanggaran:
+            self.pelanggaran[baris] = pelanggaran
+            self.jumlah_konflik += len(pelanggaran)
+        
+        rentang = parse_jam(jam)
+        if rentang is None:
+            return True
+        mulai, selesai = time_to_minutes(rentang[0]), time_to_minutes(rentang[1])
+        self.max_durasi = max(self.max_durasi, selesai - mulai)
+        for jenis, nama in self._sumber(kelas, dosen, ruangan):
+            daftar = self.intervals[(jenis, nama, hari)]
+            # Hanya interval yang mulai dalam (mulai - durasi terpanjang, selesai) yang mungkin beririsan
+            kiri = bisect_left(daftar, (mulai - self.max_durasi + 1,))
+            kanan = bisect_left(daftar, (selesai,))
+            for _, selesai_lain, lain in daftar[kiri:kanan]:
+                if selesai_lain > mulai:
+                    self.bentrok.setdefault(baris, {}).setdefault(lain, set()).add(jenis)
+                    self.bentrok.setdefault(lain, {}).setdefault(baris, set()).add(jenis)
+                    self.jumlah_konflik += 1
+            insort(daftar, (mulai, selesai, baris))
+        return True
+    
+    def remove_row(self, baris: Any) -> None:
+        """Keluarkan satu baris dari indeks beserta konflik yang melibatkannya"""
+        entri = self.rows.pop(baris, None)
+        if entri is None:
+            return
+        self.jumlah_konflik -= len(self.pelanggaran.pop(baris, ()))
+        for lain, jenis_set in self.bentrok.pop(baris, {}).items():
+            self.jumlah_konflik -= len(jenis_set)
+            self.bentrok[lain].pop(baris, None)
+            if not self.bentrok[lain]:
+                del self.bentrok[lain]
+        
+        hari, jam, kelas, dosen, ruangan = entri
+        rentang = parse_jam(jam)
+        if rentang is None:
+            return
+        kunci_interval = (time_to_minutes(rentang[0]), time_to_minutes(rentang[1]), baris)
+        for jenis, nama in self._sumber(kelas, dosen, ruangan):
+            daftar = self.intervals[(jenis, nama, hari)]
+            del daftar[bisect_left(daftar, kunci_interval)]
+    
+    def sync_rows(self, jadwal_df: pd.DataFrame, labels: Sequence[Any]) -> int:
+        """Samakan baris tertentu dengan nilai di jadwal_df, kembalikan jumlah baris yang berubah"""
+        berubah = 0
+        ada = [baris for baris in labels if baris in jadwal_df.index]
+        for baris, values in zip(ada, jadwal_df.loc[ada, self.KOLOM].itertuples(index=False, name=None)):
+            berubah += self.update_row(baris, *values)
+        for baris in labels:
+            if baris not in jadwal_df.index and baris in self.rows:
+                self.remove_row(baris)
+                berubah += 1
+        return berubah
+    
+    def conflicts(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Daftar konflik: bentrok antar baris dan pelanggaran aturan waktu"""
+        hasil: List[Dict[str, Any]] = []
+        sudah = set()
+        for baris, lawan in self.bentrok.items():
+            hari, jam, kelas, dosen, ruangan = self.rows[baris]
+            nama_sumber = {'Kelas': kelas, 'Dosen': dosen, 'Ruangan': ruangan}
+            for lain, jenis_set in lawan.items():
+                pasangan = frozenset((baris, lain))
+                if pasangan in sudah:
+                    continue
+                sudah.add(pasangan)
+                for jenis in sorted(jenis_set):
+                    hasil.append({
+                        'jenis': f"Bentrok {jenis.lower()}",
+                        'baris': [baris, lain],
+                        'hari': hari,
+                        'keterangan': f"{nama_sumber[jenis]}: {jam} dan {self.rows[lain][1]}"
+                    })
+                    if limit is not None and len(hasil) >= limit:
+                        return hasil
+        for baris, daftar in self.pelanggaran.items():
+            for jenis, keterangan in daftar:
+                hasil.append({'jenis': jenis, 'baris': [baris], 'hari': self.rows[baris][0], 'keterangan': keterangan})
+                if limit is not None and len(hasil) >= limit:
+                    return hasil
+        return hasil
+
+# Data workbook untuk proses worker multi-start (diisi oleh initializer pool)
+_WORKER_DATA: Optional[Tuple[pd.DataFrame, ...]] = None
+_WORKER_TERKUNCI: Optional[pd.DataFrame] = None
+
+def _init_generation_worker(data: Tuple[pd.DataFrame, ...], jadwal_terkunci: Optional[pd.DataFrame] = None) -> None:
+    """Initializer proses worker: simpan data workbook dan baris terkunci sekali per proses"""
+    global _WORKER_DATA, _WORKER_TERKUNCI
+    _WORKER_DATA = data
+    _WORKER_TERKUNCI = jadwal_terkunci
+
+def _generation_attempt(seed: int, engine: str) -> Tuple[int, GenerationResult, Optional[Tuple[int, int, float]]]:
+    """Satu percobaan generate dengan seed tertentu (dijalankan di proses worker)"""
+    hasil = run_generation(_WORKER_DATA, engine, seed=seed, jadwal_terkunci=_WORKER_TERKUNCI)
+    skor = score_jadwal(hasil.jadwal) if hasil.jadwal is not None else None
+    return seed, hasil, skor
+
+def generate_multistart(
+    data: Tuple[pd.DataFrame, ...],
+    n_runs: int,
+    engine: str = "greedy",
+    workers: Optional[int] = None,
+    seeds: Optional[List[int]] = None,
+    progress_callback: Optional[Callable[[float], None]] = None,
+    base_seed: Optional[int] = None,
+    jadwal_terkunci: Optional[pd.DataFrame] = None,
+    mp_context: Optional[Any] = None
+) -> Tuple[GenerationResult, Optional[int], List[Tuple[int, Optional[Tuple[int, int, float]]]]]:
+    """Jalankan beberapa generate berseed secara paralel lalu pilih hasil terbaik
+    
+    Seed percobaan diturunkan dari base_seed, sehingga base_seed yang sama memberi hasil yang sama.
+    Worker hanya mengimpor modul ini (tanpa Streamlit), sehingga aman untuk konteks multiprocessing
+    spawn/forkserver (mp_context, default konteks bawaan platform).
+    Mengembalikan (hasil terbaik, seed terbaik, daftar (seed, skor) semua percobaan).
+    """
+    if seeds is None:
+        rng = random.Random(new_seed() if base_seed is None else base_seed)
+        seeds = [rng.randrange(2 ** 31) for _ in range(n_runs)]
+    workers = min(workers or os.cpu_count() or 1, len(seeds))
+    
+    hasil_semua = []
+    if workers <= 1:
+        _init_generation_worker(data, jadwal_terkunci)
+        for i, seed in enumerate(seeds):
+            hasil_semua.append(_generation_attempt(seed, engine))
+            if progress_callback is not None:
+                progress_callback((i + 1) / len(seeds))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=mp_context,
+            initializer=_init_generation_worker, initargs=(data, jadwal_terkunci)
+        ) as executor:
+            futures = [executor.submit(_generation_attempt, seed, engine) for seed in seeds]
+            for i, future in enumerate(as_completed(futures)):
+                hasil_semua.append(future.result())
+                if progress_callback is not None:
+                    progress_callback((i + 1) / len(seeds))
+    
+    ringkasan = [(seed, skor) for seed, _, skor in hasil_semua]
+    berhasil = [(skor, seed, hasil) for seed, hasil, skor in hasil_semua if skor is not None]
+    if not berhasil:
+        return hasil_semua[0][1], None, ringkasan
+    skor_terbaik, seed_terbaik, hasil_terbaik = min(berhasil, key=lambda x: (x[0], x[1]))
+    # Pilihan terbaik hanya dapat diulang jika semua percobaan dapat diulang
+    hasil_terbaik = hasil_terbaik._replace(dapat_diulang=all(hasil.dapat_diulang for _, hasil, _ in hasil_semua))
+    logging.info(f"Multi-start {len(seeds)} percobaan: seed terbaik {seed_terbaik}, skor {skor_terbaik}")
+    return hasil_terbaik, seed_terbaik, ringkasan
+
+def tracker_from_jadwal(jadwal_df: pd.DataFrame, skip: Optional[set] = None) -> ResourceTracker:
+    """Bangun ResourceTracker dari baris jadwal yang sudah terjadwal (kecuali posisi di skip)"""
+    tracker = ResourceTracker()
+    skip = skip or set()
+    for i, (kelas, hari, jam, dosen, ruangan, sks) in enumerate(zip(
+        jadwal_df['Kelas'], jadwal_df['Hari'], jadwal_df['Jam'], jadwal_df['Dosen'], jadwal_df['Ruangan'], jadwal_df['SKS']
+    )):
+        rentang = parse_jam(jam)
+        if i in skip or rentang is None:
+            continue
+        tracker.add_schedule(kelas, dosen, ruangan, hari, *rentang, int(sks))
+    return tracker
+
+def _pasangan_dosen_matkul(dosen_matkul_index: DosenMatkulIndex) -> set:
+    """Himpunan pasangan (nama dosen, id matkul) dari indeks hubungan dosen-matkul"""
+    return {
+        (dosen.nama, id_matkul)
+        for id_matkul, daftar in dosen_matkul_index.dosen_per_matkul.items()
+        for dosen in daftar
+    }
+
+def reschedule_incremental(
+    jadwal_df: pd.DataFrame,
+    data_lama: Tuple[pd.DataFrame, ...],
+    data_baru: Tuple[pd.DataFrame, ...],
+    seed: Optional[int] = None
+) -> Tuple[Optional[pd.DataFrame], Dict[str, Any]]:
+    """Perbarui jadwal setelah data dosen, ruangan, atau availability berubah tanpa generate ulang
+    
+    Hanya sesi yang tidak lagi valid (dosen kini sibuk, hubungan dosen-matkul diputus, ruangan
+    dihapus) yang dilepas dan dijadwalkan ulang di atas sesi lain yang tetap. Sesi yang belum
+    terjadwal ikut dicoba lagi jika perubahan bisa membantunya. Baris terkunci tidak diubah.
+    Perubahan sheet Kelas, matakuliah, atau Hari mengubah daftar tugas sehingga butuh generate ulang.
+    """
+    mulai_waktu = time.perf_counter()
+    perlu_ulang = [
+        nama for nama, i in (('Kelas', 0), ('matakuliah', 1), ('Hari', 4))
+        if data_hash((data_lama[i],)) != data_hash((data_baru[i],))
+    ]
+    if perlu_ulang:
+        return None, {'perlu_generate_ulang': perlu_ulang}
+    
+    rng = random.Random(new_seed() if seed is None else seed)
+    df_kelas, df_matkul, df_dosen, df_dosen_matkul, _, df_ruangan, df_availability = data_baru
+    
+    # Interval yang baru menjadi sibuk per (dosen, hari) dan dosen yang mendapat waktu luang baru
+    availability_lama = AvailabilityIndex(data_lama[6])
+    availability_index = AvailabilityIndex(df_availability)
+    sibuk_baru: Dict[Tuple[str, str], int] = {}
+    dosen_lega = set()
+    for key in availability_lama.masks.keys() | availability_index.masks.keys():
+        mask_lama = availability_lama.masks.get(key, 0)
+        mask_baru = availability_index.masks.get(key, 0)
+        if mask_baru & ~mask_lama:
+            sibuk_baru[key] = mask_baru & ~mask_lama
+        if mask_lama & ~mask_baru:
+            dosen_lega.add(key[0])
+    
+    # Hubungan dosen-matkul yang diputus dan matkul yang mendapat dosen baru
+    dosen_matkul_index = DosenMatkulIndex(df_dosen, df_dosen_matkul)
+    pasangan_lama = _pasangan_dosen_matkul(DosenMatkulIndex(data_lama[2], data_lama[3]))
+    pasangan_baru = _pasangan_dosen_matkul(dosen_matkul_index)
+    pasangan_putus = pasangan_lama - pasangan_baru
+    matkul_dapat_dosen = {id_matkul for _, id_matkul in pasangan_baru - pasangan_lama}
+    
+    # Ruangan yang dihapus dan apakah ada ruangan baru
+    ruangan_prioritas = prepare_ruangan_prioritas(df_ruangan)
+    ruangan_lama = set(data_lama[5]['nama'])
+    ruangan_hilang = ruangan_lama - set(ruangan_prioritas)
+    ada_ruangan_baru = bool(set(ruangan_prioritas) - ruangan_lama)
+    
+    matkul_per_kunci = {(m.nama, m.semester): m for m in to_matkul_records(df_matkul)}
+    jenis_per_kelas = dict(zip(df_kelas['nama'], df_kelas['jenis']))
+    locked = jadwal_df['is_locked'] if 'is_locked' in jadwal_df.columns else pd.Series(False, index=jadwal_df.index)
+    
+    dilepas: List[int] = []
+    dicoba_lagi: List[int] = []
+    terkunci_tidak_valid = 0
+    kolom = zip(
+        jadwal_df['Kelas'], jadwal_df['Hari'], jadwal_df['Jam'], jadwal_df['Mata Kuliah'],
+        jadwal_df['Semester'], jadwal_df['Dosen'], jadwal_df['Ruangan'], locked
+    )
+    for i, (nama_kelas, hari, jam, nama_matkul, semester, dosen, ruangan, is_locked) in enumerate(kolom):
+        matkul = matkul_per_kunci.get((nama_matkul, semester))
+        if matkul is None or nama_kelas not in jenis_per_kelas:
+            continue
+        rentang = parse_jam(jam)
+        if rentang is None:
+            # Belum terjadwal: coba lagi hanya jika perubahan membuka peluang baru
+            if bool(is_locked):
+                continue
+            if (
+                matkul.id in matkul_dapat_dosen
+                or any(d.nama in dosen_lega for d in dosen_matkul_index.dosen_for(matkul.id))
+                or (ada_ruangan_baru and not is_matkul_online(matkul))
+            ):
+                dicoba_lagi.append(i)
+            continue
+        
+        tidak_valid = (
+            (dosen, matkul.id) in pasangan_putus
+            or ruangan in ruangan_hilang
+            or bool(sibuk_baru.get((dosen, hari), 0) & interval_mask(*rentang))
+        )
+        if not tidak_valid:
+            continue
+        if bool(is_locked):
+            terkunci_tidak_valid += 1
+        else:
+            dilepas.append(i)
+    
+    # Sesi yang dilepas dan sisa tugas dijadwalkan ulang di atas sesi yang tetap
+    diproses = dilepas + dicoba_lagi
+    resource_tracker = tracker_from_jadwal(jadwal_df, skip=set(diproses))
+    hasil = jadwal_df.copy()
+    berhasil = 0
+    for i in sorted(diproses, key=lambda i: -int(jadwal_df['SKS'].iat[i])):
+        baris = jadwal_df.iloc[i]
+        matkul = matkul_per_kunci[(baris['Mata Kuliah'], baris['Semester'])]
+        kelas = KelasRecord(baris['Kelas'], jenis_per_kelas[baris['Kelas']], baris['Konsentrasi'])
+        baris_baru = schedule_matkul(
+            matkul, kelas, dosen_matkul_index, df_ruangan, availability_index,
+            resource_tracker, ruangan_prioritas, rng
+        )
+        if baris_baru['Hari'] != 'Cek EdLink':
+            berhasil += 1
+        hasil.loc[hasil.index[i], list(baris_baru)] = list(baris_baru.values())
+    
+    stats = {
+        'dilepas': len(dilepas),
+        'dicoba_lagi': len(dicoba_lagi),
+        'berhasil': berhasil,
+        'gagal': len(diproses) - berhasil,
+        'terkunci_tidak_valid': terkunci_tidak_valid,
+        'durasi_detik': time.perf_counter() - mulai_waktu,
+    }
+    logging.info(f"Penjadwalan ulang inkremental: {stats}")
+    return hasil, stats
+
+def locked_rows(jadwal_df: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    """Ambil baris jadwal yang dikunci pengguna, atau None jika tidak ada"""
+    if jadwal_df is None or 'is_locked' not in jadwal_df.columns:
+        return None
+    terkunci = jadwal_df[jadwal_df['is_locked'].fillna(False).astype(bool)]
+    return terkunci.reset_index(drop=True) if len(terkunci) else None
+
+def generate_schedule(
+    data: Tuple[pd.DataFrame, ...],
+    engine: str = "greedy",
+    n_runs: int = 1,
+    seed: Optional[int] = None,
+    jadwal_terkunci: Optional[pd.DataFrame] = None,
+    workers: Optional[int] = None,
+    progress_callback: Optional[Callable[[float], None]] = None,
+    file_path: str = "data.xlsx",
+    use_cache: bool = True
+) -> Tuple[GenerationResult, Optional[Dict[str, Any]]]:
+    """Generate jadwal lengkap (cache, multi-start, manifest) tanpa UI
+    
+    Mengembalikan (hasil, manifest run); manifest None jika generate gagal.
+    """
+    cache = ScheduleCache() if use_cache else None
+    cache_key = None
+    if cache is not None and seed is not None:
+        cache_key = ScheduleCache.make_key(data, engine, seed, n_runs, jadwal_terkunci)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            jadwal, meta = cached
+            if progress_callback is not None:
+                progress_callback(1.0)
+            logging.info(f"Run generate dari cache {cache_key[:12]}")
+            info = meta['info'] + [f"Jadwal diambil dari cache (seed {seed}, input dan Config tidak berubah)"]
+            return GenerationResult(jadwal, [], meta['warnings'], info, meta['manifest']['seed']), meta['manifest']
+    
+    if n_runs <= 1:
+        hasil = run_generation(data, engine, progress_callback, seed=seed, jadwal_terkunci=jadwal_terkunci)
+        extra = {}
+    else:
+        base_seed = new_seed() if seed is None else seed
+        hasil, seed_terbaik, ringkasan = generate_multistart(
+            data, n_runs, engine, workers=workers, progress_callback=progress_callback, base_seed=base_seed,
+            jadwal_terkunci=jadwal_terkunci
+        )
+        extra = {'percobaan': n_runs, 'base_seed': base_seed}
+        if seed_terbaik is not None:
+            skor = dict(ringkasan)[seed_terbaik]
+            hasil = hasil._replace(info=[
+                f"Terbaik dari {n_runs} percobaan: seed {seed_terbaik} "
+                f"({skor[0]} tidak terjadwal, {skor[1]} bentrok, simpangan beban dosen {skor[2]:.2f} SKS)"
+            ] + hasil.info)
+    
+    if hasil.jadwal is None:
+        return hasil, None
+    if jadwal_terkunci is not None:
+        extra['baris_terkunci'] = len(jadwal_terkunci)
+    if engine == "cpsat":
+        extra['cpsat'] = cpsat_parameters(hasil.seed)
+    extra['dapat_diulang'] = hasil.dapat_diulang
+    manifest = build_run_manifest(hasil.seed, engine, file_path=file_path, jadwal_df=hasil.jadwal, **extra)
+    # Hasil yang tidak dapat diulang (CP-SAT terpotong batas waktu dinding) tidak boleh disajikan ulang
+    if cache_key is not None and hasil.dapat_diulang:
+        cache.put(cache_key, hasil.jadwal, {
+            'manifest': manifest,
+            'warnings': hasil.warnings,
+            'info': hasil.info,
+        })
+    logging.info(
+        f"Run generate: seed {manifest['seed']}, engine {engine}, "
+        f"workbook {manifest['workbook_sha256'][:12]}, jadwal {manifest['jadwal_sha256'][:12]}"
+    )
+    return hasil, manifest
+
+class _SesiOptimasi:
+    """Satu sesi terjadwal yang dapat dipindah oleh optimizer"""
+    __slots__ = ('baris', 'kelas', 'id_matkul', 'sks', 'hari', 'jam_mulai', 'jam_selesai',
+                 'mulai', 'selesai', 'dosen', 'ruangan', 'online', 'slot', 'dosen_opsi')
+    
+    def __init__(self, baris, kelas, id_matkul, sks, hari, jam_mulai, jam_selesai, dosen, ruangan, online):
+        self.baris = baris
+        self.kelas = kelas
+        self.id_matkul = id_matkul
+        self.sks = sks
+        self.dosen = dosen
+        self.ruangan = ruangan
+        self.online = online
+        self.slot: List[Tuple[str, dt_time, dt_time]] = []
+        self.dosen_opsi: List[str] = []
+        self.set_waktu(hari, jam_mulai, jam_selesai)
+    
+    def set_waktu(self, hari: str, jam_mulai: dt_time, jam_selesai: dt_time) -> None:
+        self.hari = hari
+        self.jam_mulai = jam_mulai
+        self.jam_selesai = jam_selesai
+        self.mulai = time_to_minutes(jam_mulai)
+        self.selesai = time_to_minutes(jam_selesai)
+
+def _biaya_hari_kelas(urut: List[Tuple[int, int, int]], istirahat: Sequence[Tuple[int, int]]) -> float:
+    """Biaya lunak satu (kelas, hari): hari kuliah terpakai + jeda kosong antar sesi
+    
+    urut: (menit mulai, menit selesai, baris) sesi hari itu, sudah terurut; istirahat dalam menit.
+    """
+    if not urut:
+        return 0.0
+    jeda = 0
+    for (_, selesai_sebelum, _), (mulai_sesudah, _, _) in zip(urut, urut[1:]):
+        kosong = mulai_sesudah - selesai_sebelum - 10
+        if kosong <= 0:
+            continue
+        # Jam istirahat tidak dihitung sebagai jeda kosong
+        for istirahat_mulai, istirahat_selesai in istirahat:
+            irisan = min(mulai_sesudah, istirahat_selesai) - max(selesai_sebelum, istirahat_mulai)
+            if irisan > 0:
+                kosong -= irisan
+        jeda += max(kosong, 0)
+    return Config.BOBOT_HARI_KELAS + Config.BOBOT_JEDA_KELAS * jeda / 10
+
+def optimize_jadwal(
+    jadwal_df: pd.DataFrame,
+    df_kelas: pd.DataFrame,
+    df_matkul: pd.DataFrame,
+    dosen_matkul_index: DosenMatkulIndex,
+    availability_index: AvailabilityIndex,
+    ruangan_prioritas: List[str],
+    time_budget: float = Config.OPTIMIZER_TIME_BUDGET,
+    rng: Optional[random.Random] = None
+) -> Tuple[pd.DataFrame, Dict[str, float]]:
+    """Perbaiki kualitas lunak jadwal dengan simulated annealing tanpa melanggar constraint keras
+    
+    Kualitas lunak: ruangan prioritas (B4), pemerataan beban SKS dosen, jeda kosong mahasiswa, dan
+    jumlah hari kuliah per kelas. Langkah yang dicoba: pindah sesi ke (hari, slot, dosen, ruangan)
+    lain dan tukar waktu dua sesi berdurasi sama dalam satu kelas. Setiap langkah dinilai dengan
+    delta (hanya kelas-hari, dosen, dan ruangan yang tersentuh). Baris terkunci dan baris yang belum
+    terjadwal tidak diubah.
+    """
+    rng = rng or random.Random()
+    mulai_waktu = time.perf_counter()
+    jenis_per_kelas = dict(zip(df_kelas['nama'], df_kelas['jenis']))
+    id_per_matkul = dict(zip(df_matkul['nama'], df_matkul['id'].tolist()))
+    ruangan_prioritas_set = {r for r in ruangan_prioritas if Config.PRIORITAS_RUANGAN_PREFIX in r}
+    
+    tracker = ResourceTracker()
+    semua_sesi: List[_SesiOptimasi] = []
+    bisa_dipindah: List[_SesiOptimasi] = []
+    beban_dosen: Dict[str, int] = defaultdict(int)
+    
+    locked = jadwal_df['is_locked'] if 'is_locked' in jadwal_df.columns else pd.Series(False, index=jadwal_df.index)
+    kolom = zip(
+        range(len(jadwal_df)), jadwal_df['Kelas'], jadwal_df['Mata Kuliah'], jadwal_df['SKS'], jadwal_df['Hari'],
+        jadwal_df['Jam'], jadwal_df['Dosen'], jadwal_df['Ruangan'], jadwal_df['Status'], locked
+    )
+    for baris, kelas, nama_matkul, sks, hari, jam, dosen, ruangan, status, is_locked in kolom:
+        rentang = parse_jam(jam)
+        if rentang is None or hari not in HARI_INDEX:
+            continue
+        sesi = _SesiOptimasi(
+            baris, kelas, id_per_matkul.get(nama_matkul), int(sks), hari, rentang[0], rentang[1],
+            dosen, ruangan, status == 'Online'
+        )
+        tracker.add_schedule(kelas, dosen, ruangan, hari, rentang[0], rentang[1], sesi.sks)
+        beban_dosen[dosen] += sesi.sks
+        semua_sesi.append(sesi)
+        
+        jenis = jenis_per_kelas.get(kelas)
+        if bool(is_locked) or jenis is None:
+            continue
+        
+        # Domain sesi: grid slot kelas untuk durasi yang sama, dan dosen pengampu matkul
+        jam_awal, jam_akhir = Config.JAM_OPERASIONAL.get(jenis.lower(), (dt_time(8, 0), dt_time(17, 0)))
+        durasi = sesi.selesai - sesi.mulai
+        for hari_opsi in Config.HARI_PRIORITAS.get(jenis.lower(), ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat']):
+            for jam_mulai, jam_selesai in generate_time_slots(jam_awal, jam_akhir, durasi, hari_opsi, jenis):
+                sesi.slot.append((hari_opsi, jam_mulai, jam_selesai))
+        sesi.dosen_opsi = [d.nama for d in dosen_matkul_index.dosen_for(sesi.id_matkul)] or [dosen]
+        if sesi.slot:
+            bisa_dipindah.append(sesi)
+    
+    # Sesi per (kelas, hari) disimpan terurut dan diperbarui dengan bisect saat sesi dipindah,
+    # sehingga biaya kelas-hari tidak perlu mengurutkan ulang di setiap langkah
+    per_kelas_hari: Dict[Tuple[str, str], List[Tuple[int, int, int]]] = defaultdict(list)
+    for sesi in semua_sesi:
+        per_kelas_hari[(sesi.kelas, sesi.hari)].append((sesi.mulai, sesi.selesai, sesi.baris))
+    for urut in per_kelas_hari.values():
+        urut.sort()
+    istirahat = [(time_to_minutes(m), time_to_minutes(s)) for m, s in Config.ISTIRAHAT]
+    
+    # Kandidat tukar: sesi yang dapat dipindah dalam kelas yang sama dengan durasi yang sama
+    per_kelas_durasi: Dict[Tuple[str, int], List[_SesiOptimasi]] = defaultdict(list)
+    for sesi in bisa_dipindah:
+        per_kelas_durasi[(sesi.kelas, sesi.selesai - sesi.mulai)].append(sesi)
+    biaya_kh = {kunci: _biaya_hari_kelas(urut, istirahat) for kunci, urut in per_kelas_hari.items()}
+    
+    def biaya_ruangan(sesi: _SesiOptimasi) -> float:
+        if sesi.online or sesi.ruangan in ruangan_prioritas_set:
+            return 0.0
+        return Config.BOBOT_RUANGAN_NON_PRIORITAS
+    
+    def skor_total() -> float:
+        return (
+            sum(biaya_kh.values())
+            + sum(biaya_ruangan(s) for s in semua_sesi)
+            + Config.BOBOT_BEBAN_DOSEN * sum(beban ** 2 for beban in beban_dosen.values())
+        )
+    
+    def pindahkan(sesi: _SesiOptimasi, hari: str, jam_mulai: dt_time, jam_selesai: dt_time, dosen: str, ruangan: str) -> float:
+        """Terapkan perpindahan sesi dan kembalikan delta biaya"""
+        delta = -biaya_ruangan(sesi)
+        if dosen != sesi.dosen:
+            lama, baru = beban_dosen[sesi.dosen], beban_dosen[dosen]
+            delta += Config.BOBOT_BEBAN_DOSEN * (
+                (lama - sesi.sks) ** 2 + (baru + sesi.sks) ** 2 - lama ** 2 - baru ** 2
+            )
+            beban_dosen[sesi.dosen] = lama - sesi.sks
+            beban_dosen[dosen] = baru + sesi.sks
+        
+        kunci_lama = (sesi.kelas, sesi.hari)
+        kunci_baru = (sesi.kelas, hari)
+        urut_lama = per_kelas_hari[kunci_lama]
+        del urut_lama[bisect_left(urut_lama, (sesi.mulai, sesi.selesai, sesi.baris))]
+        sesi.set_waktu(hari, jam_mulai, jam_selesai)
+        sesi.dosen = dosen
+        sesi.ruangan = ruangan
+        insort(per_kelas_hari[kunci_baru], (sesi.mulai, sesi.selesai, sesi.baris))
+        
+        for kunci in {kunci_lama, kunci_baru}:
+            biaya_baru = _biaya_hari_kelas(per_kelas_hari[kunci], istirahat)
+            delta += biaya_baru - biaya_kh.get(kunci, 0.0)
+            biaya_kh[kunci] = biaya_baru
+        return delta + biaya_ruangan(sesi)
+    
+    def layak(sesi: _SesiOptimasi, hari: str, jam_mulai: dt_time, jam_selesai: dt_time, dosen: str, ruangan: str) -> bool:
+        if dosen != sesi.dosen and not tracker.within_load_limit(dosen, sesi.sks):
+            return False
+        if availability_index.is_busy(dosen, hari, jam_mulai, jam_selesai):
+            return False
+        return not tracker.is_conflict(sesi.kelas, dosen, ruangan, hari, jam_mulai, jam_selesai)
+    
+    skor_awal = skor_total()
+    skor = skor_awal
+    dicoba = 0
+    diterima = 0
+    suhu_awal = Config.BOBOT_HARI_KELAS
+    suhu_akhir = 0.05
+    suhu = suhu_awal
+    
+    while bisa_dipindah:
+        if dicoba % 256 == 0:
+            progres = (time.perf_counter() - mulai_waktu) / time_budget if time_budget > 0 else 1.0
+            if progres >= 1.0:
+                break
+            suhu = suhu_awal * (suhu_akhir / suhu_awal) ** progres
+        dicoba += 1
+        
+        sesi = rng.choice(bisa_dipindah)
+        asal = (sesi.hari, sesi.jam_mulai, sesi.jam_selesai, sesi.dosen, sesi.ruangan)
+        
+        if rng.random() < 0.8:
+            # Langkah pindah: waktu, dosen, dan ruangan baru
+            hari, jam_mulai, jam_selesai = rng.choice(sesi.slot)
+            dosen = rng.choice(sesi.dosen_opsi) if rng.random() < 0.3 else sesi.dosen
+            if sesi.online:
+                ruangan = "Zoom"
+            elif rng.random() < 0.5:
+                ruangan = sesi.ruangan
+            else:
+                ruangan = rng.choice(ruangan_prioritas)
+            
+            tracker.remove_schedule(sesi.kelas, sesi.dosen, sesi.ruangan, sesi.hari, sesi.jam_mulai, sesi.jam_selesai, sesi.sks)
+            if not layak(sesi, hari, jam_mulai, jam_selesai, dosen, ruangan):
+                tracker.add_schedule(sesi.kelas, sesi.dosen, sesi.ruangan, sesi.hari, sesi.jam_mulai, sesi.jam_selesai, sesi.sks)
+                continue
+            delta = pindahkan(sesi, hari, jam_mulai, jam_selesai, dosen, ruangan)
+            if delta <= 0 or rng.random() < math.exp(-delta / suhu):
+                tracker.add_schedule(sesi.kelas, dosen, ruangan, hari, jam_mulai, jam_selesai, sesi.sks)
+                skor += delta
+                diterima += 1
+            else:
+                pindahkan(sesi, *asal)
+                tracker.add_schedule(sesi.kelas, sesi.dosen, sesi.ruangan, sesi.hari, sesi.jam_mulai, sesi.jam_selesai, sesi.sks)
+        else:
+            # Langkah tukar: tukar waktu dua sesi berdurasi sama dalam satu kelas
+            pasangan = per_kelas_durasi[(sesi.kelas, sesi.selesai - sesi.mulai)]
+            lain = rng.choice(pasangan)
+            if lain is sesi:
+                continue
+            asal_lain = (lain.hari, lain.jam_mulai, lain.jam_selesai, lain.dosen, lain.ruangan)
+            
+            tracker.remove_schedule(sesi.kelas, sesi.dosen, sesi.ruangan, sesi.hari, sesi.jam_mulai, sesi.jam_selesai)
+            tracker.remove_schedule(lain.kelas, lain.dosen, lain.ruangan, lain.hari, lain.jam_mulai, lain.jam_selesai)
+            ok = layak(sesi, *asal_lain[:3], sesi.dosen, sesi.ruangan)
+            if ok:
+                tracker.add_schedule(sesi.kelas, sesi.dosen, sesi.ruangan, *asal_lain[:3])
+                ok = layak(lain, *asal[:3], lain.dosen, lain.ruangan)
+                tracker.remove_schedule(sesi.kelas, sesi.dosen, sesi.ruangan, *asal_lain[:3])
+            if not ok:
+                tracker.add_schedule(sesi.kelas, sesi.dosen, sesi.ruangan, *asal[:3])
+                tracker.add_schedule(lain.kelas, lain.dosen, lain.ruangan, *asal_lain[:3])
+                continue
+            delta = pindahkan(sesi, *asal_lain[:3], sesi.dosen, sesi.ruangan)
+            delta += pindahkan(lain, *asal[:3], lain.dosen, lain.ruangan)
+            if delta <= 0 or rng.random() < math.exp(-delta / suhu):
+                skor += delta
+                diterima += 1
+            else:
+                pindahkan(sesi, *asal)
+                pindahkan(lain, *asal_lain)
+            for s in (sesi, lain):
+                tracker.add_schedule(s.kelas, s.dosen, s.ruangan, s.hari, s.jam_mulai, s.jam_selesai)
+    
+    hasil = jadwal_df.copy()
+    kolom_hari = hasil.columns.get_loc('Hari')
+    kolom_jam = hasil.columns.get_loc('Jam')
+    kolom_dosen = hasil.columns.get_loc('Dosen')
+    kolom_ruangan = hasil.columns.get_loc('Ruangan')
+    for sesi in bisa_dipindah:
+        hasil.iat[sesi.baris, kolom_hari] = sesi.hari
+        hasil.iat[sesi.baris, kolom_jam] = format_jam(sesi.jam_mulai, sesi.jam_selesai)
+        hasil.iat[sesi.baris, kolom_dosen] = sesi.dosen
+        hasil.iat[sesi.baris, kolom_ruangan] = sesi.ruangan
+    
+    durasi_detik = time.perf_counter() - mulai_waktu
+    statistik = {
+        'skor_awal': skor_awal,
+        'skor_akhir': skor,
+        'langkah_dicoba': dicoba,
+        'langkah_diterima': diterima,
+        'langkah_per_detik': dicoba / durasi_detik if durasi_detik > 0 else 0.0
+    }
+    logging.info(f"Optimasi jadwal: skor {skor_awal:.1f} -> {skor:.1f}, {dicoba} langkah dalam {durasi_detik:.2f} detik")
+    return hasil, statistik
+
+# ========== CLI ==========
+EXIT_OK = 0
+EXIT_GAGAL = 1
+EXIT_TIDAK_TERJADWAL = 3  # 2 dipakai argparse untuk argumen yang salah
+
+def write_jadwal(jadwal_df: pd.DataFrame, path: str) -> None:
+    """Simpan jadwal ke file .parquet, .csv, atau .xlsx sesuai ekstensinya"""
+    ekstensi = os.path.splitext(path)[1].lower()
+    if ekstensi == '.parquet':
+        jadwal_df.to_parquet(path, index=False)
+    elif ekstensi == '.csv':
+        jadwal_df.to_csv(path, index=False)
+    elif ekstensi == '.xlsx':
+        jadwal_df.to_excel(path, index=False, engine='openpyxl')
+    else:
+        raise ValueError(f"Format output tidak dikenal: {path} (gunakan .parquet, .csv, atau .xlsx)")
+
+def progress_printer(stream: Any = sys.stderr) -> Callable[[float], None]:
+    """Callback progress untuk terminal: bar yang diperbarui di tempat, atau satu baris per 10% jika bukan TTY"""
+    interaktif = stream.isatty()
+    terakhir = [-1]
+    
+    def lapor(progres: float) -> None:
+        persen = int(progres * 100)
+        langkah = persen if interaktif else persen // 10 * 10
+        if langkah == terakhir[0]:
+            return
+        terakhir[0] = langkah
+        if interaktif:
+            stream.write(f"\r[{'#' * (persen * 30 // 100):<30}] {persen:3d}%")
+            if persen >= 100:
+                stream.write("\n")
+        else:
+            stream.write(f"progress {langkah}%\n")
+        stream.flush()
+    return lapor
+
+def _cmd_generate(args: argparse.Namespace) -> int:
+    if not os.path.exists(args.input):
+        print(f"File input tidak ditemukan: {args.input}", file=sys.stderr)
+        return EXIT_GAGAL
+    data = load_data(storage_for_path(args.input))
+    
+    hasil, manifest = generate_schedule(
+        data,
+        args.engine,
+        args.runs or args.workers,
+        args.seed,
+        workers=args.workers,
+        progress_callback=None if args.quiet else progress_printer(),
+        file_path=args.input,
+        use_cache=not args.no_cache
+    )
+    for label, daftar in (("ERROR", hasil.errors), ("PERINGATAN", hasil.warnings), ("INFO", hasil.info)):
+        for pesan in daftar:
+            print(f"{label}: {pesan}", file=sys.stderr)
+    if hasil.jadwal is None:
+        return EXIT_GAGAL
+    
+    jadwal = hasil.jadwal
+    if args.optimize:
+        df_kelas, df_matkul, df_dosen, df_dosen_matkul, _, df_ruangan, df_availability = data
+        jadwal, statistik = optimize_jadwal(
+            jadwal,
+            df_kelas,
+            df_matkul,
+            DosenMatkulIndex(df_dosen, df_dosen_matkul),
+            AvailabilityIndex(df_availability),
+            prepare_ruangan_prioritas(df_ruangan),
+            args.optimize,
+            rng=random.Random(hasil.seed)
+        )
+        manifest['optimasi'] = statistik
+        manifest['jadwal_sha256'] = jadwal_hash(jadwal)
+        print(f"INFO: Optimasi skor {statistik['skor_awal']:.0f} -> {statistik['skor_akhir']:.0f}", file=sys.stderr)
+    
+    write_jadwal(jadwal, args.out)
+    if args.manifest:
+        with open(args.manifest, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2, default=str)
+    
+    tidak_terjadwal, bentrok, simpangan = score_jadwal(jadwal)
+    print(
+        f"{len(jadwal)} sesi, {tidak_terjadwal} tidak terjadwal, {bentrok} bentrok, "
+        f"simpangan beban dosen {simpangan:.2f} SKS, seed {hasil.seed} -> {args.out}"
+    )
+    return EXIT_TIDAK_TERJADWAL if tidak_terjadwal else EXIT_OK
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Entry point `python -m scheduler`"""
+    parser = argparse.ArgumentParser(prog="python -m scheduler", description="Penjadwalan kuliah TI tanpa UI Streamlit")
+    perintah = parser.add_subparsers(dest="perintah", required=True)
+    
+    generate = perintah.add_parser(
+        "generate",
+        help="generate jadwal dari workbook atau database",
+        epilog=f"Kode keluar: {EXIT_OK} semua sesi terjadwal, {EXIT_GAGAL} generate gagal, "
+               f"{EXIT_TIDAK_TERJADWAL} masih ada mata kuliah yang tidak terjadwal."
+    )
+    generate.add_argument("--input", default="data.xlsx", help="workbook .xlsx atau database SQLite .db (bawaan: data.xlsx)")
+    generate.add_argument("--out", required=True, help="file jadwal .parquet, .csv, atau .xlsx")
+    generate.add_argument("--seed", type=int, help="seed agar hasil bisa direproduksi")
+    generate.add_argument("--engine", choices=list(SCHEDULER_ENGINES), default="greedy", help="mesin penjadwalan")
+    generate.add_argument("--workers", type=int, default=1, help="jumlah proses paralel untuk multi-start")
+    generate.add_argument("--runs", type=int, help="jumlah percobaan multi-start (bawaan: sama dengan --workers)")
+    generate.add_argument("--optimize", type=float, metavar="DETIK", help="jalankan optimasi jadwal dengan batas waktu ini")
+    generate.add_argument("--manifest", help="simpan manifest run (JSON) ke file ini")
+    generate.add_argument("--no-cache", action="store_true", help="jangan pakai cache hasil generate")
+    generate.add_argument("-q", "--quiet", action="store_true", help="tanpa progress")
+    
+    args = parser.parse_args(argv)
+    setup_logging()
+    return _cmd_generate(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
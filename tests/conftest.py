@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import parse_jam  # noqa: E402
+
+
+def assert_tanpa_bentrok(jadwal_df: pd.DataFrame) -> None:
+    """Pastikan tidak ada dua sesi terjadwal yang beririsan pada kelas, dosen, atau ruangan yang sama"""
+    sesi = []
+    for baris in jadwal_df.to_dict('records'):
+        rentang = parse_jam(baris['Jam'])
+        if rentang is None:
+            continue
+        sesi.append((baris, rentang))
+    for kolom in ('Kelas', 'Dosen', 'Ruangan'):
+        per_sumber = {}
+        for baris, (mulai, selesai) in sesi:
+            if kolom == 'Ruangan' and baris['Ruangan'] == 'Zoom':
+                continue
+            per_sumber.setdefault((baris[kolom], baris['Hari']), []).append((mulai, selesai, baris['Mata Kuliah']))
+        for (nama, hari), daftar in per_sumber.items():
+            daftar.sort()
+            for (_, selesai_a, matkul_a), (mulai_b, _, matkul_b) in zip(daftar, daftar[1:]):
+                assert mulai_b >= selesai_a, f"{kolom} {nama} bentrok di {hari}: {matkul_a} dan {matkul_b}"
+
+
+@pytest.fixture
+def workbook_path(tmp_path):
+    """Salinan data.xlsx di direktori sementara agar test tidak mengubah data asli"""
+    import shutil
+    sumber = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data.xlsx')
+    tujuan = tmp_path / 'data.xlsx'
+    shutil.copy2(sumber, tujuan)
+    return str(tujuan)
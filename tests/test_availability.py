@@ -0,0 +1,141 @@
+import io
+
+import pandas as pd
+import pytest
+
+from scheduler import (
+    KOLOM_AVAILABILITY, ExcelStorage, SQLiteStorage, coalesce_availability, import_availability, mask_intervals,
+)
+
+
+def _csv(rows):
+    return io.BytesIO(pd.DataFrame(rows, columns=KOLOM_AVAILABILITY).to_csv(index=False).encode('utf-8'))
+
+
+def _interval(df):
+    return sorted(
+        (d, h, str(m)[:5], str(s)[:5]) for d, h, m, s in df[KOLOM_AVAILABILITY].itertuples(index=False, name=None)
+    )
+
+
+@pytest.fixture(params=['sqlite', 'excel'])
+def storage(request, tmp_path):
+    awal = {'availability': pd.DataFrame([
+        ('Dosen Lama', 'Senin', '08:00', '10:00'),
+        ('Dosen Lama', 'Senin', '09:00', '11:00'),  # belum digabung, tidak boleh disentuh import
+        ('Dosen A', 'Rabu', '13:00', '15:00'),
+        ('Dosen A', 'Kamis', 'pagi', '10:00'),  # tidak valid, tetap dipertahankan
+    ], columns=KOLOM_AVAILABILITY)}
+    if request.param == 'sqlite':
+        storage = SQLiteStorage(str(tmp_path / 'data.db'))
+    else:
+        storage = ExcelStorage(str(tmp_path / 'data.xlsx'))
+    assert storage.replace_tables(awal)
+    return storage
+
+
+def test_coalesce_merges_overlapping_and_adjacent_intervals():
+    df = pd.DataFrame([
+        ('Dosen A', 'Senin', '10:00', '11:00'),
+        ('Dosen A', 'Senin', '08:00', '09:30'),
+        ('Dosen A', 'Senin', '09:00', '10:00'),
+        ('Dosen A', 'Selasa', '08:00', '09:00'),
+        ('Dosen B', 'Senin', '13:00', '14:00'),
+        ('Dosen B', 'Senin', '14:30', '15:00'),
+        ('Dosen B', 'Senin', '16:00', '15:00'),
+    ], columns=KOLOM_AVAILABILITY)
+    hasil = coalesce_availability(df)
+    assert _interval(hasil.iloc[:-1]) == [
+        ('Dosen A', 'Selasa', '08:00', '09:00'),
+        ('Dosen A', 'Senin', '08:00', '11:00'),
+        ('Dosen B', 'Senin', '13:00', '14:00'),
+        ('Dosen B', 'Senin', '14:30', '15:00'),
+    ]
+    # Baris tidak valid dibiarkan di akhir
+    assert hasil.iloc[-1]['jam_mulai'] == '16:00'
+
+
+def test_mask_intervals_splits_runs():
+    mask = (0b111 << 10) | (0b1 << 20) | 0b11
+    assert mask_intervals(mask) == [(0, 2), (10, 13), (20, 21)]
+    assert mask_intervals(0) == []
+
+
+def test_import_coalesces_only_touched_lecturers(storage):
+    stats = import_availability(_csv([
+        ('Dosen A', 'rabu', '14:00', '16:00'),
+        ('Dosen A', 'Rabu', '16:00', '17:00'),
+        ('Dosen B', 'Jumat', '08:00', '09:00'),
+    ]), 'impor.csv', storage, chunk_size=2)
+    assert stats['ditambahkan'] == 3
+    assert stats['digabung'] == 2
+    tabel = storage.read_tables()['availability']
+    assert _interval(tabel) == [
+        ('Dosen A', 'Kamis', 'pagi', '10:00'),
+        ('Dosen A', 'Rabu', '13:00', '17:00'),
+        ('Dosen B', 'Jumat', '08:00', '09:00'),
+        ('Dosen Lama', 'Senin', '08:00', '10:00'),
+        ('Dosen Lama', 'Senin', '09:00', '11:00'),
+    ]
+
+
+def test_reimport_reports_duplicates(storage):
+    rows = [
+        ('Dosen A', 'Selasa', '08:00', '10:00'),
+        ('Dosen A', 'Selasa', '09:00', '11:00'),
+        ('Dosen A', 'Selasa', '09:30', '10:30'),
+    ]
+    pertama = import_availability(_csv(rows), 'impor.csv', storage)
+    tabel = storage.read_tables()['availability']
+    kedua = import_availability(_csv(rows), 'impor.csv', storage, tabel)
+    assert (pertama['ditambahkan'], pertama['duplikat']) == (2, 1)
+    assert (kedua['ditambahkan'], kedua['duplikat']) == (0, 3)
+    assert _interval(storage.read_tables()['availability']) == _interval(tabel)
+
+
+def test_import_reports_invalid_rows(storage):
+    stats = import_availability(_csv([
+        ('Dosen A', 'Senin', '08:00', '09:00'),
+        ('', 'Senin', '08:00', '09:00'),
+        ('Dosen A', 'Funday', '08:00', '09:00'),
+        ('Dosen A', 'Senin', '25:00', '26:00'),
+        ('Dosen A', 'Senin', '10:00', '09:00'),
+        ('Dosen X', 'Senin', '08:00', '09:00'),
+    ]), 'impor.csv', storage, dosen_dikenal={'Dosen A'})
+    assert (stats['dibaca'], stats['ditambahkan'], stats['tidak_valid']) == (6, 1, 5)
+    assert list(stats['contoh_tidak_valid']['alasan']) == [
+        'nama dosen kosong', 'hari tidak dikenal', 'format jam tidak valid',
+        'jam selesai harus setelah jam mulai', 'dosen tidak terdaftar',
+    ]
+
+
+def test_import_rejects_missing_columns(storage):
+    with pytest.raises(ValueError):
+        import_availability(io.BytesIO(b'dosen,hari\nDosen A,Senin\n'), 'impor.csv', storage)
+
+
+def test_excel_import_memory_does_not_grow_with_file(tmp_path):
+    import tracemalloc
+
+    def puncak(jumlah_baris):
+        storage = ExcelStorage(str(tmp_path / f'data_{jumlah_baris}.xlsx'))
+        storage.replace_tables({'availability': pd.DataFrame(columns=KOLOM_AVAILABILITY)})
+        # Setiap baris interval berbeda: 50 dosen x 6 hari, jam mulai bergeser per menit
+        rows = []
+        for i in range(jumlah_baris):
+            mulai = 480 + (i // 300) % 540
+            rows.append((
+                f'Dosen {i % 50}', ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu'][i // 50 % 6],
+                f'{mulai // 60:02d}:{mulai % 60:02d}', f'{(mulai + 5) // 60:02d}:{(mulai + 5) % 60:02d}'
+            ))
+        file = _csv(rows)
+        tracemalloc.start()
+        try:
+            import_availability(file, 'impor.csv', storage, chunk_size=1000)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    kecil, besar = puncak(3_000), puncak(30_000)
+    # Sepuluh kali lebih banyak baris tidak boleh membuat puncak memori ikut berlipat
+    assert besar < kecil * 2
@@ -0,0 +1,43 @@
+import os
+
+import pandas as pd
+
+import scheduler
+from scheduler import Config, GenerationResult, ScheduleCache, generate_schedule
+
+
+def _data():
+    return (pd.DataFrame({'nama': ['TI24A']}),) + (None,) * 6
+
+
+def test_cpsat_key_follows_solver_parameters(monkeypatch):
+    kunci = ScheduleCache.make_key(_data(), "cpsat", 1)
+    assert kunci != ScheduleCache.make_key(_data(), "greedy", 1)
+    monkeypatch.setattr(Config, 'CPSAT_WORKERS', Config.CPSAT_WORKERS + 1)
+    assert kunci != ScheduleCache.make_key(_data(), "cpsat", 1)
+
+
+def test_unreproducible_result_is_not_cached(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    jadwal = pd.DataFrame({'Kelas': ['TI24A'], 'Hari': ['Senin']})
+    panggilan = []
+
+    def run_generation(data, engine, progress_callback=None, seed=None, jadwal_terkunci=None):
+        panggilan.append(seed)
+        return GenerationResult(jadwal, [], [], [], seed, dapat_diulang=engine != "cpsat")
+
+    monkeypatch.setattr(scheduler, 'run_generation', run_generation)
+    (tmp_path / 'data.xlsx').write_bytes(b'workbook')
+    for engine in ("greedy", "cpsat"):
+        for _ in range(2):
+            _, manifest = generate_schedule(_data(), engine, seed=7, file_path='data.xlsx')
+        assert manifest['dapat_diulang'] == (engine != "cpsat")
+    # greedy diambil dari cache pada panggilan kedua, CP-SAT tidak dapat diulang sehingga dijalankan lagi
+    assert len(panggilan) == 3
+    assert os.path.isdir(tmp_path / Config.CACHE_DIR)
+
+
+def test_key_follows_scheduler_code(monkeypatch):
+    kunci = ScheduleCache.make_key(_data(), "greedy", 1)
+    monkeypatch.setattr(scheduler, 'code_hash', lambda: 'kode-lain')
+    assert kunci != ScheduleCache.make_key(_data(), "greedy", 1)
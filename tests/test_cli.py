@@ -0,0 +1,22 @@
+import json
+
+import pandas as pd
+
+from scheduler import EXIT_GAGAL, EXIT_TIDAK_TERJADWAL, jadwal_hash, main
+
+
+def test_generate_writes_schedule_and_manifest(workbook_path, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    argumen = ['generate', '--input', workbook_path, '--seed', '9', '--no-cache', '-q', '--manifest', 'run.json']
+    # data.xlsx tidak bisa dijadwalkan seluruhnya dengan batas beban dosen, jadi kode keluarnya 3
+    assert main(argumen + ['--out', 'a.csv']) == EXIT_TIDAK_TERJADWAL
+    assert main(argumen + ['--out', 'b.csv']) == EXIT_TIDAK_TERJADWAL
+    a, b = pd.read_csv('a.csv'), pd.read_csv('b.csv')
+    assert jadwal_hash(a) == jadwal_hash(b)
+    with open('run.json', encoding='utf-8') as f:
+        manifest = json.load(f)
+    assert (manifest['seed'], manifest['engine']) == (9, 'greedy')
+
+
+def test_generate_fails_on_missing_input(tmp_path):
+    assert main(['generate', '--input', str(tmp_path / 'tidak_ada.xlsx'), '--out', str(tmp_path / 'a.csv')]) == EXIT_GAGAL
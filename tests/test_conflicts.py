@@ -0,0 +1,52 @@
+import random
+
+import pandas as pd
+
+from scheduler import (
+    KOLOM_AVAILABILITY, AvailabilityIndex, ConflictIndex, count_conflicts, load_data, run_generation,
+    storage_for_path,
+)
+
+
+def _ringkas(indeks: ConflictIndex):
+    return (
+        indeks.jumlah_konflik,
+        {baris: {lain: set(jenis) for lain, jenis in lawan.items()} for baris, lawan in indeks.bentrok.items()},
+        {baris: sorted(daftar) for baris, daftar in indeks.pelanggaran.items()},
+    )
+
+
+def test_incremental_updates_match_full_rebuild(workbook_path):
+    jadwal = run_generation(load_data(storage_for_path(workbook_path)), "greedy", seed=1).jadwal
+    availability = AvailabilityIndex(pd.DataFrame(
+        [(jadwal['Dosen'].iloc[0], 'Rabu', '08:00', '12:00')], columns=KOLOM_AVAILABILITY
+    ))
+    indeks = ConflictIndex(jadwal, availability)
+    rng = random.Random(7)
+    nilai = {kolom: jadwal[kolom].unique().tolist() for kolom in ('Hari', 'Jam', 'Dosen', 'Ruangan')}
+    nilai['Jam'].append('jam salah')
+
+    for _ in range(300):
+        baris = rng.choice(list(jadwal.index))
+        if rng.random() < 0.1:
+            jadwal = jadwal.drop(index=baris)
+        else:
+            kolom = rng.choice(list(nilai))
+            jadwal.loc[baris, kolom] = rng.choice(nilai[kolom])
+        indeks.sync_rows(jadwal, [baris])
+        if rng.random() < 0.1:
+            assert _ringkas(indeks) == _ringkas(ConflictIndex(jadwal, availability))
+
+    assert _ringkas(indeks) == _ringkas(ConflictIndex(jadwal, availability))
+    assert indeks.jumlah_konflik > 0
+
+
+def test_count_conflicts_counts_overlapping_rows():
+    jadwal = pd.DataFrame({
+        'Kelas': ['TI24A', 'TI24B', 'TI24C', 'TI24D'],
+        'Hari': ['Senin'] * 4,
+        'Jam': ['08:00-10:00', '09:00-11:00', '10:00-12:00', 'Cek EdLink'],
+        'Dosen': ['Dosen A', 'Dosen A', 'Dosen B', 'Dosen B'],
+        'Ruangan': ['R1', 'R2', 'R1', 'Cek EdLink'],
+    })
+    assert count_conflicts(jadwal) == 1
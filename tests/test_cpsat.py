@@ -0,0 +1,81 @@
+from datetime import time as dt_time
+
+import pandas as pd
+import pytest
+
+from scheduler import (
+    AvailabilityIndex, DosenMatkulIndex, KelasRecord, MatkulRecord,
+    load_cp_model, parse_jam, schedule_cpsat, schedule_greedy, tracker_from_jadwal,
+)
+
+pytestmark = pytest.mark.skipif(load_cp_model() is None, reason="ortools tidak terpasang")
+
+
+def _baris_terkunci(hari, jam):
+    return {
+        'Kelas': 'TI22A', 'Konsentrasi': 'umum', 'Hari': hari, 'Jam': jam, 'Mata Kuliah': 'Basis Data',
+        'Dosen': 'Dosen Lain', 'Ruangan': 'R1', 'SKS': 0, 'Semester': 5, 'is_locked': True
+    }
+
+
+@pytest.fixture
+def ruangan_hampir_penuh():
+    """Satu ruangan R1 yang sudah dipakai baris terkunci hampir sepanjang minggu"""
+    jadwal_terkunci = pd.DataFrame(
+        [_baris_terkunci(hari, '09:00-17:00') for hari in ['Senin', 'Rabu', 'Kamis', 'Jumat']]
+        + [_baris_terkunci('Selasa', '08:00-13:00')]
+    )
+    tasks = [(KelasRecord('TI24A', 'reguler', 'umum'), MatkulRecord(1, 'Kalkulus', 2, 1, 'offline'))]
+    dosen_matkul_index = DosenMatkulIndex(
+        pd.DataFrame({'id': [1], 'nama': ['Dosen A']}),
+        pd.DataFrame({'id_dosen': [1], 'id_matakuliah': [1]})
+    )
+    return jadwal_terkunci, tasks, dosen_matkul_index
+
+
+def test_cpsat_uses_room_free_over_whole_interval(ruangan_hampir_penuh):
+    jadwal_terkunci, tasks, dosen_matkul_index = ruangan_hampir_penuh
+    tracker = tracker_from_jadwal(jadwal_terkunci)
+    rows, status, _ = schedule_cpsat(
+        tasks, dosen_matkul_index, AvailabilityIndex(), tracker, ['R1'], time_limit=10
+    )
+    assert status == 'OPTIMAL'
+    (baris,) = rows
+    assert baris['Hari'] == 'Selasa'
+    assert baris['Ruangan'] == 'R1'
+    jam_mulai, jam_selesai = parse_jam(baris['Jam'])
+    assert jam_mulai >= dt_time(13, 0)
+    assert jam_selesai <= dt_time(17, 0)
+
+
+def test_cpsat_places_as_many_as_greedy(ruangan_hampir_penuh):
+    jadwal_terkunci, tasks, dosen_matkul_index = ruangan_hampir_penuh
+    greedy = schedule_greedy(
+        tasks, dosen_matkul_index, pd.DataFrame({'nama': ['R1']}), AvailabilityIndex(),
+        tracker_from_jadwal(jadwal_terkunci), ['R1']
+    )
+    rows, _, _ = schedule_cpsat(
+        tasks, dosen_matkul_index, AvailabilityIndex(), tracker_from_jadwal(jadwal_terkunci), ['R1'], time_limit=10
+    )
+    terjadwal = lambda daftar: sum(baris['Hari'] != 'Cek EdLink' for baris in daftar)
+    assert terjadwal(rows) >= terjadwal(greedy) == 1
+
+
+def test_cpsat_same_seed_same_schedule():
+    kelas = [KelasRecord(f'TI24{huruf}', 'reguler', 'umum') for huruf in 'ABC']
+    matkul = [MatkulRecord(i, f'Matkul {i}', 3, 1, 'offline') for i in range(1, 5)]
+    tasks = [(k, m) for k in kelas for m in matkul]
+    dosen_matkul_index = DosenMatkulIndex(
+        pd.DataFrame({'id': [1, 2], 'nama': ['Dosen A', 'Dosen B']}),
+        pd.DataFrame({'id_dosen': [1, 1, 2, 2, 1, 2], 'id_matakuliah': [1, 2, 3, 4, 3, 1]})
+    )
+    hasil = [
+        schedule_cpsat(
+            tasks, dosen_matkul_index, AvailabilityIndex(), tracker_from_jadwal(pd.DataFrame(
+                columns=['Kelas', 'Hari', 'Jam', 'Dosen', 'Ruangan', 'SKS']
+            )), ['R1', 'R2'], time_limit=2, seed=42
+        )
+        for _ in range(2)
+    ]
+    assert hasil[0] == hasil[1]
+    assert hasil[0][2]
@@ -0,0 +1,95 @@
+import pandas as pd
+import pytest
+
+from conftest import assert_tanpa_bentrok
+from scheduler import (
+    KOLOM_AVAILABILITY, AvailabilityIndex, Config, ConflictIndex, DosenMatkulIndex,
+    jadwal_hash, load_cp_model, load_data, locked_rows, parse_jam, run_generation, storage_for_path,
+)
+
+ENGINES = [
+    "greedy",
+    "backtracking",
+    pytest.param("cpsat", marks=pytest.mark.skipif(load_cp_model() is None, reason="ortools tidak terpasang")),
+]
+
+
+@pytest.fixture
+def data_penuh(workbook_path):
+    return load_data(storage_for_path(workbook_path))
+
+
+@pytest.fixture
+def data_kecil(data_penuh):
+    """Satu kelas TI24 per jenis, dengan tiga dosen yang sibuk sepanjang Senin dan Selasa"""
+    data = list(data_penuh)
+    df_kelas = data[0]
+    data[0] = df_kelas[df_kelas['nama'].str.startswith('TI24')].groupby('jenis').head(1)
+    data[6] = pd.DataFrame(
+        [(nama, hari, '08:00', '17:00') for nama in data[2]['nama'][:3] for hari in ('Senin', 'Selasa')],
+        columns=KOLOM_AVAILABILITY
+    )
+    return tuple(data)
+
+
+def assert_constraint_keras(jadwal: pd.DataFrame, data) -> None:
+    """Semua constraint keras mesin penjadwalan terpenuhi oleh jadwal"""
+    df_kelas, df_matkul, df_dosen, df_dosen_matkul, _, _, df_availability = data
+    assert_tanpa_bentrok(jadwal)
+
+    # Ketersediaan dosen, sholat Jumat, istirahat, dan format jam
+    indeks = ConflictIndex(jadwal, AvailabilityIndex(df_availability))
+    assert indeks.pelanggaran == {}
+
+    jenis_per_kelas = dict(zip(df_kelas['nama'], df_kelas['jenis']))
+    id_per_matkul = dict(zip(df_matkul['nama'], df_matkul['id']))
+    dosen_matkul_index = DosenMatkulIndex(df_dosen, df_dosen_matkul)
+    terjadwal = jadwal[jadwal['Hari'] != 'Cek EdLink']
+    for baris in terjadwal.to_dict('records'):
+        jenis = jenis_per_kelas[baris['Kelas']].lower()
+        jam_mulai, jam_selesai = parse_jam(baris['Jam'])
+        jam_awal, jam_akhir = Config.JAM_OPERASIONAL[jenis]
+        assert baris['Hari'] in Config.HARI_PRIORITAS[jenis]
+        assert jam_awal <= jam_mulai and jam_selesai <= jam_akhir
+        pengampu = {d.nama for d in dosen_matkul_index.dosen_for(id_per_matkul[baris['Mata Kuliah']])}
+        assert baris['Dosen'] in pengampu
+        assert (baris['Ruangan'] == 'Zoom') == (baris['Status'] == 'Online')
+
+    if Config.MAX_SKS_DOSEN is not None:
+        assert terjadwal.groupby('Dosen')['SKS'].sum().max() <= Config.MAX_SKS_DOSEN
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_engine_respects_hard_constraints(engine, data_kecil):
+    hasil = run_generation(data_kecil, engine, seed=1)
+    assert hasil.errors == []
+    assert (hasil.jadwal['Hari'] != 'Cek EdLink').any()
+    assert_constraint_keras(hasil.jadwal, data_kecil)
+
+
+@pytest.mark.parametrize("engine", ["greedy", "backtracking"])
+def test_engine_respects_hard_constraints_on_full_workbook(engine, data_penuh):
+    hasil = run_generation(data_penuh, engine, seed=1)
+    assert_constraint_keras(hasil.jadwal, data_penuh)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_locked_rows_are_kept(engine, data_kecil):
+    awal = run_generation(data_kecil, engine, seed=1).jadwal
+    awal['is_locked'] = [i % 3 == 0 and hari != 'Cek EdLink' for i, hari in enumerate(awal['Hari'])]
+    terkunci = locked_rows(awal)
+    assert terkunci is not None
+
+    hasil = run_generation(data_kecil, engine, seed=2, jadwal_terkunci=terkunci)
+    kolom = ['Kelas', 'Mata Kuliah', 'Hari', 'Jam', 'Dosen', 'Ruangan']
+    dipertahankan = terkunci[kolom].merge(hasil.jadwal[kolom], how='left', indicator=True)
+    assert (dipertahankan['_merge'] == 'both').all()
+    assert len(hasil.jadwal) == len(awal)
+    assert_constraint_keras(hasil.jadwal, data_kecil)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_same_seed_same_schedule(engine, data_kecil):
+    pertama = run_generation(data_kecil, engine, seed=5)
+    kedua = run_generation(data_kecil, engine, seed=5)
+    assert jadwal_hash(pertama.jadwal) == jadwal_hash(kedua.jadwal)
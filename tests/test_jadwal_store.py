@@ -0,0 +1,119 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("streamlit")
+
+from app import JadwalStore  # noqa: E402
+from scheduler import (  # noqa: E402
+    HARI_INDEX, load_data, parse_jam, run_generation, storage_for_path, time_to_minutes,
+)
+
+
+@pytest.fixture
+def jadwal(workbook_path):
+    """Jadwal hasil generate ditambah baris yang Hari-nya kosong dan Jam-nya tidak bisa di-parse"""
+    jadwal = run_generation(load_data(storage_for_path(workbook_path)), "greedy", seed=1).jadwal
+    jadwal = jadwal.reset_index(drop=True)
+    terjadwal = jadwal.index[jadwal['Hari'] != 'Cek EdLink']
+    jadwal.loc[terjadwal[0], 'Hari'] = None
+    jadwal.loc[terjadwal[1], 'Jam'] = '8:00-9:40x'
+    jadwal.loc[terjadwal[2], ['Hari', 'Jam']] = [None, 'jam salah']
+    jadwal.loc[terjadwal[3], 'Warna'] = '#123456'
+    return jadwal
+
+
+def _urutan_pandas(df: pd.DataFrame, by) -> list:
+    """Urutan acuan: Hari menurut urutan hari, Jam menurut menit mulai, nilai kosong/tidak valid di akhir"""
+    def menit(jam):
+        rentang = parse_jam(jam)
+        return time_to_minutes(rentang[0]) if rentang is not None else np.nan
+
+    kunci = {
+        'Hari': lambda seri: seri.map(lambda h: HARI_INDEX.get(h, len(HARI_INDEX)) if pd.notna(h) else np.nan),
+        'Jam': lambda seri: seri.map(menit),
+    }
+    urut = pd.DataFrame({k: kunci.get(k, lambda seri: seri)(df[k]) for k in by}, index=df.index)
+    return list(urut.sort_values(list(by), kind='stable', na_position='last').index)
+
+
+FILTER = [
+    {},
+    {'Kelas': ['TI24A', 'TI24B', 'SI23A']},
+    {'Hari': ['Senin', 'Cek EdLink'], 'Status': ['Online']},
+    {'Semester': [1, 3], 'Hari': ['Rabu', 'Kamis', 'Hari Lain']},
+    {'Dosen': [], 'Kelas': ['Tidak Ada']},
+]
+
+
+@pytest.mark.parametrize('filters', FILTER)
+@pytest.mark.parametrize('by', [(), ('Hari', 'Jam'), ('Kelas', 'Hari', 'Jam')])
+def test_filter_positions_match_pandas(jadwal, filters, by):
+    mask = pd.Series(True, index=jadwal.index)
+    for kolom, pilihan in filters.items():
+        if pilihan:
+            mask &= jadwal[kolom].isin(pilihan)
+    acuan = jadwal[mask]
+    acuan = _urutan_pandas(acuan, by) if by else list(acuan.index)
+
+    store = JadwalStore(jadwal)
+    assert list(store.filter_positions(filters, by)) == acuan
+    assert list(store.view(filters, by).index) == acuan
+
+
+def test_store_accepts_empty_hari(jadwal):
+    store = JadwalStore(jadwal)
+    assert len(store) == len(jadwal)
+    assert None not in store.options('Hari')
+    assert store.to_frame()['Hari'].isna().sum() == 2
+
+
+def test_to_frame_keeps_unparsable_jam_and_stored_warna(jadwal):
+    hasil = JadwalStore(jadwal).to_frame()
+    assert list(hasil['Jam']) == list(jadwal['Jam'])
+    assert list(hasil['Warna']) == list(jadwal['Warna'])
+    assert list(hasil['Hari'].astype(object)) == list(jadwal['Hari'])
+
+
+def _events_per_baris(jadwal: pd.DataFrame) -> list:
+    """Event acuan dibentuk baris per baris seperti konversi kalender sebelum memakai JadwalStore"""
+    events = []
+    for _, row in jadwal.iterrows():
+        if row['Hari'] == 'Cek EdLink':
+            continue
+        try:
+            mulai, selesai = (datetime.strptime(bagian, '%H:%M') for bagian in row['Jam'].split('-'))
+        except (AttributeError, ValueError):
+            continue
+        nomor_hari = 2 + HARI_INDEX.get(row['Hari'], 0)
+        events.append({
+            'title': f"{row['Mata Kuliah']} ({row['Kelas']})",
+            'start': f"2023-01-{nomor_hari:02d}T{mulai.strftime('%H:%M:%S')}",
+            'end': f"2023-01-{nomor_hari:02d}T{selesai.strftime('%H:%M:%S')}",
+            'color': row['Warna'],
+            'extendedProps': {
+                'dosen': row['Dosen'],
+                'sks': row['SKS'],
+                'status': row['Status'],
+                'ruangan': row['Ruangan'],
+                'keterangan': row['Keterangan'],
+                'konsentrasi': row['Konsentrasi'],
+            }
+        })
+    return events
+
+
+def test_calendar_events_match_row_by_row_conversion(jadwal):
+    store = JadwalStore(jadwal)
+    assert store.calendar_events() == _events_per_baris(jadwal)
+
+    # Hari kosong ditaruh di hari Senin, juga saat tidak ada hari di luar urutan hari
+    terjadwal = jadwal[jadwal['Hari'] != 'Cek EdLink']
+    assert JadwalStore(terjadwal).calendar_events() == _events_per_baris(terjadwal)
+    assert '2023-01-02' in [e['start'][:10] for e in _events_per_baris(terjadwal[terjadwal['Hari'].isna()])]
+
+    filters = {'Kelas': ['TI24A', 'TI24B'], 'Dosen': list(jadwal['Dosen'].unique()[:5])}
+    posisi = store.filter_positions(filters)
+    assert store.calendar_events(posisi) == _events_per_baris(jadwal.iloc[posisi])
@@ -0,0 +1,25 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+
+from scheduler import generate_multistart, jadwal_hash, load_data, storage_for_path
+
+
+def test_spawn_workers_match_sequential_run(workbook_path):
+    data = load_data(storage_for_path(workbook_path))
+    seeds = [11, 12, 13]
+    berurutan = generate_multistart(data, len(seeds), "greedy", workers=1, seeds=seeds)
+    # Worker spawn mengimpor ulang modul dari nol; hasilnya harus sama dengan run di proses ini
+    paralel = generate_multistart(
+        data, len(seeds), "greedy", workers=2, seeds=seeds, mp_context=multiprocessing.get_context("spawn")
+    )
+    assert paralel[1] == berurutan[1]
+    assert sorted(paralel[2]) == sorted(berurutan[2])
+    assert jadwal_hash(paralel[0].jadwal) == jadwal_hash(berurutan[0].jadwal)
+
+
+def test_scheduler_module_does_not_import_streamlit():
+    direktori = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    kode = "import sys, scheduler; sys.exit('streamlit' in sys.modules)"
+    assert subprocess.run([sys.executable, '-c', kode], cwd=direktori).returncode == 0
@@ -0,0 +1,29 @@
+import random
+
+import pytest
+
+from conftest import assert_tanpa_bentrok
+from scheduler import (
+    AvailabilityIndex, DosenMatkulIndex, load_data, optimize_jadwal, prepare_ruangan_prioritas,
+    run_generation, score_jadwal, storage_for_path,
+)
+
+
+def test_incremental_score_matches_full_recompute(workbook_path):
+    data = load_data(storage_for_path(workbook_path))
+    df_kelas, df_matkul, df_dosen, df_dosen_matkul, _, df_ruangan, df_availability = data
+    jadwal = run_generation(data, "greedy", seed=3).jadwal
+    argumen = (
+        df_kelas, df_matkul, DosenMatkulIndex(df_dosen, df_dosen_matkul),
+        AvailabilityIndex(df_availability), prepare_ruangan_prioritas(df_ruangan)
+    )
+    hasil, stats = optimize_jadwal(jadwal, *argumen, time_budget=0.5, rng=random.Random(1))
+    assert stats['langkah_diterima'] > 0
+    assert stats['skor_akhir'] <= stats['skor_awal']
+
+    # Skor delta yang dijumlahkan selama optimasi harus sama dengan skor jadwal akhir dihitung ulang
+    _, ulang = optimize_jadwal(hasil, *argumen, time_budget=0)
+    assert ulang['skor_awal'] == pytest.approx(stats['skor_akhir'])
+
+    assert_tanpa_bentrok(hasil)
+    assert score_jadwal(hasil)[:2] == score_jadwal(jadwal)[:2]
@@ -0,0 +1,126 @@
+import os
+import platform
+import subprocess
+import sys
+import threading
+
+import pandas as pd
+import pytest
+
+import scheduler
+from scheduler import (
+    ExcelStorage, SQLiteStorage, WorkbookLock, jadwal_hash, load_data, read_workbook, run_generation,
+)
+
+
+def _tulis_lock(path, isi, umur=0.0):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(isi)
+    if umur:
+        waktu = os.path.getmtime(path) - umur
+        os.utime(path, (waktu, waktu))
+
+
+def _pid_mati():
+    proses = subprocess.Popen([sys.executable, '-c', 'pass'])
+    proses.wait()
+    return proses.pid
+
+
+def test_lock_of_live_writer_is_not_stolen(tmp_path):
+    lock = WorkbookLock(str(tmp_path / 'data.xlsx'), timeout=0.2, stale_after=0)
+    _tulis_lock(lock.path, f"{os.getpid()} {platform.node()}", umur=3600)
+    with pytest.raises(TimeoutError):
+        with lock:
+            pass
+    assert os.path.exists(lock.path)
+
+
+def test_lock_of_dead_writer_is_taken_over(tmp_path):
+    lock = WorkbookLock(str(tmp_path / 'data.xlsx'), timeout=0.2, stale_after=3600)
+    _tulis_lock(lock.path, f"{_pid_mati()} {platform.node()}")
+    with lock:
+        with open(lock.path, encoding='utf-8') as f:
+            assert f.read() == f"{os.getpid()} {platform.node()}"
+    assert not os.path.exists(lock.path)
+
+
+@pytest.mark.parametrize('umur, diambil', [(3600, True), (0, False)])
+def test_unverifiable_lock_falls_back_to_age(tmp_path, umur, diambil):
+    lock = WorkbookLock(str(tmp_path / 'data.xlsx'), timeout=0.2, stale_after=60)
+    _tulis_lock(lock.path, "1234 host-lain", umur=umur)
+    if diambil:
+        with lock:
+            pass
+    else:
+        with pytest.raises(TimeoutError):
+            with lock:
+                pass
+
+
+def _sama(a, b):
+    pd.testing.assert_frame_equal(a.rename(columns=str).reset_index(drop=True), b.reset_index(drop=True))
+
+
+def test_sqlite_round_trip(workbook_path, tmp_path):
+    storage = SQLiteStorage(str(tmp_path / 'data.db'))
+    assert storage.import_xlsx(workbook_path)
+    asli = read_workbook(workbook_path)
+    tabel = storage.read_tables()
+    assert list(tabel) == list(asli)
+    for nama, df in asli.items():
+        _sama(df, tabel[nama])
+
+    # Ekspor kembali ke xlsx menghasilkan sheet yang sama
+    (tmp_path / 'ekspor.xlsx').write_bytes(storage.export_xlsx())
+    for nama, df in read_workbook(str(tmp_path / 'ekspor.xlsx')).items():
+        _sama(asli[nama], df)
+
+    # Generate dari SQLite sama dengan dari workbook untuk seed yang sama
+    dari_excel = run_generation(load_data(ExcelStorage(workbook_path)), "greedy", seed=4).jadwal
+    dari_sqlite = run_generation(load_data(storage), "greedy", seed=4).jadwal
+    assert jadwal_hash(dari_excel) == jadwal_hash(dari_sqlite)
+
+
+@pytest.mark.parametrize('backend', ['sqlite', 'excel'])
+def test_row_operations_match_between_backends(backend, tmp_path):
+    if backend == 'sqlite':
+        storage = SQLiteStorage(str(tmp_path / 'data.db'))
+    else:
+        storage = ExcelStorage(str(tmp_path / 'data.xlsx'))
+    awal = pd.DataFrame({'id': [1, 2, 3], 'nama': ['A', 'B', 'C']})
+    assert storage.replace_tables({'Dosen': awal, 'dosen_matakuliah': pd.DataFrame({'id_dosen': [1, 2, 2]})})
+    assert storage.insert_rows('Dosen', pd.DataFrame({'id': [4], 'nama': ['D']}))
+    assert storage.delete_rows({'Dosen': {'id': [2]}, 'dosen_matakuliah': {'id_dosen': [2]}})
+    assert storage.replace_rows('Dosen', {'nama': ['C']}, pd.DataFrame({'id': [3], 'nama': ['C2']}))
+    tabel = storage.read_tables()
+    assert sorted(zip(tabel['Dosen']['id'], tabel['Dosen']['nama'])) == [(1, 'A'), (3, 'C2'), (4, 'D')]
+    assert list(tabel['dosen_matakuliah']['id_dosen']) == [1]
+
+
+def test_interleaved_excel_inserts_keep_both_rows(tmp_path, monkeypatch):
+    path = str(tmp_path / 'data.xlsx')
+    assert ExcelStorage(path).replace_tables({'Dosen': pd.DataFrame({'id': [1], 'nama': ['A']})})
+
+    # Saat penulis pertama membaca sheet, penulis kedua mulai menambah baris. Kedua pembacaan
+    # dibiarkan terjadi sebelum penulisan apa pun jika tidak ada yang menahan lock ketika membaca
+    baca_asli = scheduler.read_workbook
+    kedua_membaca = threading.Event()
+    hasil_kedua = []
+    kedua = threading.Thread(
+        target=lambda: hasil_kedua.append(ExcelStorage(path).insert_rows('Dosen', pd.DataFrame({'id': [3], 'nama': ['C']})))
+    )
+
+    def read_workbook(file_path='data.xlsx'):
+        if threading.current_thread() is kedua:
+            kedua_membaca.set()
+        elif not kedua.is_alive() and not hasil_kedua:
+            kedua.start()
+            kedua_membaca.wait(timeout=1)
+        return baca_asli(file_path)
+
+    monkeypatch.setattr(scheduler, 'read_workbook', read_workbook)
+    assert ExcelStorage(path).insert_rows('Dosen', pd.DataFrame({'id': [2], 'nama': ['B']}))
+    kedua.join()
+    assert hasil_kedua == [True]
+    assert sorted(ExcelStorage(path).read_tables()['Dosen']['id']) == [1, 2, 3]